@@ -1,16 +1,74 @@
-import sys, glob
+import sys, os, json, hashlib
 
-draft_files = glob.glob('draft/en/*.md')
-final_files = glob.glob('final/en/*.md')
-draft_codes = [f.split('/')[-1].split('.')[0] for f in draft_files]
-final_codes = [f.split('/')[-1].split('.')[0] for f in final_files]
+# Usage:
+#   update-readme.py                  status of the release in the current directory
+#   update-readme.py DIR [DIR ...]    status of the latest release, and progress
+#                                     across releases; each DIR is a cv-corpus-*
+#                                     release or a directory containing them
+#
+# The size, mtime and hash of every datasheet are kept in a manifest, so that
+# later runs only stat the files and re-read the ones that changed.
 
-draft_codes.sort()
-final_codes.sort()
+MANIFEST = '.status-manifest.json'
+
+def load_manifest():
+	try:
+		return json.loads(open(MANIFEST).read())
+	except (FileNotFoundError, ValueError):
+		return {}
+
+def file_hash(path, stat, manifest, new_manifest):
+	entry = manifest.get(path)
+	if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+		digest = entry[2]
+	else:
+		digest = hashlib.sha1(open(path, 'rb').read()).hexdigest()
+	new_manifest[path] = [stat.st_mtime_ns, stat.st_size, digest]
+	return digest
+
+def scan_release(release_dir, manifest, new_manifest):
+	# Returns {'draft': {code: hash}, 'final': {code: hash}}
+	index = {'draft': {}, 'final': {}}
+	for stage in index:
+		directory = os.path.join(release_dir, stage, 'en')
+		if not os.path.isdir(directory):
+			continue
+		with os.scandir(directory) as entries:
+			for entry in entries:
+				if entry.name.endswith('.md') and entry.is_file():
+					code = entry.name.split('.')[0]
+					index[stage][code] = file_hash(entry.path, entry.stat(), manifest, new_manifest)
+	return index
+
+def find_releases(dirs):
+	releases = []
+	for d in dirs:
+		d = os.path.normpath(d)
+		if os.path.basename(os.path.abspath(d)).startswith('cv-corpus-'):
+			releases.append(d)
+		else:
+			releases.extend(os.path.join(d, name) for name in os.listdir(d) if name.startswith('cv-corpus-'))
+	# cv-corpus-<version>-<date>: order by release date
+	return sorted(set(releases), key=lambda r: (os.path.basename(os.path.abspath(r))[-10:], r))
+
+def release_name(release):
+	return os.path.basename(os.path.abspath(release))
+
+releases = find_releases(sys.argv[1:]) if len(sys.argv) > 1 else ['.']
+manifest = load_manifest()
+new_manifest = {}
+indexes = [scan_release(release, manifest, new_manifest) for release in releases]
+if new_manifest != manifest:
+	with open(MANIFEST, 'w') as manifest_fd:
+		json.dump(new_manifest, manifest_fd)
+
+latest = indexes[-1]
+draft_codes = sorted(latest['draft'])
+final_codes = latest['final']
 
 print('# Datasheets')
 print()
-print('## Status')
+print('## Status')
 print()
 
 total_count = 0
@@ -30,3 +88,31 @@ for code in draft_codes:
 print(final_count, '/', total_count)
 print()
 print('\n'.join(status))
+
+if len(releases) > 1:
+	# Draft -> final progress of each locale over the releases; ✎ marks a
+	# final datasheet that changed since the previous release.
+	codes = sorted(set().union(*(index['draft'].keys() | index['final'].keys() for index in indexes)))
+	progress = []
+	progress.append('| Locale | ' + ' | '.join(release_name(r) for r in releases) + ' |')
+	progress.append('|--------|' + '|'.join('-' * (len(release_name(r)) + 2) for r in releases) + '|')
+	for code in codes:
+		cells = []
+		previous = None
+		for index in indexes:
+			final_hash = index['final'].get(code)
+			if final_hash is None:
+				cells.append('-' if code in index['draft'] else '')
+			elif previous is not None and final_hash != previous:
+				cells.append('✎')
+			else:
+				cells.append('✔')
+			previous = final_hash
+		progress.append('| `%s` | ' % code + ' | '.join(cells) + ' |')
+	totals = ['%d / %d' % (len(index['final'].keys() & index['draft'].keys()), len(index['draft'])) for index in indexes]
+	progress.append('| **Final** | ' + ' | '.join(totals) + ' |')
+
+	print()
+	print('## Progress')
+	print()
+	print('\n'.join(progress))
@@ -1,32 +1,94 @@
 # It would be nice to do this with a markdown parser, e.g. get an AST
 # remove nodes and then render it, but I haven't found a library that
-# does Markdown -> AST yet.
+# does Markdown -> AST yet.
+#
+# Usage:
+#   datasheet-postprocess.py DATASHEET.md > OUTPUT.md
+#   datasheet-postprocess.py INPUT_DIR OUTPUT_DIR
+#
+# With two directories, every datasheet under INPUT_DIR (e.g. a release's
+# draft/ and final/ trees) is post-processed in a pool of worker processes
+# and written to the same relative path under OUTPUT_DIR, along with
+# empty-sections.json, listing the empty sections of each locale.
 
-import sys, re
-datasheet = open(sys.argv[1]).read()
+import sys, os, json
+from multiprocessing import Pool
 
+def split_sections(datasheet):
+	# Split the Markdown into blocks by section: a block starts at each line
+	# beginning with '#' and runs up to the next one, in a single pass.
+	blocs = []
+	bloc = []
+	for line in datasheet.split('\n'):
+		if line.startswith('#'):
+			blocs.append('\n'.join(bloc) + '\n')
+			bloc = []
+		bloc.append(line)
+	blocs.append('\n'.join(bloc))
+	return blocs
 
-# Split the Markdown into blocks by section
-lines = datasheet.split('\n')
-new_lines = []
-for line in lines:
-	line = re.sub('^(#+)', r'◊\g<1>', line)
-	new_lines.append(line)
-lines = '\n'.join(new_lines)
-blocs = lines.split('◊')
+def is_empty(bloc):
+	if '{{' in bloc:
+		return True
+	heading, _, body = bloc.partition('\n')
+	if not heading.startswith('#'):
+		body = bloc
+	return body.strip() == ''
 
-empty_sections = [] # A list of the empty sections
+def postprocess(datasheet):
+	# Returns the datasheet without its empty sections, and the empty
+	# sections
+	kept = []
+	empty_sections = [] # A list of the empty sections
+	for bloc in split_sections(datasheet):
+		if is_empty(bloc):
+			empty_sections.append(bloc)
+		else:
+			kept.append(bloc + '\n')
+	return ''.join(kept), empty_sections
 
-# Print out non-empty sections
-for bloc in blocs:
-	empty = False
-	if '{{' in bloc:
-		empty = True
-	if re.sub('^#+.*', '', bloc).strip() == '':
-		empty = True
-	if empty:
-		empty_sections.append(bloc)
+def postprocess_file(paths):
+	input_file, output_file = paths
+	text, empty_sections = postprocess(open(input_file).read())
+	os.makedirs(os.path.dirname(output_file), exist_ok=True)
+	with open(output_file, 'w') as output_fd:
+		output_fd.write(text)
+	headings = [bloc.partition('\n')[0].strip() or '(preamble)' for bloc in empty_sections if bloc.strip()]
+	return input_file, headings
+
+def find_datasheets(input_dir):
+	for root, dirs, files in os.walk(input_dir):
+		dirs.sort()
+		for name in sorted(files):
+			if name.endswith('.md') and name != 'README.md':
+				yield os.path.join(root, name)
+
+if __name__ == '__main__':
+	# Worker processes import this file, so the command only runs here.
+	if len(sys.argv) == 3 and os.path.isdir(sys.argv[1]):
+		input_dir, output_dir = sys.argv[1:]
+		jobs = []
+		for input_file in find_datasheets(input_dir):
+			jobs.append((input_file, os.path.join(output_dir, os.path.relpath(input_file, input_dir))))
+
+		report = {} # locale -> directory -> empty section headings
+		with Pool() as pool:
+			for input_file, headings in pool.imap_unordered(postprocess_file, jobs, chunksize=8):
+				relative = os.path.relpath(input_file, input_dir)
+				locale = os.path.splitext(os.path.basename(relative))[0]
+				report.setdefault(locale, {})[os.path.dirname(relative)] = headings
+		report = {locale: dict(sorted(report[locale].items())) for locale in sorted(report)}
+
+		os.makedirs(output_dir, exist_ok=True)
+		with open(os.path.join(output_dir, 'empty-sections.json'), 'w') as report_fd:
+			json.dump(report, report_fd, indent=2, ensure_ascii=False)
+			report_fd.write('\n')
+		print(len(jobs), 'datasheets,', sum(len(h) for dirs in report.values() for h in dirs.values()), 'empty sections', file=sys.stderr)
 	else:
-		print(bloc)
+		datasheet = open(sys.argv[1]).read()
+		text, empty_sections = postprocess(datasheet)
+
+		# Print out non-empty sections
+		sys.stdout.write(text)
 
-print(len(empty_sections), file=sys.stderr)
+		print(len(empty_sections), file=sys.stderr)
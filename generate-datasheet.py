@@ -1,21 +1,34 @@
-import sys, re, json
+import sys, json, os
 
-metadata_file = sys.argv[1] 
-template_file = sys.argv[2]
-output_dir = sys.argv[3]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from render_datasheet import Template, render_draft
 
-metadata = json.loads(open(metadata_file).read())
-template = open(template_file).read()
-for locale in metadata:
-	print(locale, metadata[locale])
-	english_name = metadata[locale]['english_name']
-	native_name = metadata[locale]['native_name']
-	if native_name == '':
-		native_name = '<' + english_name + '>'
-	filled_template = template.replace('{{LOCALE}}', locale)
-	filled_template = filled_template.replace('{{ENGLISH_NAME}}', english_name)
-	filled_template = filled_template.replace('{{NATIVE_NAME}}', native_name)
+# Usage: generate-datasheet.py METADATA TEMPLATE OUTPUT_DIR [METADATA TEMPLATE OUTPUT_DIR ...]
 
-	output_fd = open(output_dir + '/' + locale + '.md', 'w+')
-	print(filled_template, file=output_fd)
-	output_fd.close()
+if len(sys.argv) < 4 or (len(sys.argv) - 1) % 3 != 0:
+	print("usage: generate-datasheet.py METADATA TEMPLATE OUTPUT_DIR [...]", file=sys.stderr)
+	sys.exit(1)
+
+templates = {}
+for i in range(1, len(sys.argv), 3):
+	metadata_file, template_file, output_dir = sys.argv[i:i + 3]
+	metadata = json.loads(open(metadata_file).read())
+	if template_file not in templates:
+		templates[template_file] = Template(open(template_file).read())
+	template = templates[template_file]
+	os.makedirs(output_dir, exist_ok=True)
+	written = 0
+	for locale in metadata:
+		filled_template = render_draft(template, locale, metadata[locale]).encode('utf-8')
+
+		# Only write drafts whose content changed, so that regenerating
+		# leaves the unchanged files (and their mtimes) alone.
+		output_file = output_dir + '/' + locale + '.md'
+		if os.path.exists(output_file):
+			with open(output_file, 'rb') as f:
+				if f.read() == filled_template:
+					continue
+		with open(output_file, 'wb') as output_fd:
+			output_fd.write(filled_template)
+		written += 1
+	print(template_file, '->', output_dir + ':', written, 'written,', len(metadata) - written, 'unchanged')
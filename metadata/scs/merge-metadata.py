@@ -1,40 +1,70 @@
-import sys, json
+import sys, os, json
 
-metadata = {}
+# Usage:
+#   merge-metadata.py STATS TRANSLATIONS.ftl [TRANSLATIONS.ftl ...]
+#   merge-metadata.py STATS OUTPUT [STATS OUTPUT ...] TRANSLATIONS.ftl [...]
+#
+# STATS is a languages stats JSON (e.g. of the scripted and spontaneous
+# speech sites) and TRANSLATIONS a Fluent file with a `# [Languages]` block.
+# With a single STATS file, the output is metadata.json in the current
+# directory. When several translation files name the same locale, the first
+# one wins. Locales are written sorted, and an output is only rewritten when
+# its content changed.
 
-stats = json.loads(open(sys.argv[1]).read())
-translation_fd = open(sys.argv[2])
-english_translations = {}
-in_block = False
-for line in translation_fd:
-	if line.count('# [Languages]') > 0:
-		in_block = True	
-	if line.count('# [/]') > 0:
+def read_translations(paths):
+	# Index the `locale = English name` lines of the `# [Languages]` block of
+	# every file, reading each file once and only up to the end of the block.
+	english_translations = {}
+	for path in paths:
 		in_block = False
+		with open(path) as translation_fd:
+			for line in translation_fd:
+				if '# [Languages]' in line:
+					in_block = True
+				elif '# [/]' in line and in_block:
+					break
+				elif in_block and line.strip() and line[0] != '#':
+					k, _, v = line.partition('=')
+					english_translations.setdefault(k.strip(), v.strip())
+	return english_translations
 
-	if in_block and line.strip() and line[0] != '#':
-		k, v = [x.strip() for x in line.split('=')]
-		english_translations[k] = v
+def merge(stats, english_translations):
+	metadata = {}
+	for stat in stats:
+		# {'id': 13, 'name': 'ca', 'target_sentence_count': 5000, 'native_name': 'català', 'is_contributable': 1, 'is_translated': 1, 'text_direction': 'LTR'}
+		if stat.get('is_contributable', 1) != 1:
+			continue
 
-for stat in stats:
-	# {'id': 13, 'name': 'ca', 'target_sentence_count': 5000, 'native_name': 'català', 'is_contributable': 1, 'is_translated': 1, 'text_direction': 'LTR'}
+		locale = stat['name']
+		native_name = stat['native_name']
+		metadata[locale] = {
+			'native_name': native_name if native_name != locale else '',
+			'english_name': english_translations.get(locale, ''),
+		}
+	return {locale: metadata[locale] for locale in sorted(metadata)}
 
-	if stat['is_contributable'] != 1:
-		continue
+def write_if_changed(output_file, text):
+	if os.path.exists(output_file):
+		with open(output_file) as f:
+			if f.read() == text:
+				return False
+	with open(output_file, 'w') as metadata_fd:
+		metadata_fd.write(text)
+	return True
 
-	locale = stat['name']
-	native_name = stat['native_name']
+translation_files = [arg for arg in sys.argv[1:] if arg.endswith('.ftl')]
+stats_args = [arg for arg in sys.argv[1:] if not arg.endswith('.ftl')]
+if len(stats_args) == 1:
+	stats_args.append('metadata.json')
+if not translation_files or not stats_args or len(stats_args) % 2 != 0:
+	print("usage: merge-metadata.py STATS [OUTPUT] [STATS OUTPUT ...] TRANSLATIONS.ftl [...]", file=sys.stderr)
+	sys.exit(1)
 
-	metadata[locale] = {}
-	metadata[locale]['native_name'] = ''
-	if native_name != locale:
-		metadata[locale]['native_name'] = native_name
-	metadata[locale]['english_name'] = ''
-	if locale in english_translations:
-		metadata[locale]['english_name'] = english_translations[locale]
-
-print(metadata)
-
-metadata_fd = open('metadata.json', 'w+')		
-metadata_fd.write(json.dumps(metadata))
-metadata_fd.close()
+english_translations = read_translations(translation_files)
+for i in range(0, len(stats_args), 2):
+	stats_file, output_file = stats_args[i:i + 2]
+	with open(stats_file) as stats_fd:
+		metadata = merge(json.load(stats_fd), english_translations)
+	written = write_if_changed(output_file, json.dumps(metadata))
+	untranslated = sum(1 for entry in metadata.values() if entry['english_name'] == '')
+	print(stats_file, '->', output_file + ':', len(metadata), 'locales,', untranslated, 'without English name,', 'written' if written else 'unchanged')
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the stats functions of generate_datasheet.py on synthetic
+locales of increasing size (see synthetic_corpus.py), recording the wall
+time and peak resident memory of each.
+
+Every function runs in a fresh interpreter, so that the peak RSS of one does
+not hide that of the next; the RSS of the interpreter after importing the
+modules is recorded as well. Corpora are generated once into `--work_dir`
+and reused by later runs.
+
+The report is written as JSON. Given the report of an earlier run with
+`--baseline`, functions that got slower or bigger by more than
+`--tolerance` are listed and the script exits with status 1, so that
+regressions show up before a release.
+
+USAGE:
+    python benchmark.py --work_dir /tmp/cv-bench --sizes 10000 100000 \\
+        --output bench.json [--baseline previous.json]
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from stage_metrics import peak_rss_mb
+from synthetic_corpus import generate_locale
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+FUNCTIONS = [
+    "read_tsv",
+    "get_hours",
+    "get_demographics",
+    "get_contributor_stats",
+    "get_text_corpus_stats",
+    "compute_stats",
+    "compute_stats_cached",
+]
+# Differences below these are measurement noise, whatever the tolerance.
+MIN_SECONDS_DELTA = 0.05
+MIN_RSS_DELTA_MB = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+def run_function(name: str, base_path: Path) -> None:
+    """
+    Runs one benchmarked function on `base_path` and prints its wall time
+    and memory as JSON; called in a child interpreter.
+    """
+    import generate_datasheet as gd
+    from duration_index import ClipDurationIndex
+
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    if name == "read_tsv":
+        gd.read_tsv(base_path / "validated.tsv")
+    elif name == "get_hours":
+        durations = ClipDurationIndex.open(base_path / "clip_durations.tsv")
+        gd.get_hours(gd.iter_tsv(base_path / "validated.tsv"), durations)
+    elif name == "get_demographics":
+        gd.get_demographics(gd.iter_tsv(base_path / "validated.tsv"))
+    elif name == "get_contributor_stats":
+        gd.get_contributor_stats(gd.iter_tsv(base_path / "validated.tsv"))
+    elif name == "get_text_corpus_stats":
+        gd.get_text_corpus_stats(
+            gd.iter_tsv(base_path / "validated_sentences.tsv"),
+            gd.iter_tsv(base_path / "validated.tsv"),
+        )
+    elif name == "compute_stats":
+        gd.compute_stats(base_path, "xx", "Synthetic")
+    elif name == "compute_stats_cached":
+        # The cache is built by a first, untimed run.
+        cache_dir = base_path / gd.CACHE_DIR_NAME
+        gd.compute_stats(base_path, "xx", "Synthetic", cache_dir)
+        baseline_rss = peak_rss_mb()
+        start = time.perf_counter()
+        gd.compute_stats(base_path, "xx", "Synthetic", cache_dir)
+    else:
+        raise ValueError(f"Unknown function: {name}")
+    seconds = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "seconds": round(seconds, 3),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "baseline_rss_mb": round(baseline_rss, 1),
+            }
+        )
+    )
+
+
+def ensure_corpus(work_dir: Path, clips: int, splits: bool) -> Path:
+    """
+    Returns the directory of the synthetic locale with `clips` validated
+    clips, generating it unless an earlier run already did.
+    """
+    base_path = work_dir / f"{clips}{'-splits' if splits else ''}" / "xx"
+    marker = base_path / ".complete"
+    if not marker.exists():
+        generate_locale(base_path, clips, locale="xx", splits=splits)
+        marker.touch()
+    return base_path
+
+
+def benchmark(
+    work_dir: Path, sizes: List[int], functions: List[str], splits: bool
+) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Returns {size: {function: measurements}} for every size and function.
+    """
+    report = {}
+    for clips in sizes:
+        base_path = ensure_corpus(work_dir, clips, splits)
+        report[str(clips)] = {}
+        for name in functions:
+            logger.info(f"Running {name} on {clips:,} clips...")
+            child = subprocess.run(
+                [sys.executable, __file__, "--run", name, str(base_path)],
+                cwd=Path(__file__).parent,
+                capture_output=True,
+                text=True,
+                env={**os.environ, "PYTHONPATH": str(Path(__file__).parent)},
+            )
+            if child.returncode != 0:
+                logger.error(f"{name} failed on {clips:,} clips:")
+                logger.error(child.stderr.strip())
+                continue
+            result = json.loads(child.stdout.strip().splitlines()[-1])
+            logger.info(
+                f"  {result['seconds']:.2f}s, "
+                f"peak RSS {result['peak_rss_mb']:.0f} MB"
+            )
+            report[str(clips)][name] = result
+    return report
+
+
+def find_regressions(
+    report: Dict, baseline: Dict, tolerance: float
+) -> List[str]:
+    """
+    Returns a description of each measurement in `report` that exceeds the
+    same measurement in `baseline` by more than `tolerance` (a fraction).
+    """
+    regressions = []
+    for size, results in report.items():
+        for name, result in results.items():
+            before = baseline.get(size, {}).get(name)
+            if before is None:
+                continue
+            for key, min_delta in (
+                ("seconds", MIN_SECONDS_DELTA),
+                ("peak_rss_mb", MIN_RSS_DELTA_MB),
+            ):
+                delta = result[key] - before[key]
+                if delta > min_delta and delta > before[key] * tolerance:
+                    regressions.append(
+                        f"{name} on {int(size):,} clips: {key} "
+                        f"{before[key]} -> {result[key]}"
+                    )
+    return regressions
+
+
+def print_report(report: Dict) -> None:
+    print(f"{'clips':>12}  {'function':<24}{'seconds':>10}{'peak MB':>10}")
+    for size, results in report.items():
+        for name, result in results.items():
+            print(
+                f"{int(size):>12,}  {name:<24}{result['seconds']:>10.2f}"
+                f"{result['peak_rss_mb']:>10.0f}"
+            )
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--run":
+        run_function(sys.argv[2], Path(sys.argv[3]))
+        return
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(
+        description="Benchmark the stats functions of generate_datasheet.py "
+        "on synthetic corpora of increasing size."
+    )
+    parser.add_argument(
+        "--work_dir",
+        type=Path,
+        required=True,
+        help="Directory for the generated corpora, reused across runs.",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Numbers of validated clips to benchmark (up to 20M).",
+    )
+    parser.add_argument(
+        "--functions",
+        nargs="+",
+        choices=FUNCTIONS,
+        default=FUNCTIONS,
+        help="Functions to benchmark (default: all).",
+    )
+    parser.add_argument(
+        "--splits",
+        action="store_true",
+        help="Include train/dev/test/other.tsv and reported.tsv.",
+    )
+    parser.add_argument(
+        "--output", type=Path, help="Write the report to this JSON file."
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help="Report of an earlier run to check for regressions.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown or memory growth over the baseline, as a "
+        "fraction (default: 0.2).",
+    )
+    args = parser.parse_args()
+
+    report = benchmark(args.work_dir, args.sizes, args.functions, args.splits)
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        logger.info(f"Wrote the report to {args.output}")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Group-by operations over the dictionary-encoded columns of the columnar
+cache (see tsv_cache.py).
+
+Every function takes plain buffers of integer codes (`array`s or memory
+views) and returns plain Python containers. When NumPy is installed the
+work is vectorized with `bincount`, `digitize` and boolean masks, which is
+what makes cross-tabulations practical on English-scale data; otherwise the
+same results are computed with pure-Python loops.
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _np_codes(codes):
+    return np.frombuffer(codes, dtype=np.uint32)
+
+
+def code_counts(codes: Sequence[int], size: int) -> List[int]:
+    """
+    Returns the number of occurrences of each code in [0, size).
+    """
+    if np is not None:
+        return np.bincount(_np_codes(codes), minlength=size).tolist()
+    counts = [0] * size
+    for code, n in Counter(codes).items():
+        counts[code] = n
+    return counts
+
+
+def masked_code_counts(
+    codes: Sequence[int], size: int, mask_codes: Sequence[int], mask_code: int
+) -> List[int]:
+    """
+    Like `code_counts`, restricted to the rows where `mask_codes` equals
+    `mask_code`.
+    """
+    if np is not None:
+        mask = _np_codes(mask_codes) == mask_code
+        return np.bincount(_np_codes(codes)[mask], minlength=size).tolist()
+    counts = [0] * size
+    for code, m in zip(codes, mask_codes):
+        if m == mask_code:
+            counts[code] += 1
+    return counts
+
+
+def cross_counts(
+    a_codes: Sequence[int], a_size: int, b_codes: Sequence[int], b_size: int
+) -> Dict[Tuple[int, int], int]:
+    """
+    Returns the number of rows for each (a code, b code) pair that occurs.
+    """
+    if np is not None:
+        pairs = _np_codes(a_codes).astype(np.uint64) * b_size + _np_codes(
+            b_codes
+        )
+        table = np.bincount(pairs, minlength=a_size * b_size)
+        return {
+            divmod(int(pair), b_size): int(table[pair])
+            for pair in np.flatnonzero(table)
+        }
+    return dict(Counter(zip(a_codes, b_codes)))
+
+
+def masked_int_stats(
+    values: Optional[Sequence[int]],
+    mask_codes: Sequence[int],
+    mask_code: int,
+) -> Tuple[int, int, int]:
+    """
+    Returns the number of rows where `mask_codes` equals `mask_code`, the sum
+    of `values` over them and how many of those values are 0. Missing
+    `values` count as 0.
+    """
+    if np is not None:
+        mask = _np_codes(mask_codes) == mask_code
+        rows = int(mask.sum())
+        if values is None:
+            return rows, 0, rows
+        selected = np.frombuffer(values, dtype=np.int64)[mask]
+        return rows, int(selected.sum()), int((selected == 0).sum())
+    rows = total = zeros = 0
+    for i, code in enumerate(mask_codes):
+        if code != mask_code:
+            continue
+        value = values[i] if values is not None else 0
+        rows += 1
+        total += value
+        if value == 0:
+            zeros += 1
+    return rows, total, zeros
+
+
+def bin_counts(values: Sequence[int], edges: Sequence[int]) -> List[int]:
+    """
+    Returns how many `values` fall in each of the bins delimited by the
+    ascending lower `edges` of the second and later bins, i.e. bin `i` holds
+    the values `v` with `edges[i - 1] <= v < edges[i]`.
+    """
+    if np is not None:
+        values = np.fromiter(values, dtype=np.int64)
+        return np.bincount(
+            np.digitize(values, edges), minlength=len(edges) + 1
+        ).tolist()
+    counts = [0] * (len(edges) + 1)
+    for value in values:
+        i = 0
+        while i < len(edges) and value >= edges[i]:
+            i += 1
+        counts[i] += 1
+    return counts
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Splits a markdown datasheet into sections and splices new section bodies
+back in, so that an update only touches the statistical sections whose
+numbers actually changed.
+
+Like datasheet-postprocess.py, a section runs from one heading (of any
+level) to the next, so `## Text Corpus` and its `### Alphabet` subsection
+are separate sections. Headings inside fenced code blocks are ignored: an
+alphabet listing may well have a line starting with `#`.
+
+Only the generated blocks of a section are replaced: its tables, lists and
+code fences, and paragraphs that read the same as the rendered ones except
+for their numbers. The prose around them is kept. A section is left alone
+when its title differs from the rendered one (case included), when its body
+is empty (e.g. a parent heading of subsections), or when its blocks do not
+have the layout render_datasheet.py produces, such as a table with other
+column headers: those are hand-written.
+
+Whether a section is stale is decided on the content of those blocks rather
+than their exact text, so that a model-written section with the same figures
+is left alone: tables and bullet lists are compared by the numbers they
+contain, the alphabet by its set of characters, and accent tables by their
+labels. A sample of sentences is never replaced.
+"""
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+NUMBER_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+FENCES = ("```", "$$$")
+BULLETS = ("- ", "* ", "+ ")
+# `- **Label:** value`, the bullets of the text corpus figures.
+BULLET_LABEL_RE = re.compile(r"[-*+]\s+\*\*([^*]+?):?\*\*")
+# The alphabet used to be a code fence; it is now a table of symbol counts.
+LEGACY_LAYOUTS = {("table", ("symbol", "frequency")): {("fence",)}}
+
+
+class Section:
+    """
+    A heading and the lines up to the next heading. The text before the
+    first heading is a section with level 0 and no heading.
+    """
+
+    def __init__(
+        self, level: int, title: str, heading: Optional[str], lines: List[str]
+    ):
+        self.level = level
+        self.title = title
+        self.heading = heading
+        self.lines = lines
+
+    @property
+    def body(self) -> str:
+        return "\n".join(self.lines).strip()
+
+    def __str__(self) -> str:
+        if self.heading is None:
+            return "\n".join(self.lines)
+        return "\n".join([self.heading, *self.lines])
+
+
+def split_sections(markdown: str) -> List[Section]:
+    """
+    Splits `markdown` into sections in a single pass over its lines.
+    """
+    sections = [Section(0, "", None, [])]
+    in_fence = False
+    for line in markdown.split("\n"):
+        if line.lstrip().startswith(FENCES):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_RE.match(line)
+        if match:
+            sections.append(
+                Section(len(match.group(1)), match.group(2), line, [])
+            )
+        else:
+            sections[-1].lines.append(line)
+    return sections
+
+
+def join_sections(sections: Iterable[Section]) -> str:
+    """
+    Joins sections back into markdown; `join_sections(split_sections(text))`
+    gives `text` back unchanged.
+    """
+    # An empty level-0 section only means the text starts with a heading.
+    return "\n".join(
+        str(section)
+        for section in sections
+        if section.heading is not None or section.lines
+    )
+
+
+def find_section(sections: List[Section], title: str) -> Optional[Section]:
+    for section in sections:
+        if section.title == title:
+            return section
+    return None
+
+
+def filled_sections(
+    sections: List[Section], titles: Iterable[str]
+) -> List[str]:
+    """
+    Returns the `titles` that have a section in `sections` whose body is
+    neither empty nor a template placeholder (`{{...}}`), which is left to
+    render_datasheet.py.
+    """
+    return [title for title in titles if editable_section(sections, title)]
+
+
+def table_cells(body: str) -> List[List[str]]:
+    """
+    Returns the cells of each row of the markdown tables in `body`, without
+    the separator rows.
+    """
+    return [
+        [cell.strip() for cell in line.strip().strip("|").split("|")]
+        for line in body.split("\n")
+        if line.strip().startswith("|") and not _is_separator(line.strip())
+    ]
+
+
+def table_labels(body: str) -> List[str]:
+    """
+    Returns the first cell of each data row of the markdown tables in `body`.
+    """
+    lines = [line.strip() for line in body.split("\n")]
+    labels = []
+    for i, line in enumerate(lines):
+        if not line.startswith("|") or _is_separator(line):
+            continue
+        # A row followed by a separator is a table header.
+        if i + 1 < len(lines) and _is_separator(lines[i + 1]):
+            continue
+        labels.append(line.strip("|").split("|")[0].strip())
+    return labels
+
+
+def _is_separator(line: str) -> bool:
+    cell = line.strip("|").split("|")[0].strip()
+    return line.startswith("|") and bool(cell) and set(cell) <= set("-: ")
+
+
+def fenced_characters(body: str) -> Set[str]:
+    """
+    Returns the set of non-space characters inside the code fences of `body`.
+    """
+    chars = set()
+    in_fence = False
+    for line in body.split("\n"):
+        if line.lstrip().startswith(FENCES):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            chars.update(char for char in line if not char.isspace())
+    return chars
+
+
+class Block:
+    """
+    Lines `start` to `end` (exclusive) of a section: a table, a list, a code
+    fence or a paragraph.
+    """
+
+    def __init__(self, kind: str, start: int, lines: List[str]):
+        self.kind = kind
+        self.start = start
+        self.end = start + len(lines)
+        self.lines = lines
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    def layout(self) -> Tuple:
+        """
+        Returns what the block of a rendered section must share with the
+        block of an existing section to replace it.
+        """
+        if self.kind == "table":
+            header = table_cells(self.lines[0])[0]
+            return ("table", tuple(cell.strip("*").lower() for cell in header))
+        if self.kind == "list":
+            labels = [
+                BULLET_LABEL_RE.match(line.strip()) for line in self.lines
+            ]
+            if all(labels):
+                return ("list", frozenset(m.group(1) for m in labels))
+            return ("list", None)
+        if self.kind == "paragraph":
+            words = NUMBER_RE.sub("#", " ".join(self.lines)).split()
+            return ("paragraph", " ".join(words))
+        return (self.kind,)
+
+    def replaces(self, existing: "Block") -> bool:
+        """
+        Returns whether this rendered block has the layout of `existing`.
+        """
+        layout, existing_layout = self.layout(), existing.layout()
+        if existing_layout in LEGACY_LAYOUTS.get(layout, ()):
+            return True
+        if layout[0] == "list" and existing_layout[0] == "list":
+            # Rendered figure lists may have gained new bullets.
+            if layout[1] is None or existing_layout[1] is None:
+                return layout[1] == existing_layout[1]
+            return bool(existing_layout[1]) and existing_layout[1] <= layout[1]
+        return layout == existing_layout
+
+
+def split_blocks(lines: List[str]) -> List[Block]:
+    """
+    Splits the lines of a section body into blocks, skipping blank lines.
+    """
+    blocks = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        start = i
+        if not line:
+            i += 1
+            continue
+        if line.startswith(FENCES):
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(FENCES):
+                i += 1
+            i = min(i + 1, len(lines))
+            kind = "fence"
+        elif line.startswith("|"):
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                i += 1
+            kind = "table"
+        elif line.startswith(BULLETS):
+            i += 1
+            # Items and their indented continuation lines.
+            while i < len(lines) and (
+                lines[i].strip().startswith(BULLETS)
+                or (lines[i].startswith(" ") and lines[i].strip())
+            ):
+                i += 1
+            kind = "list"
+        else:
+            i += 1
+            while (
+                i < len(lines)
+                and lines[i].strip()
+                and not lines[i].strip().startswith(("|", *FENCES, *BULLETS))
+            ):
+                i += 1
+            kind = "paragraph"
+        blocks.append(Block(kind, start, lines[start:i]))
+    return blocks
+
+
+def match_blocks(
+    section: Section, body: str
+) -> Optional[List[Tuple[Block, Block]]]:
+    """
+    Pairs the blocks of the rendered `body` with the blocks of `section` they
+    replace, in order. Returns None if a table, list or fence of `body` has
+    no counterpart, i.e. the section does not have the rendered layout;
+    rendered paragraphs without one (reworded prose) are skipped.
+    """
+    existing = split_blocks(section.lines)
+    pairs = []
+    pos = 0
+    for block in split_blocks(body.strip().split("\n")):
+        for i in range(pos, len(existing)):
+            if block.replaces(existing[i]):
+                pairs.append((existing[i], block))
+                pos = i + 1
+                break
+        else:
+            if block.kind != "paragraph":
+                return None
+    return pairs or None
+
+
+def section_fingerprint(title: str, body: str):
+    """
+    Returns what must change for the section to be considered stale.
+    """
+    if title == "Alphabet":
+        if any(line.lstrip().startswith(FENCES) for line in body.split("\n")):
+            return fenced_characters(body)
+        return (sorted(table_labels(body)), _numbers(body))
+    if title == "Sample Sentences":
+        # A random sample does not go stale.
+        return None
+    if title == "Accent":
+        return (sorted(table_labels(body)), _numbers(body))
+    return _numbers(body)
+
+
+def editable_section(sections: List[Section], title: str) -> Optional[Section]:
+    """
+    Returns the section titled `title` if its body may hold generated
+    blocks: it is neither empty nor a template placeholder (`{{...}}`, which
+    is left to render_datasheet.py).
+    """
+    section = find_section(sections, title)
+    if section is None or not section.body or "{{" in section.body:
+        return None
+    return section
+
+
+def stale_sections(
+    sections: List[Section], rendered: Mapping[str, str]
+) -> Dict[str, str]:
+    """
+    Returns the subset of `rendered` (title -> new body) whose section has
+    the rendered layout in `sections` and different figures.
+    """
+    stale = {}
+    for title, body in rendered.items():
+        section = editable_section(sections, title)
+        pairs = match_blocks(section, body) if section else None
+        if pairs is None:
+            continue
+        old = "\n".join(existing.text for existing, _ in pairs)
+        new = "\n".join(block.text for _, block in pairs)
+        if section_fingerprint(title, old) != section_fingerprint(title, new):
+            stale[title] = body
+    return stale
+
+
+def splice(sections: List[Section], bodies: Mapping[str, str]) -> None:
+    """
+    Replaces the generated blocks of the sections named in `bodies` with the
+    blocks of the new bodies, keeping the rest of each section.
+    """
+    for title, body in bodies.items():
+        section = editable_section(sections, title)
+        pairs = match_blocks(section, body) if section else None
+        for existing, block in reversed(pairs or []):
+            section.lines[existing.start : existing.end] = block.lines
+
+
+def _numbers(body: str) -> List[str]:
+    return sorted(
+        number.replace(",", "") for number in NUMBER_RE.findall(body)
+    )
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+A compact, memory-mapped index of Common Voice clip durations.
+
+clip_durations.tsv maps every clip file name to its duration in milliseconds.
+Holding it in a Python dict costs well over a hundred bytes per clip, which
+for the largest locales means several GB of RAM before any statistics are
+computed. This module stores the same mapping as two parallel arrays:
+
+    * the 64-bit BLAKE2b hashes of the clip names, sorted ascending, and
+    * the uint32 durations, in the same order,
+
+i.e. 12 bytes per clip. The arrays are written once to an index file next to
+the corpus and memory-mapped on later runs, so opening the index of even the
+largest locale takes milliseconds. Lookups are binary searches over the
+mapped hashes; when NumPy is installed, batches of lookups are vectorized
+with `numpy.searchsorted`.
+
+The index file is rebuilt automatically whenever the size or modification
+time of the source TSV changes.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from tsv_shards import iter_shard_rows, plan_shards
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# magic, source size, source mtime (ns), source rows, index entries
+HEADER = struct.Struct("<8sQqQQ")
+MAGIC = b"CVDIX1" + (b"L\0" if sys.byteorder == "little" else b"B\0")
+INDEX_FILE_NAME = "clip_durations.idx"
+
+logger = logging.getLogger(__name__)
+
+
+def clip_hash(clip: str) -> int:
+    """
+    Returns the stable 64-bit hash of a clip file name used as index key.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(clip.encode("utf-8"), digest_size=8).digest(),
+        "little",
+    )
+
+
+class ClipDurationIndex:
+    """
+    Maps clip file names to durations in milliseconds.
+
+    Behaves like a read-only `dict` for `get()` and `len()`, and adds batch
+    lookups (`lookup_hashes`, `sum_durations`) for whole columns of clip
+    paths.
+    """
+
+    def __init__(
+        self,
+        hashes: Sequence[int],
+        durations: Sequence[int],
+        row_count: int,
+        source: Optional[Tuple[int, int]] = None,
+        _mmap: Optional[mmap.mmap] = None,
+    ):
+        self.hashes = hashes
+        self.durations = durations
+        self.row_count = row_count
+        self.source = source
+        self._mmap = _mmap
+        self._np_hashes = None
+        self._np_durations = None
+        if np is not None:
+            self._np_hashes = np.frombuffer(hashes, dtype=np.uint64)
+            self._np_durations = np.frombuffer(durations, dtype=np.uint32)
+
+    # --- construction ---
+
+    @classmethod
+    def build(
+        cls, pairs: Iterable[Tuple[str, int]], source=None
+    ) -> "ClipDurationIndex":
+        """
+        Builds an in-memory index from (clip, duration_ms) pairs. As with a
+        dict, the last duration seen for a clip wins.
+        """
+        hashes = array("Q")
+        durations = array("I")
+        for clip, duration in pairs:
+            hashes.append(clip_hash(clip))
+            durations.append(duration)
+        return cls.from_arrays(hashes, durations, source)
+
+    @classmethod
+    def from_arrays(
+        cls, hashes: array, durations: array, source=None
+    ) -> "ClipDurationIndex":
+        """
+        Builds an in-memory index from parallel arrays of clip hashes and
+        durations in file order.
+        """
+        row_count = len(hashes)
+
+        if np is not None:
+            np_hashes = np.frombuffer(hashes, dtype=np.uint64)
+            order = np.argsort(np_hashes, kind="stable")
+            sorted_hashes = np_hashes[order]
+            sorted_durations = np.frombuffer(durations, dtype=np.uint32)[order]
+            # Keep the last of each run of equal hashes.
+            keep = np.ones(len(order), dtype=bool)
+            keep[:-1] = sorted_hashes[:-1] != sorted_hashes[1:]
+            hashes = array("Q", sorted_hashes[keep].tobytes())
+            durations = array("I", sorted_durations[keep].tobytes())
+        else:
+            order = sorted(range(row_count), key=hashes.__getitem__)
+            sorted_hashes = array("Q")
+            sorted_durations = array("I")
+            for i in order:
+                if sorted_hashes and sorted_hashes[-1] == hashes[i]:
+                    sorted_durations[-1] = durations[i]
+                else:
+                    sorted_hashes.append(hashes[i])
+                    sorted_durations.append(durations[i])
+            hashes, durations = sorted_hashes, sorted_durations
+
+        return cls(hashes, durations, row_count, source)
+
+    @classmethod
+    def from_tsv(cls, tsv_path: Path, workers: int = 1) -> "ClipDurationIndex":
+        """
+        Builds an in-memory index from a clip_durations.tsv file, hashing
+        newline-aligned shards of large files on up to `workers` processes.
+        """
+        logger.info(f"Building clip duration index from {tsv_path.name}...")
+        source = _source_signature(tsv_path)
+        header, ranges = plan_shards(tsv_path, workers)
+        if not header:
+            return cls.build((), source)
+        columns = (header.index("clip"), header.index("duration[ms]"))
+        if len(ranges) <= 1:
+            parts = [_hash_shard(tsv_path, *r, *columns) for r in ranges]
+        else:
+            with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+                parts = list(
+                    pool.map(
+                        _hash_shard,
+                        repeat(tsv_path),
+                        *zip(*ranges),
+                        repeat(columns[0]),
+                        repeat(columns[1]),
+                    )
+                )
+        hashes = array("Q")
+        durations = array("I")
+        for part_hashes, part_durations in parts:
+            hashes.extend(part_hashes)
+            durations.extend(part_durations)
+        return cls.from_arrays(hashes, durations, source)
+
+    def save(self, index_path: Path) -> None:
+        """
+        Writes the index to `index_path` atomically.
+        """
+        size, mtime_ns = self.source or (0, 0)
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC, size, mtime_ns, self.row_count, len(self.hashes)
+                )
+            )
+            f.write(memoryview(self.hashes).cast("B"))
+            f.write(memoryview(self.durations).cast("B"))
+        os.replace(tmp_path, index_path)
+
+    @classmethod
+    def load(
+        cls, index_path: Path, tsv_path: Path
+    ) -> Optional["ClipDurationIndex"]:
+        """
+        Memory-maps a previously saved index. Returns None if the file is
+        missing, corrupt or older than `tsv_path`.
+        """
+        try:
+            with open(index_path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return None
+        if len(mm) < HEADER.size:
+            mm.close()
+            return None
+        magic, size, mtime_ns, row_count, entries = HEADER.unpack_from(mm)
+        source = (size, mtime_ns)
+        expected_size = HEADER.size + entries * 12
+        if (
+            magic != MAGIC
+            or len(mm) != expected_size
+            or source != _source_signature(tsv_path)
+        ):
+            mm.close()
+            return None
+        view = memoryview(mm)
+        keys_end = HEADER.size + entries * 8
+        hashes = view[HEADER.size : keys_end].cast("Q")
+        durations = view[keys_end:expected_size].cast("I")
+        return cls(hashes, durations, row_count, source, mm)
+
+    @classmethod
+    def open(
+        cls,
+        tsv_path: Path,
+        cache_dir: Optional[Path] = None,
+        workers: int = 1,
+    ) -> "ClipDurationIndex":
+        """
+        Returns the index for `tsv_path`, memory-mapping the cached copy in
+        `cache_dir` when it is up to date and (re)building it otherwise. An
+        absent TSV yields an empty index.
+        """
+        if not tsv_path.exists():
+            logger.warning(
+                f"Optional file not found: {tsv_path}. Proceeding without it."
+            )
+            return cls.build(())
+        if cache_dir is None:
+            return cls.from_tsv(tsv_path, workers)
+
+        index_path = cache_dir / INDEX_FILE_NAME
+        index = cls.load(index_path, tsv_path)
+        if index is not None:
+            logger.info(f"Memory-mapped clip duration index {index_path}")
+            return index
+        index = cls.from_tsv(tsv_path, workers)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            index.save(index_path)
+            logger.info(f"Saved clip duration index to {index_path}")
+        except OSError as e:
+            logger.warning(
+                f"Could not save clip duration index to {index_path}: {e}"
+            )
+        return index
+
+    # --- lookups ---
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._np_hashes = self._np_durations = None
+            self.hashes.release()
+            self.durations.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def get(self, clip: str, default: int = 0) -> int:
+        """
+        Returns the duration of a single clip in milliseconds.
+        """
+        h = clip_hash(clip)
+        i = bisect_left(self.hashes, h)
+        if i < len(self.hashes) and self.hashes[i] == h:
+            return self.durations[i]
+        return default
+
+    def lookup_hashes(self, hashes: Sequence[int]) -> List[int]:
+        """
+        Returns the durations for a batch of clip hashes; unknown clips map
+        to 0.
+        """
+        if self._np_hashes is not None:
+            return self._np_lookup(
+                np.asarray(hashes, dtype=np.uint64)
+            ).tolist()
+        keys, durations, n = self.hashes, self.durations, len(self.hashes)
+        out = []
+        for h in hashes:
+            i = bisect_left(keys, h)
+            out.append(durations[i] if i < n and keys[i] == h else 0)
+        return out
+
+    def sum_hashes(self, hashes: Sequence[int]) -> int:
+        """
+        Returns the total duration in milliseconds of a batch of clip hashes.
+        """
+        if self._np_hashes is not None:
+            found = self._np_lookup(np.asarray(hashes, dtype=np.uint64))
+            return int(found.sum(dtype=np.uint64))
+        return sum(self.lookup_hashes(hashes))
+
+    def sum_durations(self, clips: Iterable[str]) -> int:
+        """
+        Returns the total duration in milliseconds of a batch of clip names.
+        """
+        return self.sum_hashes([clip_hash(clip) for clip in clips])
+
+    def _np_lookup(self, queries):
+        keys = self._np_hashes
+        if len(keys) == 0:
+            return np.zeros(len(queries), dtype=np.uint32)
+        positions = np.searchsorted(keys, queries)
+        positions[positions == len(keys)] = 0
+        hit = keys[positions] == queries
+        return np.where(hit, self._np_durations[positions], 0)
+
+
+def _hash_shard(
+    tsv_path: Path, start: int, end: int, clip_col: int, duration_col: int
+) -> Tuple[array, array]:
+    hashes = array("Q")
+    durations = array("I")
+    for row in iter_shard_rows(tsv_path, start, end):
+        if row:
+            hashes.append(clip_hash(row[clip_col]))
+            durations.append(int(row[duration_col]))
+    return hashes, durations
+
+
+def _source_signature(tsv_path: Path) -> Tuple[int, int]:
+    st = tsv_path.stat()
+    return (st.st_size, st.st_mtime_ns)
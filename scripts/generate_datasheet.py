@@ -6,41 +6,140 @@ dataset using the Google Gemini Pro API.
 This script performs the following steps:
 1.  Calculates detailed statistics from a Common Voice dataset directory,
     including clip and sentence counts, recording hours, demographic data,
-    contributor statistics, and text corpus analysis.
+    contributor statistics, text corpus analysis, and the clips, hours and
+    speakers of each train/dev/test/other split. Each TSV is streamed
+    exactly once through a set of accumulators, so memory is bounded by the
+    number of distinct contributors and accents rather than by the number of
+    rows.
 2.  Optionally reads an existing markdown datasheet for the same language.
 3.  Constructs a highly specific, detailed prompt for the Gemini Pro model,
     bundling the new statistics and, if applicable, the existing markdown.
+    The statistical tables are rendered locally for the model to copy, and
+    the data is compacted (most frequent accents only, compact JSON) to fit
+    a per-locale token budget (prompt_payload.py).
 4.  Instructs the AI to either generate a new datasheet from scratch or
     intelligently update the existing one by replacing only the auto-generated
-    statistical sections while preserving manual, human-written content.
+    statistical sections while preserving manual, human-written content. By
+    default an existing datasheet is instead updated section by section: only
+    the statistical sections whose figures changed are re-rendered locally,
+    and only new accents are sent to the AI for translation.
 5.  The prompt includes modern calls to action reflecting the current Common
     Voice contribution workflow (Speak, Listen, Write, Review) and adds
     other engaging content like a "Fun Fact" about the language.
-6.  Outputs both the raw JSON data sent to the API and the final,
-    AI-generated markdown to standard output.
+6.  Logs the compacted data sent to the API with its token estimate, and
+    outputs both the gathered statistics and the final, AI-generated
+    markdown to standard output.
 """
 import argparse
+import asyncio
 import csv
 import json
 import logging
 import os
 import random
 import sys
+import tarfile
+from array import array
 from collections import Counter
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path, PurePosixPath
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from column_ops import (
+    bin_counts,
+    cross_counts,
+    masked_code_counts,
+    masked_int_stats,
+)
+from datasheet_sections import (
+    editable_section,
+    filled_sections,
+    join_sections,
+    splice,
+    split_sections,
+    stale_sections,
+    table_cells,
+    table_labels,
+)
+from duration_index import (
+    INDEX_FILE_NAME as DURATION_INDEX_FILE_NAME,
+    ClipDurationIndex,
+    clip_hash,
+)
+from llm_dispatch import (
+    DEFAULT_MODEL,
+    Dispatcher,
+    LLMError,
+    ResponseCache,
+    make_client,
+)
+from locale_names import locale_name
+from prompt_payload import (
+    DEFAULT_TOKEN_BUDGET,
+    TOP_ACCENTS,
+    PromptLimits,
+    PromptPayload,
+    estimate_tokens,
+    fit_payload,
+)
+from release_state import (
+    LineIndex,
+    StaleStateError,
+    collect_lines,
+    diff_lines,
+    index_lines,
+    load_state,
+    save_state,
+)
+from render_datasheet import markdown_table, render_stat_sections, top_counts
+from stage_metrics import StageReport, profiled
+from stats_store import StatsStore, release_from_path
+from tsv_cache import ColumnarTable, load_table, source_signature
+from tsv_shards import iter_shard_dicts, plan_shards
 
 try:
-    from google import genai
+    import numpy as np
 except ImportError:
-    print("Error: The new Google GenAI SDK ('google-genai') is not installed.")
-    print("Please install it using: pip install google-genai")
-    sys.exit(1)
+    np = None
 
 # --- SCRIPT CONSTANTS ---
 SENTENCE_THRESHOLD = 1000
 AVG_CLIPS_THRESHOLD = 5
 CSV_FIELD_SIZE_LIMIT = 10000000
+DURATION_LOOKUP_BATCH = 65536
+# Seed of the sample sentences, so that reruns on the same data produce the
+# same sample (and the same prompt, which the response cache relies on).
+SAMPLE_SEED = 20250917
+MASK_64 = (1 << 64) - 1
+CACHE_DIR_NAME = ".datasheet_cache"
+# Lower bounds of the clips-per-contributor bins after "1-10".
+CONTRIBUTOR_BIN_EDGES = (11, 51, 101, 501)
+ACCENT_TRANSLATION_TITLE = "English Translation of Accents"
+# The train/dev/test splits of the validated clips and the clips still
+# awaiting validation; train, dev and test never share a speaker.
+SPLIT_FILES = ("train.tsv", "dev.tsv", "test.tsv", "other.tsv")
+DISJOINT_SPLITS = ("train", "dev", "test")
+LOCALE_TSV_FILES = (
+    "validated.tsv",
+    "invalidated.tsv",
+    "clip_durations.tsv",
+    "validated_sentences.tsv",
+    "unvalidated_sentences.tsv",
+    *SPLIT_FILES,
+    "reported.tsv",
+)
 
 # --- Configure Logging ---
 logger = logging.getLogger(__name__)
@@ -49,117 +148,1412 @@ logger = logging.getLogger(__name__)
 # --- DATA LOADING ---
 
 
-def read_tsv(file_path: Path) -> List[Dict[str, str]]:
+def iter_tsv(file_path: Path) -> Iterator[Dict[str, str]]:
     """
-    Opens and reads a tab-separated values (TSV) file from the given path.
+    Lazily yields the rows of a tab-separated values (TSV) file, one dict at a
+    time, so that callers never hold the whole file in memory.
     """
-    logger.info(f"Reading data from {file_path.name}...")
+    logger.info(f"Streaming data from {file_path.name}...")
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return list(csv.DictReader(f, delimiter="\t"))
+        f = open(file_path, "r", encoding="utf-8")
     except FileNotFoundError:
         logger.warning(
             f"Optional file not found: {file_path}. Proceeding without it."
         )
-        return []
-    except Exception as e:
-        logger.error(
-            f"Fatal: An error occurred while reading {file_path}: {e}"
+        return
+    with f:
+        try:
+            yield from csv.DictReader(f, delimiter="\t")
+        except Exception as e:
+            logger.error(
+                f"Fatal: An error occurred while reading {file_path}: {e}"
+            )
+            sys.exit(1)
+
+
+def read_tsv(file_path: Path) -> List[Dict[str, str]]:
+    """
+    Opens and reads a tab-separated values (TSV) file from the given path.
+    """
+    return list(iter_tsv(file_path))
+
+
+# --- STREAMING ACCUMULATORS ---
+#
+# Each accumulator updates its statistic one row at a time through `add()`,
+# or one cached `ColumnarTable` at a time through `add_table()`. `columns`
+# names the TSV columns (and their cache encoding) the accumulator reads.
+# Accumulators filled from disjoint parts of a file (e.g. in worker
+# processes) are combined with `merge()`; `subtract()` takes out the rows an
+# accumulator has seen, which lets a saved state (`to_state()` /
+# `restore()`) be moved forward by only the rows that changed.
+
+
+class Reservoir:
+    """
+    A fixed-size uniform random sample of a stream: the items whose keys, a
+    seeded hash of their 64-bit ids, are the `size` smallest (bottom-k
+    sampling). The sample depends only on the seed and the set of ids, not
+    on the order of the stream or on how it was split into shards, so every
+    machine draws the same sample from the same data. The sample is `stale`
+    once items it holds were taken out of the stream, and must then be
+    redrawn.
+    """
+
+    def __init__(self, size: int, seed: int):
+        self.size = size
+        self.seed = seed
+        self.keys = []
+        self.items = []
+        self.seen = 0
+        self.stale = False
+        # Set on reservoirs spawned to take items back out: the keys of the
+        # sample they were spawned from, and whether any was offered.
+        self.watched = frozenset()
+        self.watched_seen = False
+
+    def offer(self, item_id: int, item: Any) -> None:
+        self.seen += 1
+        key = sample_key(item_id, self.seed)
+        if key in self.watched:
+            self.watched_seen = True
+        if len(self.keys) < self.size or key < self.keys[-1]:
+            self._keep([(key, item)])
+
+    def offer_many(self, item_ids: Sequence[int], item_at) -> None:
+        """
+        Offers the next items of the stream, given their ids; `item_at(i)`
+        returns the i-th of them and is only called for items that enter
+        the sample.
+        """
+        self.seen += len(item_ids)
+        if self.size <= 0:
+            return
+        if np is None:
+            keys = [sample_key(item_id, self.seed) for item_id in item_ids]
+            if self.watched and not self.watched.isdisjoint(keys):
+                self.watched_seen = True
+            ranked = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keep([(keys[i], item_at(i)) for i in ranked[: self.size]])
+            return
+        keys = sample_keys(np.asarray(item_ids, dtype=np.uint64), self.seed)
+        if (
+            self.watched
+            and np.isin(keys, np.fromiter(self.watched, dtype=np.uint64)).any()
+        ):
+            self.watched_seen = True
+        candidates = np.arange(len(keys))
+        if len(self.keys) == self.size:
+            candidates = np.flatnonzero(keys < np.uint64(self.keys[-1]))
+        if len(candidates) > self.size:
+            smallest = np.argpartition(keys[candidates], self.size - 1)
+            candidates = candidates[smallest[: self.size]]
+        self._keep([(int(keys[i]), item_at(int(i))) for i in candidates])
+
+    def merge(self, other: "Reservoir") -> None:
+        """
+        Combines this sample with one of the same seed drawn from a disjoint
+        stream, yielding the sample of both streams together.
+        """
+        self.seen += other.seen
+        self.watched_seen = self.watched_seen or other.watched_seen
+        self._keep(list(zip(other.keys, other.items)))
+
+    def subtract(self, other: "Reservoir") -> None:
+        """
+        Accounts for the items of `other`, a reservoir spawned from this one,
+        taken out of the stream; the sample becomes stale if it held any.
+        """
+        self.seen -= other.seen
+        if other.watched_seen:
+            self.stale = True
+
+    def spawn(self) -> "Reservoir":
+        """
+        Returns an empty reservoir of the same size and seed, watching for
+        the items of this one's sample.
+        """
+        spawned = Reservoir(self.size, self.seed)
+        spawned.watched = frozenset(self.keys)
+        return spawned
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "keys": self.keys,
+            "items": self.items,
+            "seen": self.seen,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.seed = state["seed"]
+        self.keys = list(state["keys"])
+        self.items = list(state["items"])
+        self.seen = state["seen"]
+
+    def _keep(self, entries: List[Tuple[int, Any]]) -> None:
+        """
+        Adds (key, item) entries to the sample and keeps the `size` with the
+        smallest keys, in key order.
+        """
+        kept = sorted(
+            [*zip(self.keys, self.items), *entries], key=lambda e: e[0]
+        )[: self.size]
+        self.keys = [key for key, _ in kept]
+        self.items = [item for _, item in kept]
+
+
+def sample_key(item_id: int, seed: int) -> int:
+    """
+    Returns the sample key of an item id: the splitmix64 finalizer of the
+    id mixed with the seed, a bijection on 64-bit integers.
+    """
+    z = (item_id ^ seed) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+def sample_keys(item_ids, seed: int):
+    """
+    Returns `sample_key()` of each id of a uint64 numpy array.
+    """
+    z = item_ids ^ np.uint64(seed & MASK_64)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class Accumulator:
+    """
+    Base class of the accumulators: no columns, and `spawn()` returns an
+    empty accumulator of the same kind.
+    """
+
+    columns = {}
+
+    def spawn(self) -> "Accumulator":
+        return type(self)()
+
+
+class HoursAccumulator(Accumulator):
+    """
+    Counts clip rows and sums their durations as the rows stream past.
+
+    `durations` is either a plain mapping or a `ClipDurationIndex`; with the
+    latter, clip paths are looked up in vectorized batches. It may also be
+    None when the durations are not known yet (e.g. when clip_durations.tsv
+    comes after validated.tsv in an archive): the clip hashes are then kept
+    until `set_durations()` is called.
+    """
+
+    columns = {"path": "hash"}
+
+    def __init__(self, durations: Optional[Mapping[str, int]] = None):
+        self.durations = durations
+        self.count = 0
+        self.total_ms = 0
+        self._pending = []
+        self._deferred = array("Q")
+
+    def add(self, row: Dict[str, str]) -> None:
+        self.count += 1
+        self._pending.append(row["path"])
+        if len(self._pending) >= DURATION_LOOKUP_BATCH:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        if self.durations is None:
+            self._deferred.extend(clip_hash(path) for path in self._pending)
+        elif hasattr(self.durations, "sum_durations"):
+            self.total_ms += self.durations.sum_durations(self._pending)
+        else:
+            self.total_ms += sum(
+                self.durations.get(path, 0) for path in self._pending
+            )
+        self._pending = []
+
+    def add_table(self, table: ColumnarTable) -> None:
+        self.count += table.num_rows
+        if "path" not in table:
+            return
+        if self.durations is None:
+            self._deferred.extend(table["path"])
+        else:
+            self.total_ms += self.durations.sum_hashes(table["path"])
+
+    def merge(self, other: "HoursAccumulator") -> None:
+        other.flush()
+        self.count += other.count
+        self.total_ms += other.total_ms
+        if other._deferred:
+            if self.durations is None:
+                self._deferred.extend(other._deferred)
+            else:
+                self.total_ms += self.durations.sum_hashes(other._deferred)
+
+    def subtract(self, other: "HoursAccumulator") -> None:
+        other.flush()
+        self.count -= other.count
+        self.total_ms -= other.total_ms
+
+    def to_state(self) -> Dict[str, Any]:
+        self.flush()
+        return {"count": self.count, "total_ms": self.total_ms}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.total_ms = state["total_ms"]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Indexes are memory-mapped and stay behind; unresolved clips travel
+        # as hashes.
+        self.flush()
+        return {**self.__dict__, "durations": None}
+
+    def set_durations(self, durations: ClipDurationIndex) -> None:
+        self.durations = durations
+        if self._deferred:
+            self.total_ms += durations.sum_hashes(self._deferred)
+            self._deferred = array("Q")
+
+    def result(self) -> float:
+        self.flush()
+        return self.total_ms / (1000 * 60 * 60)
+
+
+class DemographicsAccumulator(Accumulator):
+    """
+    Tallies the self-reported gender, age and accent of each clip.
+    """
+
+    columns = {"gender": "dict", "age": "dict", "accents": "dict"}
+
+    def __init__(self):
+        self.gender = Counter()
+        self.age = Counter()
+        self.accent = Counter()
+
+    def add(self, row: Dict[str, str]) -> None:
+        if gender := row.get("gender"):
+            self.gender[gender] += 1
+        if age := row.get("age"):
+            self.age[age] += 1
+        if accent := row.get("accents"):
+            self.accent[accent] += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        for column, counter in (
+            ("gender", self.gender),
+            ("age", self.age),
+            ("accents", self.accent),
+        ):
+            if column in table:
+                for value, n in table[column].counts().items():
+                    if value:
+                        counter[value] += n
+
+    def merge(self, other: "DemographicsAccumulator") -> None:
+        self.gender.update(other.gender)
+        self.age.update(other.age)
+        self.accent.update(other.accent)
+
+    def subtract(self, other: "DemographicsAccumulator") -> None:
+        self.gender = _subtract_counts(self.gender, other.gender)
+        self.age = _subtract_counts(self.age, other.age)
+        self.accent = _subtract_counts(self.accent, other.accent)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"gender": self.gender, "age": self.age, "accent": self.accent}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.gender = Counter(state["gender"])
+        self.age = Counter(state["age"])
+        self.accent = Counter(state["accent"])
+
+    def result(self) -> Dict[str, Counter]:
+        return {"gender": self.gender, "age": self.age, "accent": self.accent}
+
+
+class CrossTabAccumulator(Accumulator):
+    """
+    Counts the clips for each combination of the values of two demographic
+    columns (e.g. gender x age). Clips where either value is missing are
+    left out.
+    """
+
+    def __init__(self, row_column: str, col_column: str):
+        self.row_column = row_column
+        self.col_column = col_column
+        self.columns = {row_column: "dict", col_column: "dict"}
+        self.counts = Counter()
+
+    def add(self, row: Dict[str, str]) -> None:
+        a = row.get(self.row_column)
+        b = row.get(self.col_column)
+        if a and b:
+            self.counts[a, b] += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        if self.row_column not in table or self.col_column not in table:
+            return
+        rows, cols = table[self.row_column], table[self.col_column]
+        pairs = cross_counts(
+            rows.codes, len(rows.vocab), cols.codes, len(cols.vocab)
         )
-        sys.exit(1)
+        for (a, b), n in pairs.items():
+            a, b = rows.vocab[a], cols.vocab[b]
+            if a and b:
+                self.counts[a, b] += n
+
+    def merge(self, other: "CrossTabAccumulator") -> None:
+        self.counts.update(other.counts)
+
+    def subtract(self, other: "CrossTabAccumulator") -> None:
+        self.counts = _subtract_counts(self.counts, other.counts)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"counts": [[a, b, n] for (a, b), n in self.counts.items()]}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.counts = Counter({(a, b): n for a, b, n in state["counts"]})
+
+    def spawn(self) -> "CrossTabAccumulator":
+        return CrossTabAccumulator(self.row_column, self.col_column)
+
+    def result(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns {row value: {column value: clips}}, sorted by value.
+        """
+        table = {}
+        for (a, b), n in sorted(self.counts.items()):
+            table.setdefault(a, {})[b] = n
+        return table
+
+
+class ContributorAccumulator(Accumulator):
+    """
+    Counts clips per contributor. Memory grows with the number of distinct
+    contributors, not with the number of clips.
+    """
+
+    columns = {"client_id": "dict"}
+
+    def __init__(self):
+        self.clips_per_contributor = Counter()
+
+    def add(self, row: Dict[str, str]) -> None:
+        self.clips_per_contributor[row["client_id"]] += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        self.clips_per_contributor.update(table["client_id"].counts())
+
+    def merge(self, other: "ContributorAccumulator") -> None:
+        self.clips_per_contributor.update(other.clips_per_contributor)
+
+    def subtract(self, other: "ContributorAccumulator") -> None:
+        self.clips_per_contributor = _subtract_counts(
+            self.clips_per_contributor, other.clips_per_contributor
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"clips_per_contributor": self.clips_per_contributor}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.clips_per_contributor = Counter(state["clips_per_contributor"])
+
+    def result(self) -> Dict[str, int]:
+        return bin_contributor_counts(self.clips_per_contributor.values())
+
+
+class ClipTextAccumulator(Accumulator):
+    """
+    Collects a histogram of the characters, length statistics and a uniform
+    random sample of the sentences read out in the validated clips. Clips
+    are sampled by their path with a reservoir seeded with `seed`, or with a
+    random seed when it is None.
+    """
+
+    columns = {"sentence": "dict", "path": "hash"}
+
+    def __init__(
+        self, sample_size: int = 5, seed: Optional[int] = SAMPLE_SEED
+    ):
+        self.count = 0
+        self.total_tokens = 0
+        self.total_chars = 0
+        self.characters = Counter()
+        self.reservoir = Reservoir(
+            sample_size, seed if seed is not None else random.getrandbits(64)
+        )
+
+    def add(self, row: Dict[str, str]) -> None:
+        if "sentence" not in row:
+            return
+        sentence = row["sentence"]
+        self.count += 1
+        self.total_tokens += len(sentence.split())
+        self.total_chars += len(sentence)
+        self.characters.update(sentence)
+        self.reservoir.offer(clip_hash(row.get("path") or sentence), sentence)
+
+    def add_table(self, table: ColumnarTable) -> None:
+        if "sentence" not in table:
+            return
+        column = table["sentence"]
+        # Sentences are recorded many times over, so the per-sentence work is
+        # done once per distinct sentence and weighted by its clip count.
+        for code, n in column.code_counts().items():
+            sentence = column.vocab[code]
+            self.total_tokens += n * len(sentence.split())
+            self.total_chars += n * len(sentence)
+            for char, k in Counter(sentence).items():
+                self.characters[char] += n * k
+        self.count += table.num_rows
+        codes, vocab = column.codes, column.vocab
+        if "path" in table:
+            ids = table["path"]
+        else:
+            vocab_ids = [clip_hash(sentence) for sentence in vocab]
+            ids = [vocab_ids[code] for code in codes]
+        self.reservoir.offer_many(ids, lambda i: vocab[codes[i]])
+
+    def merge(self, other: "ClipTextAccumulator") -> None:
+        self.count += other.count
+        self.total_tokens += other.total_tokens
+        self.total_chars += other.total_chars
+        self.characters.update(other.characters)
+        self.reservoir.merge(other.reservoir)
+
+    def subtract(self, other: "ClipTextAccumulator") -> None:
+        self.count -= other.count
+        self.total_tokens -= other.total_tokens
+        self.total_chars -= other.total_chars
+        self.characters = _subtract_counts(self.characters, other.characters)
+        self.reservoir.subtract(other.reservoir)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_tokens": self.total_tokens,
+            "total_chars": self.total_chars,
+            "characters": self.characters,
+            "reservoir": self.reservoir.to_state(),
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.total_tokens = state["total_tokens"]
+        self.total_chars = state["total_chars"]
+        self.characters = Counter(state["characters"])
+        self.reservoir.restore(state["reservoir"])
+
+    def spawn(self) -> "ClipTextAccumulator":
+        spawned = ClipTextAccumulator(
+            self.reservoir.size, seed=self.reservoir.seed
+        )
+        spawned.reservoir = self.reservoir.spawn()
+        return spawned
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "alphabet": sorted(self.characters),
+            "alphabet_counts": dict(self.characters.most_common()),
+            "sample_sentences": list(self.reservoir.items),
+            "average_sentence_length_tokens": (
+                round(self.total_tokens / self.count, 1) if self.count else 0
+            ),
+            "average_sentence_length_chars": (
+                round(self.total_chars / self.count, 1) if self.count else 0
+            ),
+        }
+
+
+class SentenceCorpusAccumulator(Accumulator):
+    """
+    Summarises validated_sentences.tsv: sentence sources, how often the
+    sentences in use have been recorded, and how many sentences duplicate
+    an earlier one. Duplicates are found from the 64-bit hashes of the
+    sentences, which take 8 bytes per row instead of the text itself.
+    """
+
+    columns = {
+        "sentence": "hash",
+        "is_used": "dict",
+        "clips_count": "int",
+        "source": "dict",
+    }
+
+    def __init__(self):
+        self.count = 0
+        self.used_count = 0
+        self.clips_total = 0
+        self.without_recording = 0
+        self.sources = Counter()
+        self.sentence_hashes = array("Q")
+
+    def add(self, row: Dict[str, str]) -> None:
+        self.count += 1
+        if (sentence := row.get("sentence")) is not None:
+            self.sentence_hashes.append(clip_hash(sentence))
+        if row.get("is_used") != "1":
+            return
+        clips_count = int(row.get("clips_count", 0))
+        self.used_count += 1
+        self.clips_total += clips_count
+        if clips_count == 0:
+            self.without_recording += 1
+        if source := row.get("source"):
+            self.sources[source] += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        self.count += table.num_rows
+        if "sentence" in table:
+            self.sentence_hashes.frombytes(
+                memoryview(table["sentence"]).cast("B")
+            )
+        if "is_used" not in table:
+            return
+        is_used = table["is_used"]
+        if "1" not in is_used.vocab:
+            return
+        used_code = is_used.vocab.index("1")
+        clips_counts = table["clips_count"] if "clips_count" in table else None
+        used, clips_total, without_recording = masked_int_stats(
+            clips_counts, is_used.codes, used_code
+        )
+        self.used_count += used
+        self.clips_total += clips_total
+        self.without_recording += without_recording
+        if "source" in table:
+            sources = table["source"]
+            used_sources = masked_code_counts(
+                sources.codes, len(sources.vocab), is_used.codes, used_code
+            )
+            for value, n in zip(sources.vocab, used_sources):
+                if value and n:
+                    self.sources[value] += n
+
+    def merge(self, other: "SentenceCorpusAccumulator") -> None:
+        self.count += other.count
+        self.used_count += other.used_count
+        self.clips_total += other.clips_total
+        self.without_recording += other.without_recording
+        self.sources.update(other.sources)
+        self.sentence_hashes.extend(other.sentence_hashes)
+
+    def subtract(self, other: "SentenceCorpusAccumulator") -> None:
+        self.count -= other.count
+        self.used_count -= other.used_count
+        self.clips_total -= other.clips_total
+        self.without_recording -= other.without_recording
+        self.sources = _subtract_counts(self.sources, other.sources)
+        removed = Counter(other.sentence_hashes)
+        kept = array("Q")
+        for h in self.sentence_hashes:
+            if removed[h]:
+                removed[h] -= 1
+            else:
+                kept.append(h)
+        self.sentence_hashes = kept
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "used_count": self.used_count,
+            "clips_total": self.clips_total,
+            "without_recording": self.without_recording,
+            "sources": self.sources,
+            "sentence_hashes": self.sentence_hashes,
+        }
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.used_count = state["used_count"]
+        self.clips_total = state["clips_total"]
+        self.without_recording = state["without_recording"]
+        self.sources = Counter(state["sources"])
+        self.sentence_hashes = state["sentence_hashes"]
+
+    def duplicate_count(self) -> int:
+        """
+        Returns the number of sentences whose text appeared earlier.
+        """
+        if np is not None:
+            hashes = np.frombuffer(self.sentence_hashes, dtype=np.uint64)
+            return len(hashes) - len(np.unique(hashes))
+        return len(self.sentence_hashes) - len(set(self.sentence_hashes))
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "unique_sources": sorted(self.sources),
+            "sentences_without_recording": self.without_recording,
+            "average_clips_per_sentence": (
+                round(self.clips_total / self.used_count, 2)
+                if self.used_count
+                else 0
+            ),
+            "duplicate_sentences": self.duplicate_count(),
+        }
+
+
+class RowCounter(Accumulator):
+    """
+    Counts rows; used for files where only the row count is reported.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def add(self, row: Dict[str, str]) -> None:
+        self.count += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        self.count += table.num_rows
+
+    def merge(self, other: "RowCounter") -> None:
+        self.count += other.count
+
+    def subtract(self, other: "RowCounter") -> None:
+        self.count -= other.count
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"count": self.count}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+
+
+class ClientIds:
+    """
+    Interns client_ids as small integers. The splits of a locale share one
+    instance, so each (128-character) client_id is stored once however many
+    split files it appears in, and speaker sets are sets of integers.
+    """
+
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def intern(self, client_id: str) -> int:
+        code = self.codes.get(client_id)
+        if code is None:
+            code = self.codes[client_id] = len(self.names)
+            self.names.append(client_id)
+        return code
+
+
+class SpeakerAccumulator(Accumulator):
+    """
+    Counts clips per speaker of one split, keyed by interned client_id.
+    """
+
+    columns = {"client_id": "dict"}
+
+    def __init__(self, client_ids: Optional[ClientIds] = None):
+        self.client_ids = client_ids if client_ids is not None else ClientIds()
+        self.clips = Counter()
+
+    def add(self, row: Dict[str, str]) -> None:
+        if client_id := row.get("client_id"):
+            self.clips[self.client_ids.intern(client_id)] += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        if "client_id" not in table:
+            return
+        column = table["client_id"]
+        intern = self.client_ids.intern
+        for code, n in column.code_counts().items():
+            if client_id := column.vocab[code]:
+                self.clips[intern(client_id)] += n
+
+    def _translated(self, other: "SpeakerAccumulator") -> Counter:
+        """
+        Returns the clip counts of `other` keyed by this accumulator's codes.
+        """
+        if other.client_ids is self.client_ids:
+            return other.clips
+        intern, names = self.client_ids.intern, other.client_ids.names
+        return Counter(
+            {intern(names[code]): n for code, n in other.clips.items()}
+        )
+
+    def merge(self, other: "SpeakerAccumulator") -> None:
+        self.clips.update(self._translated(other))
+
+    def subtract(self, other: "SpeakerAccumulator") -> None:
+        self.clips = _subtract_counts(self.clips, self._translated(other))
+
+    def to_state(self) -> Dict[str, Any]:
+        names = self.client_ids.names
+        return {"clips": {names[code]: n for code, n in self.clips.items()}}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        intern = self.client_ids.intern
+        self.clips = Counter(
+            {intern(client_id): n for client_id, n in state["clips"].items()}
+        )
+
+    def spawn(self) -> "SpeakerAccumulator":
+        # A private table of codes, as spawned accumulators may be filled in
+        # another process; `merge()` translates them back.
+        return SpeakerAccumulator()
+
+    def speakers(self) -> Set[int]:
+        return set(self.clips)
+
+    def result(self) -> int:
+        return len(self.clips)
+
+
+class ReportAccumulator(Accumulator):
+    """
+    Counts the sentence reports in reported.tsv by reason.
+    """
+
+    columns = {"reason": "dict"}
+
+    def __init__(self):
+        self.count = 0
+        self.reasons = Counter()
+
+    def add(self, row: Dict[str, str]) -> None:
+        self.count += 1
+        if reason := row.get("reason"):
+            self.reasons[reason] += 1
+
+    def add_table(self, table: ColumnarTable) -> None:
+        self.count += table.num_rows
+        if "reason" in table:
+            for reason, n in table["reason"].counts().items():
+                if reason:
+                    self.reasons[reason] += n
+
+    def merge(self, other: "ReportAccumulator") -> None:
+        self.count += other.count
+        self.reasons.update(other.reasons)
+
+    def subtract(self, other: "ReportAccumulator") -> None:
+        self.count -= other.count
+        self.reasons = _subtract_counts(self.reasons, other.reasons)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"count": self.count, "reasons": self.reasons}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        self.count = state["count"]
+        self.reasons = Counter(state["reasons"])
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "reasons": dict(self.reasons.most_common()),
+        }
+
+
+def _subtract_counts(counter: Counter, other: Counter) -> Counter:
+    """
+    Returns `counter - other`, dropping keys whose count falls to zero.
+    """
+    counter.subtract(other)
+    return +counter
+
+
+def accumulate(rows: Iterable[Dict[str, str]], *accumulators) -> None:
+    """
+    Feeds every row to each accumulator in a single pass over the rows.
+    """
+    adders = [acc.add for acc in accumulators]
+    for row in rows:
+        for add in adders:
+            add(row)
+
+
+def accumulate_shard(
+    tsv_path: Path,
+    header: List[str],
+    start: int,
+    end: int,
+    accumulators: List[Accumulator],
+) -> List[Accumulator]:
+    """
+    Feeds the rows in bytes [start, end) of a TSV to fresh accumulators and
+    returns them; runs in a worker process.
+    """
+    accumulate(iter_shard_dicts(tsv_path, header, start, end), *accumulators)
+    return accumulators
+
+
+def accumulate_file(
+    tsv_path: Path,
+    cache_dir: Optional[Path],
+    rebuild_cache: bool,
+    *accumulators,
+    workers: int = 1,
+) -> None:
+    """
+    Feeds one TSV to the accumulators: from its columnar cache in
+    `cache_dir` when one is given, otherwise by streaming the parsed rows.
+
+    Large files are split into newline-aligned byte ranges that are parsed
+    on up to `workers` processes; each worker returns partial aggregates
+    that are merged, in file order, into `accumulators`.
+    """
+    if cache_dir is None:
+        ranges = []
+        if workers > 1 and tsv_path.exists():
+            header, ranges = plan_shards(tsv_path, workers)
+        if len(ranges) <= 1:
+            accumulate(iter_tsv(tsv_path), *accumulators)
+            return
+        logger.info(f"Parsing {tsv_path.name} in {len(ranges)} shards...")
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            partials = pool.map(
+                accumulate_shard,
+                repeat(tsv_path),
+                repeat(header),
+                *zip(*ranges),
+                [[acc.spawn() for acc in accumulators] for _ in ranges],
+            )
+            for shard_accumulators in partials:
+                for acc, partial in zip(accumulators, shard_accumulators):
+                    acc.merge(partial)
+        return
+    columns = {}
+    for acc in accumulators:
+        columns.update(acc.columns)
+    table = load_table(tsv_path, cache_dir, columns, rebuild_cache, workers)
+    if table is None:
+        return
+    try:
+        for acc in accumulators:
+            acc.add_table(table)
+    finally:
+        table.close()
+
+
+def bin_contributor_counts(counts: Iterable[int]) -> Dict[str, int]:
+    """
+    Bins per-contributor clip counts into the buckets used in the datasheet.
+    """
+    bins = ["1-10", "11-50", "51-100", "101-500", ">500"]
+    return dict(zip(bins, bin_counts(counts, CONTRIBUTOR_BIN_EDGES)))
 
 
 # --- STATS CALCULATION ---
 
 
-def get_hours(data: List[Dict[str, str]], durations: Dict[str, int]) -> float:
+def get_hours(
+    data: Iterable[Dict[str, str]], durations: Mapping[str, int]
+) -> float:
     """
     Calculates the total duration in hours for a specific subset of audio clips.
     """
     logger.info("Calculating clip hours for a subset of data...")
-    total_ms = sum(durations.get(row["path"], 0) for row in data)
-    return total_ms / (1000 * 60 * 60)
+    hours = HoursAccumulator(durations)
+    accumulate(data, hours)
+    return hours.result()
+
+
+def get_demographics(data: Iterable[Dict[str, str]]) -> Dict[str, Counter]:
+    """
+    Analyzes clip metadata to extract and count demographic information.
+    """
+    logger.info("Calculating demographic statistics (gender, age, accent)...")
+    demographics = DemographicsAccumulator()
+    accumulate(data, demographics)
+    return demographics.result()
+
+
+def get_contributor_stats(data: Iterable[Dict[str, str]]) -> Dict[str, int]:
+    """
+    Calculates the distribution of contributions per user.
+    """
+    logger.info("Calculating contributor statistics...")
+    contributors = ContributorAccumulator()
+    accumulate(data, contributors)
+    return contributors.result()
+
+
+def get_text_corpus_stats(
+    validated_sentences: Iterable[Dict[str, str]],
+    validated_clips: Iterable[Dict[str, str]],
+) -> Dict[str, Any]:
+    """
+    Performs a deep analysis of the dataset's text sentences.
+    """
+    logger.info("Analyzing text corpus statistics...")
+    sentences = SentenceCorpusAccumulator()
+    clip_text = ClipTextAccumulator()
+    accumulate(validated_sentences, sentences)
+    accumulate(validated_clips, clip_text)
+    return combine_text_corpus_stats(sentences, clip_text)
+
+
+def combine_text_corpus_stats(
+    sentences: SentenceCorpusAccumulator, clip_text: ClipTextAccumulator
+) -> Dict[str, Any]:
+    """
+    Builds the `text_corpus` section of the stats from its two accumulators.
+    """
+    sentence_stats = sentences.result()
+    text_stats = clip_text.result()
+    return {
+        "unique_sources": sentence_stats["unique_sources"],
+        "sentences_without_recording": sentence_stats[
+            "sentences_without_recording"
+        ],
+        "average_clips_per_sentence": sentence_stats[
+            "average_clips_per_sentence"
+        ],
+        "duplicate_sentences": sentence_stats["duplicate_sentences"],
+        **text_stats,
+    }
+
+
+class LocaleStats:
+    """
+    The accumulators behind the `stats` dict of one locale, grouped by the
+    TSV file that feeds them. Files can be fed in any order, from rows or
+    from cached tables.
+    """
+
+    def __init__(self, durations: Optional[ClipDurationIndex] = None):
+        self.durations = durations
+        self.validated = HoursAccumulator(durations)
+        self.invalidated = HoursAccumulator(durations)
+        self.demographics = DemographicsAccumulator()
+        self.gender_age = CrossTabAccumulator("gender", "age")
+        self.accent_gender = CrossTabAccumulator("accents", "gender")
+        self.contributors = ContributorAccumulator()
+        self.clip_text = ClipTextAccumulator()
+        self.sentences = SentenceCorpusAccumulator()
+        self.unvalidated_sentences = RowCounter()
+        # All splits resolve durations through the same index and intern
+        # their speakers in the same table.
+        self.client_ids = ClientIds()
+        self.splits = {
+            file_name: (
+                HoursAccumulator(durations),
+                DemographicsAccumulator(),
+                SpeakerAccumulator(self.client_ids),
+            )
+            for file_name in SPLIT_FILES
+        }
+        self.reported = ReportAccumulator()
+        self.files = {
+            "validated.tsv": (
+                self.validated,
+                self.demographics,
+                self.gender_age,
+                self.accent_gender,
+                self.contributors,
+                self.clip_text,
+            ),
+            "invalidated.tsv": (self.invalidated,),
+            "validated_sentences.tsv": (self.sentences,),
+            "unvalidated_sentences.tsv": (self.unvalidated_sentences,),
+            **self.splits,
+            "reported.tsv": (self.reported,),
+        }
+
+    def set_durations(self, durations: ClipDurationIndex) -> None:
+        self.durations = durations
+        self.validated.set_durations(durations)
+        self.invalidated.set_durations(durations)
+        for hours, _, _ in self.splits.values():
+            hours.set_durations(durations)
+
+    def row_count(self, file_name: str) -> int:
+        """
+        Returns the number of rows of `file_name` fed so far.
+        """
+        return self.files[file_name][0].count
+
+    def add_rows(self, file_name: str, rows: Iterable[Dict[str, str]]) -> None:
+        accumulate(rows, *self.files[file_name])
+
+    def subtract_rows(
+        self,
+        file_name: str,
+        rows: Iterable[Dict[str, str]],
+        durations: ClipDurationIndex,
+    ) -> None:
+        """
+        Takes rows of a previous release back out; `durations` is the clip
+        duration index of that release.
+        """
+        removed = [acc.spawn() for acc in self.files[file_name]]
+        for acc in removed:
+            if isinstance(acc, HoursAccumulator):
+                acc.set_durations(durations)
+        accumulate(rows, *removed)
+        for acc, other in zip(self.files[file_name], removed):
+            acc.subtract(other)
+
+    def to_state(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            file_name: [acc.to_state() for acc in accumulators]
+            for file_name, accumulators in self.files.items()
+        }
+
+    def restore(self, state: Dict[str, List[Dict[str, Any]]]) -> None:
+        for file_name, accumulators in self.files.items():
+            for acc, acc_state in zip(accumulators, state[file_name]):
+                acc.restore(acc_state)
+
+    def add_file(
+        self,
+        tsv_path: Path,
+        cache_dir: Optional[Path] = None,
+        rebuild_cache: bool = False,
+        workers: int = 1,
+    ) -> None:
+        accumulate_file(
+            tsv_path,
+            cache_dir,
+            rebuild_cache,
+            *self.files[tsv_path.name],
+            workers=workers,
+        )
+
+    def result(self, lang_code: str, lang_name: str) -> Dict:
+        validated_hours = round(self.validated.result(), 2)
+        invalidated_hours = round(self.invalidated.result(), 2)
+        sentences = self.sentences
+        unvalidated_sentences = self.unvalidated_sentences
+        stats = {
+            "language": {"code": lang_code, "name": lang_name},
+            "clip_stats": {
+                "total_count": (
+                    self.durations.row_count if self.durations else 0
+                ),
+                "validated_count": self.validated.count,
+                "invalidated_count": self.invalidated.count,
+                "validated_hours": validated_hours,
+                "invalidated_hours": invalidated_hours,
+                "total_hours": validated_hours + invalidated_hours,
+            },
+            "sentence_stats": {
+                "validated_count": sentences.count,
+                "invalidated_count": unvalidated_sentences.count,
+                "total_count": sentences.count + unvalidated_sentences.count,
+            },
+            "demographics": {
+                **self.demographics.result(),
+                "gender_by_age": self.gender_age.result(),
+                "accent_by_gender": self.accent_gender.result(),
+            },
+            "contributor_stats": self.contributors.result(),
+            "text_corpus": combine_text_corpus_stats(
+                sentences, self.clip_text
+            ),
+        }
+        splits = self.split_result()
+        if splits:
+            stats["splits"] = splits
+            stats["split_speaker_overlap"] = self.speaker_overlap()
+        return stats
+
+    def split_result(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the clips, hours, speakers and demographics of each split
+        that has clips, and the sentence reports if there are any.
+        """
+        splits = {}
+        for file_name, (hours, demographics, speakers) in self.splits.items():
+            if hours.count:
+                splits[Path(file_name).stem] = {
+                    "clip_count": hours.count,
+                    "hours": round(hours.result(), 2),
+                    "speakers": speakers.result(),
+                    "demographics": demographics.result(),
+                }
+        if self.reported.count:
+            splits["reported"] = self.reported.result()
+        return splits
+
+    def speaker_overlap(self) -> Dict[str, int]:
+        """
+        Returns the number of speakers shared by each pair of the train, dev
+        and test splits, which should be 0, and warns about any overlap.
+        """
+        speakers = {
+            name: self.splits[f"{name}.tsv"][2].speakers()
+            for name in DISJOINT_SPLITS
+            if self.splits[f"{name}.tsv"][0].count
+        }
+        names = list(speakers)
+        overlap = {}
+        for i, a in enumerate(names):
+            for b in names[i + 1 :]:
+                shared = len(speakers[a] & speakers[b])
+                overlap[f"{a}/{b}"] = shared
+                if shared:
+                    logger.warning(
+                        f"{shared} speakers appear in both the {a} and {b} "
+                        "splits."
+                    )
+        return overlap
+
+
+def compute_stats(
+    base_path: Path,
+    lang_code: str,
+    lang_name: str,
+    cache_dir: Optional[Path] = None,
+    rebuild_cache: bool = False,
+    workers: int = 1,
+    state_dir: Optional[Path] = None,
+    metrics: Optional[StageReport] = None,
+) -> Dict:
+    """
+    Streams each TSV of a language directory exactly once, updating all of
+    the statistics incrementally, and returns the `stats` dict. Large TSVs
+    are parsed in shards on up to `workers` processes.
+
+    With a `cache_dir`, clip durations come from a memory-mapped
+    `ClipDurationIndex` and the other TSVs from their columnar caches, which
+    are only rebuilt when the source files change (or `rebuild_cache` is
+    set); warm runs then parse no text at all.
+
+    With a `state_dir`, the aggregate state of the locale is saved there,
+    and a later run (typically on the next release) restores it and applies
+    only the rows added or removed since; see `apply_release_delta`.
+
+    The time and memory taken by each stage are recorded in `metrics`.
+    """
+    if metrics is None:
+        metrics = StageReport(lang_code)
+    if rebuild_cache and cache_dir is not None:
+        index_path = cache_dir / DURATION_INDEX_FILE_NAME
+        if index_path.exists():
+            index_path.unlink()
+    durations_path = base_path / "clip_durations.tsv"
+    with metrics.stage(durations_path.name, durations_path) as record:
+        durations = ClipDurationIndex.open(durations_path, cache_dir, workers)
+        record["rows"] = durations.row_count
+
+    saved = load_state(state_dir) if state_dir is not None else None
+    if saved is not None:
+        locale_stats = LocaleStats(durations)
+        try:
+            with metrics.stage("release_delta"):
+                line_indexes = apply_release_delta(
+                    locale_stats, base_path, cache_dir, *saved
+                )
+        except StaleStateError as e:
+            logger.info(f"Saved state not usable ({e}); recomputing.")
+        else:
+            with metrics.stage("save_state"):
+                save_locale_state(
+                    state_dir,
+                    locale_stats,
+                    base_path,
+                    cache_dir,
+                    line_indexes,
+                )
+            with metrics.stage("result"):
+                return locale_stats.result(lang_code, lang_name)
+
+    locale_stats = LocaleStats(durations)
+    logger.info(
+        "Calculating hours, demographic, contributor, text and split "
+        "statistics..."
+    )
+    for file_name in locale_stats.files:
+        tsv_path = base_path / file_name
+        with metrics.stage(file_name, tsv_path) as record:
+            locale_stats.add_file(tsv_path, cache_dir, rebuild_cache, workers)
+            record["rows"] = locale_stats.row_count(file_name)
+    if state_dir is not None:
+        with metrics.stage("save_state"):
+            save_locale_state(state_dir, locale_stats, base_path, cache_dir)
+    with metrics.stage("result"):
+        return locale_stats.result(lang_code, lang_name)
+
+
+def apply_release_delta(
+    locale_stats: LocaleStats,
+    base_path: Path,
+    cache_dir: Optional[Path],
+    state: Dict[str, Any],
+    line_indexes: Dict[str, LineIndex],
+) -> Dict[str, Any]:
+    """
+    Restores a saved state into `locale_stats` and moves it forward to the
+    TSVs in `base_path`. Unchanged files are skipped; for the others, only
+    the added lines are parsed and applied, and the removed ones are read
+    back from the previous release's files and subtracted. If removed clips
+    were in the sentence sample, it is redrawn from validated.tsv. Returns
+    the new (header, line index) of every file.
+
+    Raises `StaleStateError` when the delta cannot be applied, e.g. when a
+    header changed or the previous files are no longer on disk.
+    """
+    logger.info(f"Applying changes since the saved state of {base_path}...")
+    locale_stats.restore(state["accumulators"])
+    previous_durations = None
+    new_indexes = {}
+    for file_name in locale_stats.files:
+        tsv_path = base_path / file_name
+        saved = state["files"].get(file_name)
+        if not tsv_path.exists():
+            if saved is not None:
+                raise StaleStateError(f"{tsv_path} no longer exists")
+            continue
+        if (
+            saved is not None
+            and saved["path"] == str(tsv_path.resolve())
+            and saved["signature"] == source_signature(tsv_path)
+        ):
+            new_indexes[file_name] = (saved["header"], line_indexes[file_name])
+            continue
+
+        delta = diff_lines(tsv_path, line_indexes.get(file_name, LineIndex()))
+        if saved is not None and delta.header != saved["header"]:
+            raise StaleStateError(f"the columns of {file_name} changed")
+        if delta.removed:
+            previous_path = Path(saved["path"])
+            if (
+                not previous_path.exists()
+                or source_signature(previous_path) != saved["signature"]
+            ):
+                raise StaleStateError(
+                    f"{previous_path} is no longer available"
+                )
+            if previous_durations is None:
+                previous_durations = open_previous_durations(state)
+            lines = collect_lines(previous_path, delta.removed)
+            locale_stats.subtract_rows(
+                file_name,
+                csv.DictReader(
+                    lines, fieldnames=saved["header"], delimiter="\t"
+                ),
+                previous_durations,
+            )
+        locale_stats.add_rows(
+            file_name,
+            csv.DictReader(
+                delta.added, fieldnames=delta.header, delimiter="\t"
+            ),
+        )
+        logger.info(
+            f"{file_name}: {len(delta.added)} rows added, "
+            f"{len(delta.removed)} removed"
+        )
+        new_indexes[file_name] = (delta.header, delta.index)
+    clip_text = locale_stats.clip_text
+    if clip_text.reservoir.stale:
+        logger.info("Removed clips were sampled; redrawing the sample...")
+        fresh = clip_text.spawn()
+        accumulate_file(base_path / "validated.tsv", cache_dir, False, fresh)
+        clip_text.reservoir = fresh.reservoir
+    return new_indexes
 
 
-def get_demographics(data: List[Dict[str, str]]) -> Dict[str, Counter]:
+def open_previous_durations(state: Dict[str, Any]) -> ClipDurationIndex:
     """
-    Analyzes clip metadata to extract and count demographic information.
+    Returns the clip duration index of the release a saved state was taken
+    from, needed to subtract the hours of removed clips.
     """
-    logger.info("Calculating demographic statistics (gender, age, accent)...")
-    accents = [s for row in data if (s := row.get("accents", ""))]
-    return {
-        "gender": Counter(
-            row.get("gender") for row in data if row.get("gender")
-        ),
-        "age": Counter(row.get("age") for row in data if row.get("age")),
-        "accent": Counter(accents),
-    }
+    tsv_path = Path(state["base_path"]) / "clip_durations.tsv"
+    if not tsv_path.exists():
+        raise StaleStateError(f"{tsv_path} is no longer available")
+    cache_dir = state["cache_dir"]
+    return ClipDurationIndex.open(
+        tsv_path, Path(cache_dir) if cache_dir else None
+    )
 
 
-def get_contributor_stats(data: List[Dict[str, str]]) -> Dict[str, int]:
+def save_locale_state(
+    state_dir: Path,
+    locale_stats: LocaleStats,
+    base_path: Path,
+    cache_dir: Optional[Path],
+    line_indexes: Optional[Dict[str, Any]] = None,
+) -> None:
     """
-    Calculates the distribution of contributions per user.
+    Saves the aggregate state of a locale along with the line indexes of its
+    TSVs, indexing the files that `line_indexes` does not cover.
     """
-    logger.info("Calculating contributor statistics...")
-    clips_per_contributor = Counter(row["client_id"] for row in data)
-    bins = {"1-10": 0, "11-50": 0, "51-100": 0, "101-500": 0, ">500": 0}
-    for count in clips_per_contributor.values():
-        if 1 <= count <= 10:
-            bins["1-10"] += 1
-        elif 11 <= count <= 50:
-            bins["11-50"] += 1
-        elif 51 <= count <= 100:
-            bins["51-100"] += 1
-        elif 101 <= count <= 500:
-            bins["101-500"] += 1
-        else:
-            bins[">500"] += 1
-    return bins
+    line_indexes = dict(line_indexes or {})
+    files = {}
+    for file_name in locale_stats.files:
+        tsv_path = base_path / file_name
+        if not tsv_path.exists():
+            continue
+        if file_name not in line_indexes:
+            line_indexes[file_name] = index_lines(tsv_path)
+        files[file_name] = {
+            "path": str(tsv_path.resolve()),
+            "signature": source_signature(tsv_path),
+            "header": line_indexes[file_name][0],
+        }
+    state = {
+        "base_path": str(base_path.resolve()),
+        "cache_dir": str(cache_dir.resolve()) if cache_dir else None,
+        "files": files,
+        "accumulators": locale_stats.to_state(),
+    }
+    save_state(
+        state_dir,
+        state,
+        {name: index for name, (_, index) in line_indexes.items()},
+    )
+    logger.info(f"Saved incremental state to {state_dir}")
 
 
-def get_text_corpus_stats(
-    validated_sentences: List[Dict[str, str]],
-    validated_clips: List[Dict[str, str]],
-) -> Dict[str, Any]:
+def compute_archive_stats(
+    archive_path: Path, metrics: Optional[Dict[str, StageReport]] = None
+) -> Dict[str, Dict]:
     """
-    Performs a deep analysis of the dataset's text sentences.
+    Computes the stats of every locale in a release archive (.tar.gz) in a
+    single streaming pass, without extracting it. Only the TSV members are
+    parsed; the audio clips are skipped as they stream past, so nothing is
+    written to disk. Returns a dict of locale code -> stats, and records the
+    stages of each locale in `metrics` (locale code -> report).
     """
-    logger.info("Analyzing text corpus statistics...")
-    used_sentences = [
-        row for row in validated_sentences if row.get("is_used") == "1"
-    ]
-    clips_counts = [int(row.get("clips_count", 0)) for row in used_sentences]
-    all_text = [
-        row["sentence"] for row in validated_clips if "sentence" in row
-    ]
-    total_tokens = sum(len(s.split()) for s in all_text)
-    total_chars = sum(len(s) for s in all_text)
+    if metrics is None:
+        metrics = {}
+    logger.info(f"Streaming TSV members from {archive_path.name}...")
+    locales = {}
+    with tarfile.open(archive_path, mode="r|*") as archive:
+        for member in archive:
+            path = PurePosixPath(member.name)
+            if not member.isfile() or path.name not in LOCALE_TSV_FILES:
+                continue
+            lang_code = path.parent.name
+            locale_stats = locales.setdefault(lang_code, LocaleStats())
+            report = metrics.setdefault(lang_code, StageReport(lang_code))
+            logger.info(f"Reading {member.name} from the archive...")
+            # Members of a streamed archive are not seekable, which rules out
+            # io.TextIOWrapper; decode line by line instead.
+            lines = (
+                line.decode("utf-8") for line in archive.extractfile(member)
+            )
+            rows = csv.DictReader(lines, delimiter="\t")
+            with report.stage(path.name) as record:
+                record["bytes"] = member.size
+                if path.name == "clip_durations.tsv":
+                    durations = ClipDurationIndex.build(
+                        (row["clip"], int(row["duration[ms]"])) for row in rows
+                    )
+                    locale_stats.set_durations(durations)
+                    record["rows"] = durations.row_count
+                else:
+                    locale_stats.add_rows(path.name, rows)
+                    record["rows"] = locale_stats.row_count(path.name)
 
-    return {
-        "unique_sources": sorted(
-            list(
-                set(
-                    row["source"]
-                    for row in used_sentences
-                    if row.get("source")
-                )
+    all_stats = {}
+    for lang_code, locale_stats in locales.items():
+        with metrics[lang_code].stage("result"):
+            all_stats[lang_code] = locale_stats.result(
+                lang_code, locale_name(lang_code)
             )
-        ),
-        "sentences_without_recording": sum(1 for c in clips_counts if c == 0),
-        "average_clips_per_sentence": (
-            round(sum(clips_counts) / len(clips_counts), 2)
-            if clips_counts
-            else 0
-        ),
-        "alphabet": sorted(list(set("".join(all_text)))),
-        "sample_sentences": random.sample(all_text, k=min(5, len(all_text))),
-        "average_sentence_length_tokens": (
-            round(total_tokens / len(all_text), 1) if all_text else 0
-        ),
-        "average_sentence_length_chars": (
-            round(total_chars / len(all_text), 1) if all_text else 0
-        ),
-    }
+    return all_stats
 
 
 # --- PROMPT AND API CALL ---
@@ -170,13 +1564,17 @@ def generate_prompt_for_llm(
     sentence_threshold: int,
     avg_clips_threshold: float,
     existing_markdown: Optional[str] = None,
+    limits: Optional[PromptLimits] = None,
+    report: Optional[Dict[str, Any]] = None,
 ) -> str:
     """
     Constructs a highly specific prompt to guide the Gemini LLM for datasheet
-    creation or update.
+    creation or update. The statistical tables are rendered here and the data
+    compacted to fit the token budget of `limits`; the size of the prompt is
+    logged and added to `report`.
     """
     logger.info("Generating detailed prompt for the language model...")
-    prompt_stats = json.loads(json.dumps(stats, default=lambda o: dict(o)))
+    prompt_stats = stats_to_json(stats)
     lang_name = stats["language"]["name"]
 
     if existing_markdown:
@@ -201,11 +1599,33 @@ You are an expert AI assistant that creates datasheets for Mozilla Common Voice
 Your task is to generate a comprehensive and accurate markdown file from scratch based on the statistical data provided below. Follow all instructions with extreme precision.
 """
 
-    return f"""
+    # The payloads tried by fit_payload(); the last one is sent.
+    payloads: List[PromptPayload] = []
+
+    def build_prompt(payload: PromptPayload) -> str:
+        payloads.append(payload)
+        sections = payload.sections
+        split_instructions = ""
+        if "Splits" in sections:
+            split_instructions = """
+Then add a subsection `### Splits` with the pre-rendered `Splits` table.
+"""
+        text_corpus_subsections = ", ".join(
+            f"`### {title}`"
+            for title in ("Corpus Sources", "Alphabet", "Sample Sentences")
+            if title == "Corpus Sources" or title in sections
+        )
+        return f"""
 {update_instructions}
 
 **NEW STATISTICAL DATA:**
-{json.dumps(prompt_stats, indent=2, ensure_ascii=False)}
+{payload.data_json()}
+
+**PRE-RENDERED SECTIONS:**
+The bodies below were computed from the data. Copy each one verbatim (tables,
+lists and numbers unchanged) into the section the instructions name.
+
+{payload.sections_text()}
 
 **DETAILED INSTRUCTIONS (Apply to new and updated sections):**
 
@@ -216,38 +1636,19 @@ Ensure the title is: `# Mozilla Common Voice: {lang_name} ({stats['language']['c
 If updating, preserve any existing detailed introduction. If creating from scratch, write a brief, encyclopedic introduction for the `{lang_name}` language, including its language family, regions, and speaker count.
 
 **3. Clip & Sentence Statistics Section:**
-Generate a section titled `## Clip & Sentence Statistics`. State that the dataset contains **{stats['clip_stats']['validated_hours']} validated hours** of speech from **{sum(stats['contributor_stats'].values())}** unique contributors. Then, create two markdown tables EXACTLY as follows:
-
-First table (Clip Summary):
-| Type                | Count | Hours  |
-| ------------------- | ----: | -----: |
-| Validated Clips     | {stats['clip_stats']['validated_count']:,} |   {stats['clip_stats']['validated_hours']:.2f} |
-| Invalidated Clips   | {stats['clip_stats']['invalidated_count']:,} |   {stats['clip_stats']['invalidated_hours']:.2f} |
-| **Total Clips**     | {stats['clip_stats']['total_count']:,} |   {stats['clip_stats']['total_hours']:.2f} |
-
-Second table (Sentence Summary):
-| Type                  |   Count |
-| --------------------- | ------: |
-| Validated Sentences   |   {stats['sentence_stats']['validated_count']:,} |
-| Invalidated Sentences |     {stats['sentence_stats']['invalidated_count']:,} |
-| **Total Sentences**   |     {stats['sentence_stats']['total_count']:,} |
-
+Generate a section titled `## Clip & Sentence Statistics` with the pre-rendered `Clip & Sentence Statistics` body: the summary sentence, then the clip and sentence tables.
+{split_instructions}
 **4. Demographic Information Section:**
 Generate a section `## Demographic Information`. Include the sentence: "Demographic information is self-reported by contributors and may not be representative of the entire speaker population."
-- Create subsections `### Age` and `### Gender` with tables.
-- Create `### Accent` with two tables: the first for raw data, the second titled `#### English Translation of Accents` providing best-effort translations/explanations.
+- Create subsections `### Age` and `### Gender` with the pre-rendered `Age` and `Gender` tables.
+- Create `### Accent` with two tables: the first is the pre-rendered `Accent` table, the second titled `#### English Translation of Accents`, with the columns `Original Accent` and `Translation / Explanation`, providing best-effort translations/explanations of the accents in `accents`, in the same order. Do not add a row for the `Other` accents.
 
 **5. Contributor Statistics Section:**
-Generate a section `## Contributor Statistics` with a table showing the distribution of clips per contributor.
+Generate a section `## Contributor Statistics` with the pre-rendered `Contributor Statistics` table.
 
 **6. Text Corpus Section:**
-Generate `## Text Corpus`. Add these bullet points:
-- **Total validated sentences:** {stats['sentence_stats']['validated_count']:,}
-- **Sentences without a recording yet:** {stats['text_corpus']['sentences_without_recording']:,}
-- **Average clips per validated sentence:** {stats['text_corpus']['average_clips_per_sentence']:.2f}
-- **Average sentence length (tokens):** {stats['text_corpus']['average_sentence_length_tokens']:.1f}
-- **Average sentence length (characters):** {stats['text_corpus']['average_sentence_length_chars']:.1f}
-Then create subsections for `### Corpus Sources`, `### Alphabet`, and `### Sample Sentences`.
+Generate `## Text Corpus` with the pre-rendered `Text Corpus` bullet points.
+Then create subsections {text_corpus_subsections}: list `unique_sources` under `### Corpus Sources`, and use the pre-rendered bodies for the others.
 
 **7. Community Links Section & Conditional Call to Action:**
 Generate `## Community Links`.
@@ -263,40 +1664,619 @@ Generate `## Fun Fact`. Provide one interesting, non-offensive fun fact about th
 
 **10. Formatting Rules (Strictly follow):**
 - Maximum line width is 79 characters. Wrap paragraphs.
-- Use '$$$' for code blocks, NOT '```'.
+- Use '$$$' for code blocks, NOT '```', except in the pre-rendered bodies,
+  which are copied as they are.
 - Right-align numbers in tables where appropriate.
 """
 
+    prompt, size = fit_payload(prompt_stats, build_prompt, limits)
+    logger.info(
+        f"Prompt for {lang_name}: {size['prompt_chars']:,} characters, "
+        f"~{size['prompt_tokens']:,} tokens (budget "
+        f"{size['token_budget']:,}); {size['accents_kept']} of "
+        f"{size['accents_total']} accents"
+        + (
+            f", without {', '.join(size['dropped_sections'])}"
+            if size["dropped_sections"]
+            else ""
+        )
+    )
+    logger.info(
+        f"Data sent to LLM for {lang_name} (~{size['data_tokens']:,} "
+        f"tokens, plus ~{size['section_tokens']:,} of pre-rendered "
+        f"sections): {payloads[-1].data_json()}"
+    )
+    if size["prompt_tokens"] > size["token_budget"]:
+        logger.warning(
+            f"The prompt for {lang_name} exceeds its token budget even with "
+            "the smallest payload."
+        )
+    if report is not None:
+        report.update(size)
+    return prompt
+
+
+def make_dispatcher(args: argparse.Namespace) -> Dispatcher:
+    """
+    Returns the dispatcher for the language model options on the command
+    line.
+    """
+    cache = None
+    if not args.no_llm_cache:
+        cache = ResponseCache(
+            args.llm_cache_dir or Path(CACHE_DIR_NAME) / "llm"
+        )
+    return Dispatcher(
+        make_client(args.llm_url),
+        args.model,
+        concurrency=args.llm_concurrency,
+        requests_per_minute=args.llm_rpm,
+        cache=cache,
+    )
+
+
+def make_prompt_limits(args: argparse.Namespace) -> PromptLimits:
+    """
+    Returns the prompt size limits for the options on the command line.
+    """
+    return PromptLimits(args.prompt_token_budget, args.top_accents)
+
+
+def generate_accent_translation_prompt(
+    accents: Iterable[str], lang_name: str
+) -> str:
+    """
+    Constructs the prompt for the `#### English Translation of Accents`
+    table alone, used when only the accents of a datasheet changed.
+    """
+    accent_list = "\n".join(f"- {accent}" for accent in accents)
+    return f"""
+You are an expert AI assistant that writes datasheets for Mozilla Common Voice datasets.
+The following accents were self-reported by contributors to the {lang_name} dataset:
+
+{accent_list}
+
+Return ONLY a markdown table with the columns `Original Accent` and `Translation / Explanation`, with one row per accent in the order given, providing a best-effort English translation or explanation of each. Right-pad the cells so that the columns line up.
+"""
+
 
-def call_gemini_api(prompt: str) -> str:
+def translation_rows(markdown: str) -> Dict[str, List[str]]:
     """
-    Initializes the Gemini client and sends a request to the API.
+    Returns the two-column rows of the accent translation table in
+    `markdown`, keyed by accent.
     """
-    if not os.getenv("GEMINI_API_KEY"):
-        logger.error("Fatal: GEMINI_API_KEY environment variable not set.")
-        sys.exit(1)
+    return {row[0]: row for row in table_cells(markdown)[1:] if len(row) == 2}
 
-    logger.info("Instantiating the GenAI Client...")
-    try:
-        client = genai.Client()
+
+async def update_datasheet(
+    existing_markdown: str,
+    stats: Dict[str, Any],
+    dispatcher: Dispatcher,
+    limits: Optional[PromptLimits] = None,
+) -> Optional[str]:
+    """
+    Updates only the generated tables and lists of the statistical sections
+    of an existing datasheet whose figures changed: they are rendered
+    locally from `stats`, except for the accent translations, which are
+    requested from the model when the set of accents changed; like the
+    prompt, both list the `limits.top_accents` most frequent. The prose
+    around them and hand-written sections are kept. Returns None if the
+    datasheet is still a template draft: it has placeholders left and none
+    of the filled statistical sections.
+    """
+    top_accents = (limits or PromptLimits()).top_accents
+    sections = split_sections(existing_markdown)
+    rendered = render_stat_sections(stats_to_json(stats), top_accents)
+    if "{{" in existing_markdown and not filled_sections(sections, rendered):
+        return None
+    stale = stale_sections(sections, rendered)
+
+    accents = list(top_counts(stats["demographics"]["accent"], top_accents)[0])
+    translations = editable_section(sections, ACCENT_TRANSLATION_TITLE)
+    header = table_cells(translations.body)[:1] if translations else []
+    if header and len(header[0]) == 2 and accents:
+        translated = translation_rows(translations.body)
+        new_accents = [
+            accent for accent in accents if accent not in translated
+        ]
+        if new_accents:
+            logger.info(
+                f"Requesting translations of {len(new_accents)} new accents..."
+            )
+            reply = await dispatcher.generate(
+                generate_accent_translation_prompt(
+                    new_accents, stats["language"]["name"]
+                )
+            )
+            translated.update(translation_rows(reply or ""))
+        if any(accent not in translated for accent in accents):
+            logger.warning(
+                "The model did not translate every new accent; keeping the "
+                f"{ACCENT_TRANSLATION_TITLE} section as it is."
+            )
+        elif set(table_labels(translations.body)) != set(accents):
+            # Only the table is replaced, under the datasheet's own headers,
+            # with the rows of accents no longer listed dropped.
+            stale[ACCENT_TRANSLATION_TITLE] = markdown_table(
+                header[0], [translated[accent] for accent in accents]
+            )
+
+    logger.info(
+        f"Updating {len(stale)} stale sections: {', '.join(stale) or 'none'}"
+    )
+    splice(sections, stale)
+    return join_sections(sections)
+
+
+async def produce_datasheet(
+    stats: Dict[str, Any],
+    dispatcher: Dispatcher,
+    existing_markdown: Optional[str] = None,
+    full_update: bool = False,
+    metrics: Optional[StageReport] = None,
+    limits: Optional[PromptLimits] = None,
+) -> str:
+    """
+    Returns the datasheet for `stats`: the existing one with its stale
+    sections updated or, with `full_update`, for a new datasheet or one
+    without statistical sections, a datasheet generated by the model.
+    Raises `LLMError` if a required answer cannot be obtained.
+    """
+    if metrics is None:
+        metrics = StageReport(stats["language"]["code"])
+    if existing_markdown and not full_update:
+        with metrics.stage("update_sections") as record:
+            markdown = await update_datasheet(
+                existing_markdown, stats, dispatcher, limits
+            )
+            record["response_chars"] = len(markdown or "")
+        if markdown is not None:
+            return markdown
         logger.info(
-            "Sending request to the Gemini API. This may take a moment..."
+            "The existing datasheet is a template draft; sending it "
+            "to the model in full."
         )
-        response = client.models.generate_content(
-            model="models/gemini-2.5-pro", contents=prompt
+    with metrics.stage("prompt") as record:
+        prompt = generate_prompt_for_llm(
+            stats,
+            SENTENCE_THRESHOLD,
+            AVG_CLIPS_THRESHOLD,
+            existing_markdown,
+            limits,
+            record,
         )
-        logger.info("Successfully received response from the API.")
-        return response.text
-    except Exception as e:
-        logger.error(
-            f"Fatal: An error occurred during the Gemini API call: {e}"
+    logger.info("Sending request to the Gemini API. This may take a moment...")
+    with metrics.stage("llm") as record:
+        record["prompt_chars"] = len(prompt)
+        record["prompt_tokens"] = estimate_tokens(prompt)
+        markdown = await dispatcher.generate(prompt)
+        record["response_chars"] = len(markdown)
+    return markdown
+
+
+# --- BATCH MODE ---
+
+
+def find_locale_dirs(corpus_root: Path) -> List[Path]:
+    """
+    Returns the locale directories of a corpus release, largest first, so
+    that the longest jobs start first and no single big language becomes
+    the long tail of a parallel run.
+    """
+    locale_dirs = []
+    for path in corpus_root.iterdir():
+        if path.is_dir() and any(
+            (path / name).is_file() for name in LOCALE_TSV_FILES
+        ):
+            size = sum(
+                (path / name).stat().st_size
+                for name in LOCALE_TSV_FILES
+                if (path / name).is_file()
+            )
+            locale_dirs.append((size, path))
+    locale_dirs.sort(key=lambda item: (-item[0], item[1].name))
+    return [path for _, path in locale_dirs]
+
+
+def compute_locale_stats(
+    base_path: Path,
+    cache_dir: Optional[Path],
+    rebuild_cache: bool,
+    workers: int = 1,
+    state_dir: Optional[Path] = None,
+    profile_dir: Optional[Path] = None,
+) -> Tuple[Dict, StageReport]:
+    """
+    Computes the stats of one locale directory; the unit of work of a batch
+    run, executed in a worker process. Returns the stats and the report of
+    their stages; with a `profile_dir`, the computation is also profiled.
+    """
+    lang_code = base_path.name
+    lang_name = locale_name(lang_code)
+    logger.info(f"Calculating statistics for {lang_name} ({lang_code})")
+    metrics = StageReport(lang_code)
+    with profiled(lang_code, profile_dir):
+        stats = compute_stats(
+            base_path,
+            lang_code,
+            lang_name,
+            cache_dir,
+            rebuild_cache,
+            workers,
+            state_dir,
+            metrics,
         )
+    return stats, metrics
+
+
+def stats_to_json(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts the stats (which hold Counters) into plain JSON types.
+    """
+    return json.loads(json.dumps(stats, default=lambda o: dict(o)))
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Computes the stats of every locale under `args.corpus_root` in a process
+    pool and writes `<locale>.json` and `<locale>.md` to `args.output_dir`.
+    Datasheets are requested from the API as soon as a locale's stats are
+    ready, while the pool keeps working on the remaining locales. Returns
+    the number of datasheets that could not be generated.
+    """
+    locale_dirs = find_locale_dirs(args.corpus_root)
+    if not locale_dirs:
+        logger.error(f"Fatal: No locale directories in '{args.corpus_root}'.")
         sys.exit(1)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    return asyncio.run(run_batch_async(args, locale_dirs))
+
+
+async def run_batch_async(
+    args: argparse.Namespace, locale_dirs: List[Path]
+) -> int:
+    workers = args.workers or os.cpu_count() or 1
+    logger.info(
+        f"Processing {len(locale_dirs)} locales with {workers} workers..."
+    )
+    dispatcher = make_dispatcher(args)
+    store = StatsStore(args.stats_db) if args.stats_db else None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for base_path in locale_dirs:
+            if args.no_cache:
+                cache_dir = None
+            elif args.cache_dir:
+                cache_dir = args.cache_dir / base_path.name
+            else:
+                cache_dir = base_path / CACHE_DIR_NAME
+            future = pool.submit(
+                compute_locale_stats,
+                base_path,
+                cache_dir,
+                args.rebuild_cache,
+                args.parse_workers or 1,
+                args.state_dir / base_path.name if args.state_dir else None,
+                args.metrics_dir if args.profile else None,
+            )
+            futures.append(asyncio.wrap_future(future))
+
+        datasheets = []
+        for future in asyncio.as_completed(futures):
+            stats, metrics = await future
+            write_locale_stats(stats, args.output_dir)
+            if store is not None:
+                store.put(stats_release(args), stats_to_json(stats))
+            datasheets.append(
+                asyncio.create_task(
+                    write_locale_datasheet(
+                        stats,
+                        args.output_dir,
+                        args.update_dir,
+                        dispatcher,
+                        args.full_update,
+                        metrics,
+                        args.metrics_dir,
+                        make_prompt_limits(args),
+                    )
+                )
+            )
+        written = await asyncio.gather(*datasheets)
+    if store is not None:
+        store.close()
+        logger.info(f"Stored the stats in {args.stats_db}")
+    return written.count(False)
+
+
+def stats_release(args: argparse.Namespace) -> str:
+    """
+    Returns the release under which `--stats_db` stores the stats: the
+    `--release` option, or the cv-corpus-* name in the source path, or else
+    the name of the directory holding the locale(s).
+    """
+    if args.release:
+        return args.release
+    source = args.base_path or args.corpus_root or args.archive[0]
+    release = release_from_path(source)
+    if release:
+        return release
+    if args.base_path:
+        return args.base_path.resolve().parent.name
+    return source.resolve().name
+
+
+def store_stats(args: argparse.Namespace, all_stats: Iterable[Dict]) -> None:
+    """
+    Adds the stats of each locale to the `--stats_db` database.
+    """
+    release = stats_release(args)
+    with StatsStore(args.stats_db) as store:
+        for stats in all_stats:
+            store.put(release, stats_to_json(stats))
+    logger.info(f"Stored the stats of {release} in {args.stats_db}")
+
+
+def write_locale_stats(stats: Dict[str, Any], output_dir: Path) -> None:
+    """
+    Writes `<locale>.json` with the stats of one locale.
+    """
+    lang_code = stats["language"]["code"]
+    stats_path = output_dir / f"{lang_code}.json"
+    stats_path.write_text(
+        json.dumps(stats_to_json(stats), indent=2, ensure_ascii=False) + "\n",
+        encoding="utf-8",
+    )
+    logger.info(f"Wrote {stats_path}")
+
+
+async def write_locale_datasheet(
+    stats: Dict[str, Any],
+    output_dir: Path,
+    update_dir: Optional[Path],
+    dispatcher: Dispatcher,
+    full_update: bool = False,
+    metrics: Optional[StageReport] = None,
+    metrics_dir: Optional[Path] = None,
+    limits: Optional[PromptLimits] = None,
+) -> bool:
+    """
+    Writes `<locale>.md` with the generated (or, if found in `update_dir`,
+    updated) datasheet of one locale. A failed request is logged and leaves
+    the other locales unaffected; returns whether the datasheet was written.
+    With a `metrics_dir`, the stage report of the locale is then written
+    there.
+    """
+    lang_code = stats["language"]["code"]
+    existing_markdown = None
+    if update_dir:
+        update_file = update_dir / f"{lang_code}.md"
+        if update_file.exists():
+            existing_markdown = update_file.read_text(encoding="utf-8")
+    try:
+        markdown = await produce_datasheet(
+            stats, dispatcher, existing_markdown, full_update, metrics, limits
+        )
+    except LLMError as e:
+        logger.error(f"Could not generate the datasheet for {lang_code}: {e}")
+        markdown = None
+    else:
+        markdown_path = output_dir / f"{lang_code}.md"
+        markdown_path.write_text(markdown, encoding="utf-8")
+        logger.info(f"Wrote {markdown_path}")
+    if metrics is not None and metrics_dir is not None:
+        logger.info(f"Wrote {metrics.write(metrics_dir)}")
+    return markdown is not None
+
+
+async def write_datasheets(
+    all_stats: Iterable[Dict[str, Any]],
+    output_dir: Path,
+    update_dir: Optional[Path],
+    dispatcher: Dispatcher,
+    full_update: bool = False,
+    metrics: Optional[Dict[str, StageReport]] = None,
+    metrics_dir: Optional[Path] = None,
+    limits: Optional[PromptLimits] = None,
+) -> int:
+    """
+    Writes the datasheet of each locale and returns how many failed.
+    """
+    metrics = metrics or {}
+    written = await asyncio.gather(
+        *(
+            write_locale_datasheet(
+                stats,
+                output_dir,
+                update_dir,
+                dispatcher,
+                full_update,
+                metrics.get(stats["language"]["code"]),
+                metrics_dir,
+                limits,
+            )
+            for stats in all_stats
+        )
+    )
+    return written.count(False)
 
 
 # --- MAIN EXECUTION ---
 
 
+def exit_on_failures(failures: int) -> None:
+    """
+    Exits with status 1 if any datasheet of a batch could not be generated.
+    """
+    if failures:
+        logger.error(f"Fatal: {failures} datasheets could not be generated.")
+        sys.exit(1)
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """
+    Returns the command line parser, shared with watch.py.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate or update a datasheet for a Mozilla Common Voice dataset."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--base_path",
+        type=Path,
+        help="Path to the language directory (e.g., ./cv-corpus-vX/kk)",
+    )
+    source.add_argument(
+        "--corpus_root",
+        type=Path,
+        help="Path to a corpus release (e.g., ./cv-corpus-vX); processes "
+        "every locale directory in it. Requires --output_dir.",
+    )
+    source.add_argument(
+        "--archive",
+        type=Path,
+        nargs="+",
+        help="Path(s) to release archives (.tar.gz); the TSVs are read "
+        "straight from the archive without extracting it.",
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        help="Batch and archive mode: directory for the <locale>.json stats "
+        "and <locale>.md datasheets.",
+    )
+    parser.add_argument(
+        "--update_dir",
+        type=Path,
+        help="Batch and archive mode: directory of existing <locale>.md "
+        "datasheets to update.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Batch mode: number of worker processes (default: CPU count).",
+    )
+    parser.add_argument(
+        "--cache_dir",
+        type=Path,
+        help="Directory for the duration index and columnar caches of the "
+        f"corpus TSVs (default: <base_path>/{CACHE_DIR_NAME}; in batch mode "
+        "one subdirectory per locale).",
+    )
+    parser.add_argument(
+        "--rebuild_cache",
+        action="store_true",
+        help="Ignore and rebuild the cached TSV columns and duration index.",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Stream the TSVs without reading or writing any cache.",
+    )
+    parser.add_argument(
+        "--parse_workers",
+        type=int,
+        help="Number of processes that parse shards of one large TSV "
+        "(default: CPU count; 1 in batch mode, where locales already run "
+        "in parallel).",
+    )
+    parser.add_argument(
+        "--state_dir",
+        type=Path,
+        help="Directory for the saved aggregate state of the locale (in "
+        "batch mode, one subdirectory per locale). When a state from a "
+        "previous release is found, only the rows added or removed since "
+        "are processed; the previous release must still be on disk.",
+    )
+    parser.add_argument(
+        "--full_update",
+        action="store_true",
+        help="Send existing datasheets to the model in full to be updated, "
+        "instead of re-rendering only their stale statistical sections.",
+    )
+    parser.add_argument(
+        "--prompt_token_budget",
+        type=int,
+        default=DEFAULT_TOKEN_BUDGET,
+        help="Estimated tokens a locale's prompt may take; optional sections "
+        "and accents are left out of bigger prompts (default: "
+        f"{DEFAULT_TOKEN_BUDGET}).",
+    )
+    parser.add_argument(
+        "--top_accents",
+        type=int,
+        default=TOP_ACCENTS,
+        help="Most frequent accents listed in the prompt; the others are "
+        f"summed into one row (default: {TOP_ACCENTS}).",
+    )
+    parser.add_argument(
+        "--model",
+        default=DEFAULT_MODEL,
+        help=f"Language model to generate the datasheets with (default: "
+        f"{DEFAULT_MODEL}).",
+    )
+    parser.add_argument(
+        "--llm_url",
+        help="Send prompts as JSON to this URL instead of the Gemini API "
+        "(e.g. the stub server of llm_dispatch.py).",
+    )
+    parser.add_argument(
+        "--llm_concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of API requests in flight (default: 4).",
+    )
+    parser.add_argument(
+        "--llm_rpm",
+        type=float,
+        default=60.0,
+        help="Maximum number of API requests started per minute "
+        "(default: 60).",
+    )
+    parser.add_argument(
+        "--llm_cache_dir",
+        type=Path,
+        help="Directory of cached API responses, keyed by model and prompt "
+        f"(default: ./{CACHE_DIR_NAME}/llm).",
+    )
+    parser.add_argument(
+        "--no_llm_cache",
+        action="store_true",
+        help="Call the API without reading or writing cached responses.",
+    )
+    parser.add_argument(
+        "--stats_db",
+        type=Path,
+        help="SQLite database to add the stats of each locale to, keyed by "
+        "release and locale, for trend queries across releases (see "
+        "stats_store.py).",
+    )
+    parser.add_argument(
+        "--release",
+        help="Release name under which --stats_db stores the stats "
+        "(default: the cv-corpus-* name in the source path).",
+    )
+    parser.add_argument(
+        "--metrics_dir",
+        type=Path,
+        help="Write a <locale>.metrics.json report of the time, rows, bytes "
+        "and memory of each stage of each locale to this directory.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Also profile the stats computation of each locale and write "
+        "<locale>.prof (cProfile) and <locale>.tracemalloc.txt (largest "
+        "allocation sites) to --metrics_dir.",
+    )
+    parser.add_argument(
+        "--update_file",
+        type=Path,
+        help="Optional path to an existing markdown datasheet to update.",
+    )
+    return parser
+
+
 def main():
     """
     Main entry point and orchestrator for the datasheet generation script.
@@ -311,6 +2291,16 @@ def main():
              python generate_datasheet.py --base_path /path/to/language_dir
            - To update an existing file:
              python generate_datasheet.py --base_path /path/to/lang_dir --update_file existing_datasheet.md
+           - To process every locale of a release in parallel:
+             python generate_datasheet.py --corpus_root /path/to/cv-corpus-vX --output_dir out/
+           - To read a locale straight from its release archive:
+             python generate_datasheet.py --archive /path/to/cv-corpus-vX-kk.tar.gz
+           - To reuse the stats of the previous release and only process what changed:
+             python generate_datasheet.py --base_path /path/to/cv-corpus-vY/kk --state_dir state/kk
+           - To keep the stats of each release in a database for trend queries (see stats_store.py):
+             python generate_datasheet.py --corpus_root /path/to/cv-corpus-vX --output_dir out/ --stats_db stats.db
+           - To record the time and memory of each stage in metrics/kk.metrics.json:
+             python generate_datasheet.py --base_path /path/to/lang_dir --metrics_dir metrics/ [--profile]
     """
     logging.basicConfig(
         level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
@@ -318,21 +2308,58 @@ def main():
     logger.info(f"Setting CSV field size limit to {CSV_FIELD_SIZE_LIMIT}")
     csv.field_size_limit(CSV_FIELD_SIZE_LIMIT)
 
-    parser = argparse.ArgumentParser(
-        description="Generate or update a datasheet for a Mozilla Common Voice dataset."
-    )
-    parser.add_argument(
-        "--base_path",
-        type=Path,
-        required=True,
-        help="Path to the language directory (e.g., ./cv-corpus-vX/kk)",
-    )
-    parser.add_argument(
-        "--update_file",
-        type=Path,
-        help="Optional path to an existing markdown datasheet to update.",
-    )
+    parser = make_parser()
     args = parser.parse_args()
+    if args.profile and not args.metrics_dir:
+        parser.error("--profile requires --metrics_dir")
+
+    if args.corpus_root:
+        if not args.output_dir:
+            parser.error("--corpus_root requires --output_dir")
+        if not args.corpus_root.is_dir():
+            logger.error(
+                f"Fatal: Provided path '{args.corpus_root}' is not a valid directory."
+            )
+            return
+        exit_on_failures(run_batch(args))
+        return
+
+    if args.archive:
+        if args.state_dir:
+            parser.error("--state_dir is not supported with --archive")
+        all_stats = {}
+        metrics = {}
+        with profiled("archive", args.metrics_dir if args.profile else None):
+            for archive_path in args.archive:
+                all_stats.update(compute_archive_stats(archive_path, metrics))
+        if args.stats_db:
+            store_stats(args, all_stats.values())
+        if args.output_dir:
+            args.output_dir.mkdir(parents=True, exist_ok=True)
+            for stats in all_stats.values():
+                write_locale_stats(stats, args.output_dir)
+            failures = asyncio.run(
+                write_datasheets(
+                    all_stats.values(),
+                    args.output_dir,
+                    args.update_dir,
+                    make_dispatcher(args),
+                    args.full_update,
+                    metrics,
+                    args.metrics_dir,
+                    make_prompt_limits(args),
+                )
+            )
+            exit_on_failures(failures)
+            return
+        if len(all_stats) != 1:
+            parser.error(
+                "--archive with several locales requires --output_dir"
+            )
+        (stats,) = all_stats.values()
+        (metrics,) = metrics.values()
+    else:
+        stats = None
 
     existing_markdown_content = None
     if args.update_file:
@@ -348,81 +2375,60 @@ def main():
                 f"File to update not found: {args.update_file}. Will create a new file instead."
             )
 
-    base_path = args.base_path
-    if not base_path.is_dir():
-        logger.error(
-            f"Fatal: Provided path '{base_path}' is not a valid directory."
-        )
-        return
-
-    lang_code = base_path.name
-    lang_name_map = {
-        "kk": "Kazakh",
-        "ky": "Kyrgyz",
-        "uz": "Uzbek",
-        "az": "Azerbaijani",
-        "tg": "Tajik",
-        "ru": "Russian",
-        "tr": "Turkish",
-        "en": "English",
-        "nn-NO": "Norwegian Nynorsk",
-        "tt": "Tatar",
-    }
-    lang_name = lang_name_map.get(lang_code, lang_code.upper())
-    logger.info(
-        f"Starting datasheet generation for language: {lang_name} ({lang_code})"
-    )
+    if stats is None:
+        base_path = args.base_path
+        if not base_path.is_dir():
+            logger.error(
+                f"Fatal: Provided path '{base_path}' is not a valid directory."
+            )
+            return
 
-    validated_clips = read_tsv(base_path / "validated.tsv")
-    invalidated_clips = read_tsv(base_path / "invalidated.tsv")
-    all_clips_durations = read_tsv(base_path / "clip_durations.tsv")
-    validated_sentences = read_tsv(base_path / "validated_sentences.tsv")
-    unvalidated_sentences_data = read_tsv(
-        base_path / "unvalidated_sentences.tsv"
-    )
-    durations_map = {
-        row["clip"]: int(row["duration[ms]"]) for row in all_clips_durations
-    }
+        lang_code = base_path.name
+        lang_name = locale_name(lang_code)
+        logger.info(
+            f"Starting datasheet generation for language: {lang_name} ({lang_code})"
+        )
 
-    validated_hours = round(get_hours(validated_clips, durations_map), 2)
-    invalidated_hours = round(get_hours(invalidated_clips, durations_map), 2)
-
-    stats = {
-        "language": {"code": lang_code, "name": lang_name},
-        "clip_stats": {
-            "total_count": len(all_clips_durations),
-            "validated_count": len(validated_clips),
-            "invalidated_count": len(invalidated_clips),
-            "validated_hours": validated_hours,
-            "invalidated_hours": invalidated_hours,
-            "total_hours": validated_hours + invalidated_hours,
-        },
-        "sentence_stats": {
-            "validated_count": len(validated_sentences),
-            "invalidated_count": len(unvalidated_sentences_data),
-            "total_count": len(validated_sentences)
-            + len(unvalidated_sentences_data),
-        },
-        "demographics": get_demographics(validated_clips),
-        "contributor_stats": get_contributor_stats(validated_clips),
-        "text_corpus": get_text_corpus_stats(
-            validated_sentences, validated_clips
-        ),
-    }
+        cache_dir = None
+        if not args.no_cache:
+            cache_dir = args.cache_dir or base_path / CACHE_DIR_NAME
+        metrics = StageReport(lang_code)
+        with profiled(lang_code, args.metrics_dir if args.profile else None):
+            stats = compute_stats(
+                base_path,
+                lang_code,
+                lang_name,
+                cache_dir,
+                args.rebuild_cache,
+                args.parse_workers or os.cpu_count() or 1,
+                args.state_dir,
+                metrics,
+            )
+        if args.stats_db:
+            store_stats(args, [stats])
 
-    prompt = generate_prompt_for_llm(
-        stats,
-        SENTENCE_THRESHOLD,
-        AVG_CLIPS_THRESHOLD,
-        existing_markdown_content,
-    )
-    final_markdown = call_gemini_api(prompt)
+    try:
+        final_markdown = asyncio.run(
+            produce_datasheet(
+                stats,
+                make_dispatcher(args),
+                existing_markdown_content,
+                args.full_update,
+                metrics,
+                make_prompt_limits(args),
+            )
+        )
+    except LLMError as e:
+        logger.error(
+            f"Fatal: An error occurred during the Gemini API call: {e}"
+        )
+        sys.exit(1)
+    if args.metrics_dir:
+        logger.info(f"Wrote {metrics.write(args.metrics_dir)}")
 
     print("\n\n" + "=" * 30 + " RESULTS " + "=" * 30)
-    print("\n--- PART 1: GATHERED STATISTICS (Data sent to LLM) ---\n")
-    stats_for_printing = json.loads(
-        json.dumps(stats, default=lambda o: dict(o))
-    )
+    print("\n--- PART 1: GATHERED STATISTICS ---\n")
+    stats_for_printing = stats_to_json(stats)
     print(json.dumps(stats_for_printing, indent=2, ensure_ascii=False))
     print("\n\n--- PART 2: FINAL MARKDOWN (Generated by Gemini API) ---\n")
     print(final_markdown)
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited dispatch of datasheet prompts to a language model.
+
+Generating the datasheets of a whole release means hundreds of prompts,
+each taking several seconds to answer. `Dispatcher` keeps up to
+`concurrency` requests in flight on an asyncio event loop, spaces them out
+with a token bucket so that the API's rate limit is respected, and retries
+transient failures (rate limiting, 5xx, dropped connections) with
+exponential backoff. Answers are stored in a `ResponseCache` keyed by a
+hash of the model and the prompt, so reruns and locales whose stats did not
+change never reach the API again.
+
+The model is reached through a client object with a single coroutine,
+`generate(model, prompt) -> str`. `GeminiClient` talks to the Gemini API;
+`HTTPClient` posts the prompt as JSON to any URL, e.g. the stub server
+started with `python llm_dispatch.py --serve_stub 8765`, which stands in for
+Gemini in tests and benchmarks.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+DEFAULT_MODEL = "models/gemini-2.5-pro"
+# HTTP status codes worth retrying: rate limited, or the server is in
+# trouble.
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Exceptions of the Google SDK that mean the request may succeed if retried;
+# empty when the SDK is not installed.
+TRANSIENT_SDK_ERRORS = ()
+try:
+    from google.api_core import exceptions as api_exceptions
+except ImportError:
+    pass
+else:
+    TRANSIENT_SDK_ERRORS = (
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.ResourceExhausted,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError,
+    )
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """
+    A request to the language model failed and should not be retried.
+    """
+
+
+class TransientLLMError(LLMError):
+    """
+    A request to the language model failed, but may succeed if retried.
+    """
+
+
+# --- CLIENTS ---
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Returns whether an error raised by a model SDK is worth retrying: a
+    transient exception of the Google SDK, an HTTP status in
+    `TRANSIENT_STATUS_CODES` (as the error's `code` or `status_code`, or its
+    response's `status_code`), or a dropped connection or timeout.
+    """
+    if isinstance(
+        error,
+        TRANSIENT_SDK_ERRORS
+        + (ConnectionError, TimeoutError, asyncio.TimeoutError),
+    ):
+        return True
+    response = getattr(error, "response", None)
+    for code in (
+        getattr(error, "code", None),
+        getattr(error, "status_code", None),
+        getattr(response, "status_code", None),
+    ):
+        # gRPC errors carry a `StatusCode` enum rather than an HTTP status.
+        if isinstance(code, int) and code in TRANSIENT_STATUS_CODES:
+            return True
+    return False
+
+
+class GeminiClient:
+    """
+    Sends prompts to the Gemini API through the `google-genai` SDK, which is
+    only imported (and the API key only checked) on the first request.
+    """
+
+    def __init__(self):
+        self._client = None
+
+    def _connect(self):
+        try:
+            from google import genai
+        except ImportError:
+            raise LLMError(
+                "The new Google GenAI SDK ('google-genai') is not installed. "
+                "Please install it using: pip install google-genai"
+            )
+        if not os.getenv("GEMINI_API_KEY"):
+            raise LLMError("GEMINI_API_KEY environment variable not set.")
+        logger.info("Instantiating the GenAI Client...")
+        return genai.Client()
+
+    async def generate(self, model: str, prompt: str) -> str:
+        if self._client is None:
+            self._client = self._connect()
+        try:
+            aio = getattr(self._client, "aio", None)
+            if aio is not None:
+                response = await aio.models.generate_content(
+                    model=model, contents=prompt
+                )
+            else:
+                response = await asyncio.to_thread(
+                    self._client.models.generate_content,
+                    model=model,
+                    contents=prompt,
+                )
+        except Exception as e:
+            if is_transient(e):
+                raise TransientLLMError(f"Gemini API error: {e}") from e
+            raise LLMError(f"Gemini API error: {e}") from e
+        return response.text
+
+
+class HTTPClient:
+    """
+    Posts `{"model": ..., "prompt": ...}` to `url` and expects `{"text": ...}`
+    back.
+    """
+
+    def __init__(self, url: str, timeout: float = 600.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def generate(self, model: str, prompt: str) -> str:
+        return await asyncio.to_thread(self._post, model, prompt)
+
+    def _post(self, model: str, prompt: str) -> str:
+        body = json.dumps({"model": model, "prompt": prompt}).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as r:
+                return json.loads(r.read().decode("utf-8"))["text"]
+        except urllib.error.HTTPError as e:
+            if e.code in TRANSIENT_STATUS_CODES:
+                raise TransientLLMError(f"HTTP {e.code} from {self.url}")
+            raise LLMError(f"HTTP {e.code} from {self.url}")
+        except (urllib.error.URLError, ConnectionError, TimeoutError) as e:
+            raise TransientLLMError(f"Could not reach {self.url}: {e}")
+
+
+# --- RATE LIMITING AND CACHING ---
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second on average, with bursts of up to
+    `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ResponseCache:
+    """
+    Model answers stored as `<cache_dir>/<hash of model and prompt>.json`.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(model.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, model: str, prompt: str) -> Optional[str]:
+        path = self.cache_dir / f"{self.key(model, prompt)}.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))["text"]
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def put(self, model: str, prompt: str, text: str) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{self.key(model, prompt)}.json"
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"model": model, "text": text}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
+
+
+# --- DISPATCHER ---
+
+
+class Dispatcher:
+    """
+    Sends prompts to `client` with at most `concurrency` requests in flight
+    and at most `requests_per_minute` requests started per minute, retrying
+    transient errors up to `max_retries` times.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str = DEFAULT_MODEL,
+        concurrency: int = 4,
+        requests_per_minute: float = 60.0,
+        max_retries: int = 5,
+        backoff: float = 2.0,
+        max_backoff: float = 120.0,
+        cache: Optional[ResponseCache] = None,
+    ):
+        self.client = client
+        self.model = model
+        self.concurrency = concurrency
+        self.requests_per_minute = requests_per_minute
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.cache = cache
+        # Created on first use, inside the running event loop.
+        self._slots = None
+        self._bucket = None
+
+    async def generate(self, prompt: str) -> str:
+        """
+        Returns the model's answer to `prompt`, from the cache if possible.
+        Raises `LLMError` once retries are exhausted.
+        """
+        if self.cache is not None:
+            text = self.cache.get(self.model, prompt)
+            if text is not None:
+                logger.info("Using cached response from the language model.")
+                return text
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(
+                self.requests_per_minute / 60, capacity=self.concurrency
+            )
+
+        async with self._slots:
+            for attempt in range(self.max_retries + 1):
+                await self._bucket.acquire()
+                try:
+                    text = await self.client.generate(self.model, prompt)
+                    break
+                except TransientLLMError as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = min(
+                        self.max_backoff,
+                        self.backoff * 2**attempt * (0.5 + random.random()),
+                    )
+                    logger.warning(f"{e}; retrying in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+        logger.info("Successfully received response from the API.")
+        if self.cache is not None:
+            self.cache.put(self.model, prompt, text)
+        return text
+
+    async def generate_many(self, prompts: Iterable[str]) -> List[str]:
+        return await asyncio.gather(*(self.generate(p) for p in prompts))
+
+
+def make_client(url: Optional[str] = None):
+    """
+    Returns an `HTTPClient` for `url`, or a `GeminiClient` when no URL is
+    given.
+    """
+    return HTTPClient(url) if url else GeminiClient()
+
+
+# --- STUB SERVER ---
+
+
+def serve_stub(port: int, latency: float = 0.0) -> None:
+    """
+    Serves canned markdown answers to `HTTPClient` requests on `port`, after
+    waiting `latency` seconds per request.
+    """
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length).decode("utf-8"))
+            time.sleep(latency)
+            body = json.dumps(
+                {
+                    "text": f"# Stub datasheet\n\nPrompt of "
+                    f"{len(request['prompt'])} characters for "
+                    f"{request['model']}.\n"
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    logger.info(f"Serving stub language model on http://127.0.0.1:{port}/")
+    ThreadingHTTPServer(("127.0.0.1", port), StubHandler).serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(
+        description="Run a stub language model server for tests and "
+        "benchmarks of the datasheet generation."
+    )
+    parser.add_argument(
+        "--serve_stub", type=int, required=True, metavar="PORT"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Seconds to wait before answering each request.",
+    )
+    args = parser.parse_args()
+    serve_stub(args.serve_stub, args.latency)
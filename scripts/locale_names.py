@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Resolves locale codes to their English and native names from the
+metadata.json files written by metadata/scs/merge-metadata.py.
+
+The metadata of the scripted and spontaneous speech sites is indexed into a
+single dict on first use, so scripts share one complete source of names
+instead of keeping their own partial tables. When both files know a locale,
+the first file's names win and the second only fills names left empty.
+"""
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+METADATA_DIR = Path(__file__).resolve().parent.parent / "metadata"
+METADATA_FILES = (
+    METADATA_DIR / "scs" / "metadata.json",
+    METADATA_DIR / "sps" / "metadata.json",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class LocaleNames:
+    """
+    The names of every locale in `metadata_files`.
+    """
+
+    def __init__(self, metadata_files: Iterable[Path] = METADATA_FILES):
+        self.entries: Dict[str, Dict[str, str]] = {}
+        for path in metadata_files:
+            try:
+                metadata = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                logger.warning(f"Locale metadata not found: {path}")
+                continue
+            for locale, names in metadata.items():
+                entry = self.entries.setdefault(locale, {})
+                for key in ("english_name", "native_name"):
+                    if not entry.get(key):
+                        entry[key] = names.get(key, "")
+
+    def __contains__(self, locale: str) -> bool:
+        return locale in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, locale: str) -> Optional[Dict[str, str]]:
+        """
+        Returns the metadata entry of `locale`, or None.
+        """
+        return self.entries.get(locale)
+
+    def english_name(self, locale: str) -> str:
+        """
+        Returns the English name of `locale`, or its upper-cased code.
+        """
+        entry = self.entries.get(locale)
+        return (entry and entry["english_name"]) or locale.upper()
+
+    def native_name(self, locale: str) -> str:
+        """
+        Returns the native name of `locale`, or `<English name>` as in the
+        drafts.
+        """
+        entry = self.entries.get(locale)
+        return (entry and entry["native_name"]) or (
+            f"<{self.english_name(locale)}>"
+        )
+
+
+@lru_cache(maxsize=None)
+def default_names() -> LocaleNames:
+    """
+    Returns the names of the repository's metadata, loaded once per process.
+    """
+    return LocaleNames()
+
+
+def locale_name(locale: str) -> str:
+    """
+    Returns the English name of `locale` from the repository's metadata.
+    """
+    return default_names().english_name(locale)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Compacts the stats of a locale into the payload of the datasheet prompt.
+
+Serializing the whole stats dict made the prompt of big locales huge: the
+accent Counter holds thousands of free-text values, the alphabet of some
+scripts thousands of characters, and the model was asked to turn all of it
+into tables it then had to reproduce token by token. Instead, the payload
+holds:
+
+    sections    the statistical sections rendered locally by
+                render_datasheet.py, for the model to copy verbatim, with
+                the accents cut to the `top_accents` most frequent and an
+                "Other" row for the rest
+    data        compact JSON of the figures the model still writes prose
+                about (headline counts, text corpus averages, sources, the
+                kept accents, which it translates, and in `accents_other`
+                the number and clips of the others)
+
+`fit_payload()` then drops the sections the datasheet can do without, in
+`OPTIONAL_SECTIONS` order, and halves the accents kept, until the whole
+prompt fits the per-locale token budget. Tokens are estimated from the UTF-8
+size of the text, which is close enough to keep the cost and latency of
+every call in the same range across locales.
+"""
+import json
+import math
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from render_datasheet import render_stat_sections, top_counts
+
+DEFAULT_TOKEN_BUDGET = 12000
+TOP_ACCENTS = 20
+MIN_ACCENTS = 5
+# Roughly 4 bytes of UTF-8 per token for Latin scripts; scripts with
+# multi-byte characters also take more tokens per character.
+BYTES_PER_TOKEN = 4
+# Dropped first when over budget; the model leaves these sections out.
+OPTIONAL_SECTIONS = ("Alphabet", "Sample Sentences", "Splits")
+TEXT_CORPUS_FIGURES = (
+    "sentences_without_recording",
+    "average_clips_per_sentence",
+    "average_sentence_length_tokens",
+    "average_sentence_length_chars",
+    "duplicate_sentences",
+    "unique_sources",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Returns an estimate of the number of model tokens in `text`.
+    """
+    return math.ceil(len(text.encode("utf-8")) / BYTES_PER_TOKEN)
+
+
+class PromptLimits:
+    """
+    The token budget of one locale's prompt and the number of accents it
+    lists at most.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        top_accents: int = TOP_ACCENTS,
+    ):
+        self.token_budget = token_budget
+        self.top_accents = top_accents
+
+
+class PromptPayload:
+    """
+    The pre-rendered sections and compact data of one locale's prompt.
+    """
+
+    def __init__(
+        self,
+        stats: Mapping[str, Any],
+        top_accents: int,
+        dropped: List[str],
+    ):
+        demographics = stats["demographics"]
+        text_corpus = stats["text_corpus"]
+        self.accents_total = len(demographics["accent"])
+        accents, accents_other = top_counts(
+            demographics["accent"], top_accents
+        )
+        self.accents_kept = min(top_accents, self.accents_total)
+        self.dropped = dropped
+
+        self.sections = {
+            title: body
+            for title, body in render_stat_sections(stats, top_accents).items()
+            if title not in dropped
+        }
+        self.data = {
+            "language": stats["language"],
+            "clip_stats": stats["clip_stats"],
+            "sentence_stats": stats["sentence_stats"],
+            "contributors": sum(stats["contributor_stats"].values()),
+            "accents": accents,
+            "text_corpus": {
+                key: text_corpus[key]
+                for key in TEXT_CORPUS_FIGURES
+                if key in text_corpus
+            },
+        }
+        if accents_other:
+            self.data["accents_other"] = accents_other
+        if "split_speaker_overlap" in stats:
+            self.data["split_speaker_overlap"] = stats["split_speaker_overlap"]
+
+    def data_json(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, separators=(",", ":"))
+
+    def sections_text(self) -> str:
+        """
+        Returns the pre-rendered sections, each between BEGIN and END lines.
+        """
+        return "\n".join(
+            f"--- BEGIN {title} ---\n{body}\n--- END {title} ---\n"
+            for title, body in self.sections.items()
+        )
+
+
+def fit_payload(
+    stats: Mapping[str, Any],
+    build_prompt: Callable[[PromptPayload], str],
+    limits: Optional[PromptLimits] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Returns the prompt that `build_prompt` makes of the largest payload of
+    `stats` (as written to `<locale>.json`) within the token budget, or of
+    the smallest payload if none fits, and the size report of the prompt.
+    """
+    limits = limits or PromptLimits()
+    top_accents = limits.top_accents
+    dropped: List[str] = []
+    while True:
+        payload = PromptPayload(stats, top_accents, list(dropped))
+        prompt = build_prompt(payload)
+        tokens = estimate_tokens(prompt)
+        if tokens <= limits.token_budget:
+            break
+        optional = [t for t in OPTIONAL_SECTIONS if t in payload.sections]
+        if optional:
+            dropped.append(optional[0])
+        elif top_accents > MIN_ACCENTS:
+            top_accents = max(MIN_ACCENTS, top_accents // 2)
+        else:
+            break
+    return prompt, {
+        "prompt_chars": len(prompt),
+        "prompt_tokens": tokens,
+        "token_budget": limits.token_budget,
+        "data_tokens": estimate_tokens(payload.data_json()),
+        "section_tokens": estimate_tokens(payload.sections_text()),
+        "accents_kept": payload.accents_kept,
+        "accents_total": payload.accents_total,
+        "dropped_sections": payload.dropped,
+    }
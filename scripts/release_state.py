@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Resumable per-locale state for computing stats incrementally between corpus
+releases.
+
+Each Common Voice release of a locale is mostly the previous release plus
+new clips. Instead of recomputing everything, generate_datasheet.py can save
+the aggregate state of a locale (per-contributor clip counts, demographic
+counters, duration sums, the character histogram, sentence clip counts...)
+together with a line index of every TSV: the 64-bit hash and byte offset of
+each data line, and the line-aligned chunks of about `CHUNK_SIZE` bytes the
+file is made of, each with its offset, size and digest.
+
+On the next release, each changed TSV is walked chunk by chunk: a chunk
+whose bytes are unchanged, at its old offset or shifted, is checked with a
+single digest and skipped. Only the lines between unchanged chunks are
+hashed, and only those of them that are new are parsed and applied. The
+lines of the old chunks that were not found again are looked up by their
+offsets in the previous release's file (which must still be on disk) and
+taken out again, so neither file is read line by line outside the changed
+ranges.
+
+A state directory holds `state.json`, per TSV the `<tsv name>.lines`,
+`.offsets` and `.chunks` arrays of its line index, and one `.array` file per
+array in the state (e.g. the sentence hashes), named after its key path; the
+JSON only refers to these files, so it stays small however big the corpus.
+"""
+import csv
+import hashlib
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+STATE_VERSION = 5
+STATE_FILE_NAME = "state.json"
+# Target size of the line-aligned chunks of a TSV; an unchanged chunk costs
+# one digest instead of one hash per line.
+CHUNK_SIZE = 1 << 16
+INDEX_ARRAYS = ("lines", "offsets", "chunks")
+
+
+class StaleStateError(Exception):
+    """
+    Raised when a saved state cannot be moved forward to the current files,
+    e.g. because a header changed or the previous release is gone.
+    """
+
+
+class LineIndex:
+    """
+    The hashes of the data lines of a TSV in file order, their byte offsets
+    relative to the start of their chunk, and the chunks as (offset, size,
+    digest, index of the first line) quadruples, flattened.
+    """
+
+    def __init__(
+        self,
+        hashes: Optional[array] = None,
+        offsets: Optional[array] = None,
+        chunks: Optional[array] = None,
+    ):
+        self.hashes = hashes if hashes is not None else array("Q")
+        self.offsets = offsets if offsets is not None else array("Q")
+        self.chunks = chunks if chunks is not None else array("Q")
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunks) // 4
+
+    def chunk(self, i: int) -> Tuple[int, int, int, int]:
+        """
+        Returns the offset, size, digest and first line of chunk `i`.
+        """
+        offset, size, digest, first = self.chunks[4 * i : 4 * i + 4]
+        return offset, size, digest, first
+
+    def chunk_lines(self, i: int) -> range:
+        """
+        Returns the indexes of the lines of chunk `i`.
+        """
+        end = (
+            self.chunks[4 * i + 7]
+            if i + 1 < self.chunk_count
+            else len(self.hashes)
+        )
+        return range(self.chunks[4 * i + 3], end)
+
+
+class LineDelta:
+    """
+    The difference between a TSV file and the line index of its previous
+    version: the index of the file, the text of the added lines and the
+    offsets of the removed ones in the previous file.
+    """
+
+    def __init__(
+        self,
+        header: List[str],
+        index: LineIndex,
+        added: List[str],
+        removed: List[int],
+    ):
+        self.header = header
+        self.index = index
+        self.added = added
+        self.removed = removed
+
+
+class _IndexBuilder:
+    """
+    Builds the `LineIndex` of a file from its lines and from the unchanged
+    chunks of a previous index, in file order.
+    """
+
+    def __init__(self):
+        self.index = LineIndex()
+        self._start = None
+        self._first = 0
+        self._size = 0
+        self._digest = None
+
+    def add_line(self, offset: int, line: bytes, h: Optional[int]) -> None:
+        """
+        Adds a line at `offset`, with its hash or None if it is blank.
+        """
+        if self._start is None:
+            self._start = offset
+            self._first = len(self.index.hashes)
+            self._size = 0
+            self._digest = hashlib.blake2b(digest_size=8)
+        if h is not None:
+            self.index.hashes.append(h)
+            self.index.offsets.append(offset - self._start)
+        self._digest.update(line)
+        self._size += len(line)
+        if self._size >= CHUNK_SIZE:
+            self.close()
+
+    def add_chunk(self, old: LineIndex, i: int, offset: int) -> None:
+        """
+        Adds chunk `i` of `old`, found unchanged at `offset`.
+        """
+        self.close()
+        _, size, digest, _ = old.chunk(i)
+        lines = old.chunk_lines(i)
+        self.index.chunks.extend(
+            (offset, size, digest, len(self.index.hashes))
+        )
+        self.index.hashes.extend(old.hashes[lines.start : lines.stop])
+        self.index.offsets.extend(old.offsets[lines.start : lines.stop])
+
+    def close(self) -> None:
+        """
+        Ends the chunk of the lines added since the last one.
+        """
+        if self._start is None:
+            return
+        self.index.chunks.extend(
+            (
+                self._start,
+                self._size,
+                int.from_bytes(self._digest.digest(), "little"),
+                self._first,
+            )
+        )
+        self._start = None
+
+
+def line_hash(line: bytes) -> int:
+    """
+    Returns the 64-bit hash of a TSV line, ignoring its line ending.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(line.rstrip(b"\r\n"), digest_size=8).digest(),
+        "little",
+    )
+
+
+def index_lines(tsv_path: Path) -> Tuple[List[str], LineIndex]:
+    """
+    Returns the header of `tsv_path` and the index of its data lines.
+    """
+    delta = diff_lines(tsv_path, LineIndex(), keep_added=False)
+    return delta.header, delta.index
+
+
+def diff_lines(
+    tsv_path: Path, old: LineIndex, keep_added: bool = True
+) -> LineDelta:
+    """
+    Compares the data lines of `tsv_path` with the `old` index of its
+    previous version. Returns the new index, the text of the added lines and
+    the offsets of the removed ones. Lines are compared as a set, which is
+    exact for Common Voice TSVs since every row carries a unique clip path
+    or sentence id.
+
+    The old chunks are looked for in order; after a changed range, the next
+    unchanged chunk is found again by the hash of its first line.
+    """
+    builder = _IndexBuilder()
+    chunk_starts = {}
+    for i in range(old.chunk_count):
+        lines = old.chunk_lines(i)
+        if lines:
+            chunk_starts.setdefault(old.hashes[lines.start], i)
+    found = bytearray(old.chunk_count)
+    added = []
+    changed = array("Q")
+    with open(tsv_path, "rb") as f:
+        header_line = f.readline().decode("utf-8").rstrip("\r\n")
+        header = next(csv.reader([header_line], delimiter="\t"), [])
+        pos = f.tell()
+        candidate = 0 if old.chunk_count else None
+        while True:
+            if (
+                candidate is not None
+                and candidate < old.chunk_count
+                and not found[candidate]
+                and _chunk_at(f, pos, old.chunk(candidate))
+            ):
+                builder.add_chunk(old, candidate, pos)
+                found[candidate] = 1
+                pos += old.chunk(candidate)[1]
+                candidate += 1
+                continue
+            tried, candidate = candidate, None
+            f.seek(pos)
+            line = f.readline()
+            if not line:
+                break
+            h = None
+            if line.strip():
+                h = line_hash(line)
+                i = chunk_starts.get(h)
+                if i is not None and i != tried and not found[i]:
+                    candidate = i
+                    continue
+                changed.append(h)
+                if keep_added:
+                    added.append((h, line))
+            builder.add_line(pos, line, h)
+            pos += len(line)
+    builder.close()
+
+    gone = {}
+    for i in range(old.chunk_count):
+        if not found[i]:
+            offset = old.chunk(i)[0]
+            for j in old.chunk_lines(i):
+                gone[old.hashes[j]] = offset + old.offsets[j]
+    removed = []
+    if gone:
+        kept = set(changed)
+        removed = sorted(offset for h, offset in gone.items() if h not in kept)
+    added = [line.decode("utf-8") for h, line in added if h not in gone]
+    return LineDelta(header, builder.index, added, removed)
+
+
+def collect_lines(tsv_path: Path, offsets: List[int]) -> List[str]:
+    """
+    Returns the lines of `tsv_path` that start at `offsets`.
+    """
+    found = []
+    with open(tsv_path, "rb") as f:
+        for offset in offsets:
+            f.seek(offset)
+            found.append(f.readline().decode("utf-8"))
+    return found
+
+
+def load_state(
+    state_dir: Path,
+) -> Optional[Tuple[Dict, Dict[str, LineIndex]]]:
+    """
+    Returns the saved state and line indexes in `state_dir`, or None if
+    there is no usable state.
+    """
+    try:
+        state = json.loads(
+            (state_dir / STATE_FILE_NAME).read_text(encoding="utf-8")
+        )
+    except (FileNotFoundError, ValueError):
+        return None
+    if state.get("version") != STATE_VERSION:
+        return None
+    try:
+        state = _load_arrays(state, state_dir)
+    except (FileNotFoundError, ValueError):
+        return None
+    line_indexes = {}
+    for file_name in state["files"]:
+        arrays = []
+        for suffix in INDEX_ARRAYS:
+            values = array("Q")
+            try:
+                values.frombytes(
+                    (state_dir / f"{file_name}.{suffix}").read_bytes()
+                )
+            except (FileNotFoundError, ValueError):
+                return None
+            arrays.append(values)
+        line_indexes[file_name] = LineIndex(*arrays)
+    return state, line_indexes
+
+
+def save_state(
+    state_dir: Path, state: Dict, line_indexes: Dict[str, LineIndex]
+) -> None:
+    """
+    Writes `state` and the line indexes of its files to `state_dir`, with
+    the arrays in `state` stored in files of their own; the JSON file is
+    replaced last, so an interrupted save leaves no usable state rather than
+    a corrupt one.
+    """
+    state_dir.mkdir(parents=True, exist_ok=True)
+    state_path = state_dir / STATE_FILE_NAME
+    if state_path.exists():
+        state_path.unlink()
+    for file_name, index in line_indexes.items():
+        for suffix, values in zip(
+            INDEX_ARRAYS, (index.hashes, index.offsets, index.chunks)
+        ):
+            (state_dir / f"{file_name}.{suffix}").write_bytes(values.tobytes())
+    state = _store_arrays(state, state_dir, ())
+    tmp_path = state_dir / (STATE_FILE_NAME + ".tmp")
+    tmp_path.write_text(
+        json.dumps({**state, "version": STATE_VERSION}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, state_path)
+
+
+def _chunk_at(f: BinaryIO, pos: int, chunk: Tuple[int, int, int, int]) -> bool:
+    """
+    Returns whether the bytes of `f` at `pos` are those of `chunk`, ending
+    at a line boundary.
+    """
+    _, size, digest, _ = chunk
+    f.seek(pos)
+    data = f.read(size)
+    if len(data) != size:
+        return False
+    if not data.endswith(b"\n") and f.read(1) not in (b"", b"\r", b"\n"):
+        return False
+    digest_of_data = hashlib.blake2b(data, digest_size=8).digest()
+    return int.from_bytes(digest_of_data, "little") == digest
+
+
+def _store_arrays(value: Any, state_dir: Path, path: Tuple[str, ...]) -> Any:
+    """
+    Returns `value` with each array in it written to a file in `state_dir`
+    and replaced by a reference to that file.
+    """
+    if isinstance(value, array):
+        file_name = ".".join(path) + ".array"
+        (state_dir / file_name).write_bytes(value.tobytes())
+        return {"array_file": file_name, "typecode": value.typecode}
+    if isinstance(value, dict):
+        return {
+            key: _store_arrays(item, state_dir, path + (str(key),))
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [
+            _store_arrays(item, state_dir, path + (str(i),))
+            for i, item in enumerate(value)
+        ]
+    return value
+
+
+def _load_arrays(value: Any, state_dir: Path) -> Any:
+    """
+    Returns `value` with the file references of `_store_arrays()` replaced
+    by the arrays read back.
+    """
+    if isinstance(value, dict):
+        if "array_file" in value:
+            loaded = array(value["typecode"])
+            loaded.frombytes((state_dir / value["array_file"]).read_bytes())
+            return loaded
+        return {
+            key: _load_arrays(item, state_dir) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_load_arrays(item, state_dir) for item in value]
+    return value
@@ -0,0 +1,523 @@
+#!/usr/bin/env python3
+"""
+Fills the statistical placeholders of a datasheet template (templates/scs,
+templates/sps) from the stats computed by generate_datasheet.py, without
+calling the language model.
+
+Tables such as `{{GENDER_TABLE}}`, `{{AGE_TABLE}}` or `{{ALPHABET_TABLE}}`
+follow directly from the numbers, so they are rendered here, in the same
+layout the prompt asks Gemini for. Placeholders that need prose
+(`{{LANGUAGE_DESCRIPTION}}`, ...) or data the stats do not hold are left in
+place for a writer or the model to fill; datasheet-postprocess.py drops the
+sections that are still empty.
+
+A template is compiled once into literal segments and placeholder names, so
+rendering every locale of a release takes a fraction of a second.
+
+USAGE:
+    python render_datasheet.py --template ../templates/scs/en.md \\
+        --metadata ../metadata/scs/metadata.json \\
+        --stats out/*.json --output_dir rendered/
+"""
+import argparse
+import json
+import logging
+import re
+import textwrap
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from locale_names import METADATA_FILES, LocaleNames
+
+# A placeholder on a line of its own, `<!-- {{NAME}} -->`, is replaced by a
+# block; a bare `{{NAME}}` is replaced inline.
+PLACEHOLDER_RE = re.compile(r"<!-- \{\{(\w+)\}\} -->|\{\{(\w+)\}\}")
+
+GENDER_LABELS = {
+    "male_masculine": "male, masculine",
+    "female_feminine": "female, feminine",
+    "do_not_wish_to_say": "undeclared",
+}
+AGE_ORDER = [
+    "teens",
+    "twenties",
+    "thirties",
+    "fourties",
+    "fifties",
+    "sixties",
+    "seventies",
+    "eighties",
+    "nineties",
+]
+SPLIT_ORDER = ["train", "dev", "test", "other"]
+LINE_WIDTH = 79
+
+logger = logging.getLogger(__name__)
+
+
+class Template:
+    """
+    A datasheet template split into literal text and placeholder names.
+    """
+
+    def __init__(self, text: str):
+        self.segments = []
+        pos = 0
+        for match in PLACEHOLDER_RE.finditer(text):
+            self.segments.append(text[pos : match.start()])
+            self.segments.append((match.group(1) or match.group(2), match[0]))
+            pos = match.end()
+        self.segments.append(text[pos:])
+        self.placeholders = {
+            segment[0]
+            for segment in self.segments
+            if isinstance(segment, tuple)
+        }
+
+    @classmethod
+    def from_file(cls, path: Path) -> "Template":
+        return cls(path.read_text(encoding="utf-8"))
+
+    def render(self, values: Mapping[str, str]) -> str:
+        """
+        Substitutes `values` for the placeholders; placeholders without a
+        value are kept verbatim.
+        """
+        return "".join(
+            (
+                segment
+                if isinstance(segment, str)
+                else values.get(segment[0], segment[1])
+            )
+            for segment in self.segments
+        )
+
+
+# --- MARKDOWN HELPERS ---
+
+
+def markdown_table(
+    header: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    right: Sequence[int] = (),
+) -> str:
+    """
+    Returns an aligned markdown table; the columns in `right` (indices) are
+    right-aligned and integers in them get thousands separators.
+    """
+    cells = [list(header)]
+    for row in rows:
+        cells.append(
+            [
+                f"{value:,}" if isinstance(value, int) else str(value)
+                for value in row
+            ]
+        )
+    widths = [max(len(row[i]) for row in cells) for i in range(len(header))]
+
+    def line(row: List[str]) -> str:
+        return (
+            "| "
+            + " | ".join(
+                value.rjust(width) if i in right else value.ljust(width)
+                for i, (value, width) in enumerate(zip(row, widths))
+            )
+            + " |"
+        )
+
+    separator = (
+        "| "
+        + " | ".join(
+            "-" * (width - 1) + ":" if i in right else "-" * width
+            for i, width in enumerate(widths)
+        )
+        + " |"
+    )
+    return "\n".join([line(cells[0]), separator, *map(line, cells[1:])])
+
+
+def bullet_list(items: Iterable[str], bullet: str = "-") -> str:
+    return "\n".join(f"{bullet} {item}" for item in items)
+
+
+# --- SECTIONS ---
+
+
+def gender_table(
+    gender: Mapping[str, int], header: Sequence[str] = ("Gender", "Frequency")
+) -> Optional[str]:
+    if not gender:
+        return None
+    rows = sorted(gender.items(), key=lambda item: -item[1])
+    return markdown_table(
+        header,
+        [
+            (GENDER_LABELS.get(value, value.replace("_", " ")), n)
+            for value, n in rows
+        ],
+        right=[1],
+    )
+
+
+def age_table(
+    age: Mapping[str, int], header: Sequence[str] = ("Age band", "Frequency")
+) -> Optional[str]:
+    if not age:
+        return None
+    known = [band for band in AGE_ORDER if band in age]
+    others = sorted(
+        (band for band in age if band not in AGE_ORDER),
+        key=lambda band: -age[band],
+    )
+    return markdown_table(
+        header,
+        [(band, age[band]) for band in known + others],
+        right=[1],
+    )
+
+
+def top_counts(
+    counts: Mapping[str, int], k: int
+) -> Tuple[Dict[str, int], Optional[Dict[str, int]]]:
+    """
+    Returns the `k` largest counts, most frequent first, and the number of
+    other values and their total (`values`, `clips`), or None if there are
+    no others.
+    """
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    rest = ranked[k:]
+    other = None
+    if rest:
+        other = {"values": len(rest), "clips": sum(n for _, n in rest)}
+    return dict(ranked[:k]), other
+
+
+def accent_table(
+    accent: Mapping[str, int], other: Optional[Mapping[str, int]] = None
+) -> Optional[str]:
+    """
+    Returns the table of the clips of each accent, most frequent first, and
+    a last row for the `other` accents left out (`values`, `clips`).
+    """
+    if not accent:
+        return None
+    rows = sorted(accent.items(), key=lambda item: -item[1])
+    if other:
+        rows.append((f"Other ({other['values']:,} accents)", other["clips"]))
+    return markdown_table(["Accent", "Validated Clips"], rows, right=[1])
+
+
+def symbol_table(counts: Mapping[str, int]) -> Optional[str]:
+    """
+    Returns a table of the characters of the corpus and how many times each
+    occurs, most frequent first.
+    """
+    rows = [
+        (char.replace("|", "\\|"), n)
+        for char, n in sorted(counts.items(), key=lambda item: -item[1])
+        if not char.isspace()
+    ]
+    if not rows:
+        return None
+    return markdown_table(["Symbol", "Frequency"], rows, right=[1])
+
+
+def alphabet_table(alphabet: Sequence[str]) -> Optional[str]:
+    symbols = [char for char in alphabet if not char.isspace()]
+    if not symbols:
+        return None
+    wrapped = textwrap.fill(
+        " ".join(symbols),
+        width=LINE_WIDTH,
+        break_long_words=False,
+        break_on_hyphens=False,
+    )
+    return f"```\n{wrapped}\n```"
+
+
+def clip_table(clip_stats: Mapping[str, Any]) -> str:
+    return markdown_table(
+        ["Type", "Count", "Hours"],
+        [
+            (
+                "Validated Clips",
+                clip_stats["validated_count"],
+                f"{clip_stats['validated_hours']:.2f}",
+            ),
+            (
+                "Invalidated Clips",
+                clip_stats["invalidated_count"],
+                f"{clip_stats['invalidated_hours']:.2f}",
+            ),
+            (
+                "**Total Clips**",
+                clip_stats["total_count"],
+                f"{clip_stats['total_hours']:.2f}",
+            ),
+        ],
+        right=[1, 2],
+    )
+
+
+def sentence_table(sentence_stats: Mapping[str, int]) -> str:
+    return markdown_table(
+        ["Type", "Count"],
+        [
+            ("Validated Sentences", sentence_stats["validated_count"]),
+            ("Invalidated Sentences", sentence_stats["invalidated_count"]),
+            ("**Total Sentences**", sentence_stats["total_count"]),
+        ],
+        right=[1],
+    )
+
+
+def split_table(splits: Mapping[str, Any]) -> Optional[str]:
+    rows = [
+        (
+            name.capitalize(),
+            splits[name]["clip_count"],
+            f"{splits[name]['hours']:.2f}",
+            splits[name]["speakers"],
+        )
+        for name in SPLIT_ORDER
+        if name in splits
+    ]
+    if not rows:
+        return None
+    return markdown_table(
+        ["Split", "Clips", "Hours", "Speakers"], rows, right=[1, 2, 3]
+    )
+
+
+def contributor_table(contributor_stats: Mapping[str, int]) -> str:
+    return markdown_table(
+        ["Clips Contributed", "Number of Contributors"],
+        contributor_stats.items(),
+        right=[1],
+    )
+
+
+def text_corpus_stats(stats: Mapping[str, Any]) -> str:
+    text_corpus = stats["text_corpus"]
+    return bullet_list(
+        [
+            "**Total validated sentences:** "
+            f"{stats['sentence_stats']['validated_count']:,}",
+            "**Sentences without a recording yet:** "
+            f"{text_corpus['sentences_without_recording']:,}",
+            "**Average clips per validated sentence:** "
+            f"{text_corpus['average_clips_per_sentence']:.2f}",
+            "**Average sentence length (tokens):** "
+            f"{text_corpus['average_sentence_length_tokens']:.1f}",
+            "**Average sentence length (characters):** "
+            f"{text_corpus['average_sentence_length_chars']:.1f}",
+        ]
+        + (
+            [
+                "**Duplicate sentences:** "
+                f"{text_corpus['duplicate_sentences']:,}"
+            ]
+            if "duplicate_sentences" in text_corpus
+            else []
+        )
+    )
+
+
+def render_sections(
+    stats: Mapping[str, Any], names: Optional[Mapping[str, str]] = None
+) -> Dict[str, str]:
+    """
+    Returns the text of every placeholder that can be filled from `stats`
+    (as written to `<locale>.json`) and, optionally, the locale's entry in
+    metadata.json. Sections without data are omitted.
+    """
+    language = stats["language"]
+    names = names or {}
+    english_name = names.get("english_name") or language["name"]
+    native_name = names.get("native_name") or f"<{english_name}>"
+    demographics = stats["demographics"]
+    text_corpus = stats["text_corpus"]
+
+    sections = {
+        "LOCALE": language["code"],
+        "ENGLISH_NAME": english_name,
+        "NATIVE_NAME": native_name,
+        "CLIP_TABLE": clip_table(stats["clip_stats"]),
+        "SENTENCE_TABLE": sentence_table(stats["sentence_stats"]),
+        "GENDER_TABLE": gender_table(demographics["gender"]),
+        "AGE_TABLE": age_table(demographics["age"]),
+        "ACCENT_TABLE": accent_table(demographics["accent"]),
+        "SPLIT_TABLE": split_table(stats.get("splits", {})),
+        "CONTRIBUTOR_TABLE": contributor_table(stats["contributor_stats"]),
+        "TEXT_CORPUS_STATS": text_corpus_stats(stats),
+        "ALPHABET_TABLE": (
+            symbol_table(text_corpus["alphabet_counts"])
+            if "alphabet_counts" in text_corpus
+            else alphabet_table(text_corpus["alphabet"])
+        ),
+    }
+    if text_corpus["sample_sentences"]:
+        sections["SENTENCES_SAMPLE"] = bullet_list(
+            text_corpus["sample_sentences"]
+        )
+    if text_corpus["unique_sources"]:
+        sections["SOURCES_LIST"] = bullet_list(
+            text_corpus["unique_sources"], bullet="*"
+        )
+    return {name: text for name, text in sections.items() if text}
+
+
+def render_stat_sections(
+    stats: Mapping[str, Any], top_accents: Optional[int] = None
+) -> Dict[str, str]:
+    """
+    Returns the body of each statistical section of a generated datasheet,
+    keyed by section title, in the layout the Gemini prompt asks for. The
+    accent translations, which need the model, are not included. With
+    `top_accents`, the accent table lists that many accents and sums the
+    others in a last row, as the prompt does.
+    """
+    clip_stats = stats["clip_stats"]
+    demographics = stats["demographics"]
+    text_corpus = stats["text_corpus"]
+    contributors = sum(stats["contributor_stats"].values())
+    accents, other_accents = demographics["accent"], None
+    if top_accents is not None:
+        accents, other_accents = top_counts(accents, top_accents)
+    summary = textwrap.fill(
+        f"The dataset contains **{clip_stats['validated_hours']} validated "
+        f"hours** of speech from **{contributors}** unique contributors.",
+        width=LINE_WIDTH,
+    )
+    sections = {
+        "Clip & Sentence Statistics": "\n\n".join(
+            [
+                summary,
+                clip_table(clip_stats),
+                sentence_table(stats["sentence_stats"]),
+            ]
+        ),
+        "Splits": split_table(stats.get("splits", {})),
+        "Gender": gender_table(
+            demographics["gender"], ("Gender", "Validated Clips")
+        ),
+        "Age": age_table(
+            demographics["age"], ("Age Group", "Validated Clips")
+        ),
+        "Accent": accent_table(accents, other_accents),
+        "Contributor Statistics": contributor_table(
+            stats["contributor_stats"]
+        ),
+        "Text Corpus": text_corpus_stats(stats),
+        "Sample Sentences": bullet_list(text_corpus["sample_sentences"]),
+    }
+    alphabet = (
+        symbol_table(text_corpus["alphabet_counts"])
+        if "alphabet_counts" in text_corpus
+        else alphabet_table(text_corpus["alphabet"])
+    )
+    if alphabet:
+        sections["Alphabet"] = (
+            "The alphabet used in the dataset's text corpus.\n\n" + alphabet
+        )
+    return {title: body for title, body in sections.items() if body}
+
+
+def render_draft(
+    template: Template, locale: str, entry: Mapping[str, str]
+) -> str:
+    """
+    Returns the draft of `locale`: `template` with the locale code and the
+    names of its metadata.json `entry` filled in, as generate-datasheet.py
+    writes it.
+    """
+    english_name = entry["english_name"]
+    native_name = entry["native_name"] or f"<{english_name}>"
+    values = {
+        "LOCALE": locale,
+        "ENGLISH_NAME": english_name,
+        "NATIVE_NAME": native_name,
+    }
+    return template.render(values) + "\n"
+
+
+def render_datasheet(
+    template: Template,
+    stats: Mapping[str, Any],
+    names: Optional[Mapping[str, str]] = None,
+) -> str:
+    return template.render(render_sections(stats, names))
+
+
+# --- MAIN EXECUTION ---
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(
+        description="Fill the statistical sections of datasheet templates "
+        "from the <locale>.json stats written by generate_datasheet.py."
+    )
+    parser.add_argument(
+        "--template",
+        type=Path,
+        required=True,
+        help="Datasheet template (e.g., templates/scs/en.md).",
+    )
+    parser.add_argument(
+        "--stats",
+        type=Path,
+        nargs="+",
+        required=True,
+        help="<locale>.json stats files, or directories of them.",
+    )
+    parser.add_argument(
+        "--metadata",
+        type=Path,
+        nargs="+",
+        default=METADATA_FILES,
+        help="metadata.json files with the English and native name of each "
+        "locale (default: those of metadata/scs and metadata/sps).",
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        required=True,
+        help="Directory for the rendered <locale>.md datasheets.",
+    )
+    args = parser.parse_args()
+
+    template = Template.from_file(args.template)
+    metadata = LocaleNames(args.metadata)
+
+    stats_files = []
+    for path in args.stats:
+        stats_files.extend(
+            sorted(path.glob("*.json")) if path.is_dir() else [path]
+        )
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    for stats_path in stats_files:
+        stats = json.loads(stats_path.read_text(encoding="utf-8"))
+        lang_code = stats["language"]["code"]
+        output_path = args.output_dir / f"{lang_code}.md"
+        output_path.write_text(
+            render_datasheet(template, stats, metadata.get(lang_code)),
+            encoding="utf-8",
+        )
+    logger.info(f"Rendered {len(stats_files)} datasheets to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
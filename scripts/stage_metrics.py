@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Per-stage timing and memory instrumentation of a datasheet run.
+
+A `StageReport` collects one record per stage of processing a locale (the
+duration index, each TSV, the result, the prompt and the model's answer):
+elapsed time, rows and bytes read with the resulting throughput, how much
+the stage raised the peak resident memory of the process and, when memory
+tracing is on, the peak of the Python allocations made during the stage.
+Callers add their own figures (prompt and response sizes, ...) to the
+record yielded by `stage()`.
+
+Reports are written as `<locale>.metrics.json`, so the locales and stages
+that dominate a release run can be found with any JSON tool. `profiled()`
+additionally dumps a cProfile of the locale (`<locale>.prof`, for pstats or
+snakeviz) and its largest allocation sites (`<locale>.tracemalloc.txt`).
+"""
+import cProfile
+import json
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+MB = 1024 * 1024
+TRACEMALLOC_TOP = 30
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident memory of this process so far, in MB.
+    """
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (MB if sys.platform == "darwin" else 1024)
+
+
+class StageReport:
+    """
+    The timing and memory records of the stages of one locale.
+    """
+
+    def __init__(self, locale: str):
+        self.locale = locale
+        self.stages: List[Dict[str, Any]] = []
+        self._created = time.perf_counter()
+
+    @contextmanager
+    def stage(
+        self, name: str, path: Optional[Path] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Times the body of the `with` block as stage `name`, reading `path`
+        if given. Setting `rows` in the yielded record adds the throughput.
+        """
+        record = {"stage": name}
+        if path is not None:
+            record["bytes"] = path.stat().st_size if path.exists() else 0
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            traced_before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            record["seconds"] = round(seconds, 4)
+            if record.get("rows") and seconds > 0:
+                record["rows_per_second"] = round(record["rows"] / seconds)
+            if record.get("bytes") and seconds > 0:
+                record["mb_per_second"] = round(
+                    record["bytes"] / MB / seconds, 2
+                )
+            record["peak_rss_delta_mb"] = round(peak_rss_mb() - rss_before, 1)
+            if tracing:
+                traced_peak = tracemalloc.get_traced_memory()[1]
+                record["traced_peak_mb"] = round(
+                    (traced_peak - traced_before) / MB, 1
+                )
+            self.stages.append(record)
+
+    def merge(self, other: "StageReport") -> None:
+        """
+        Appends the stages recorded by `other`, e.g. in a worker process.
+        """
+        self.stages.extend(other.stages)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "locale": self.locale,
+            "total_seconds": round(
+                sum(stage["seconds"] for stage in self.stages), 4
+            ),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "stages": self.stages,
+        }
+
+    def write(self, output_dir: Path) -> Path:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / f"{self.locale}.metrics.json"
+        path.write_text(
+            json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8",
+        )
+        return path
+
+
+@contextmanager
+def profiled(locale: str, output_dir: Optional[Path]) -> Iterator[None]:
+    """
+    Runs the body of the `with` block under cProfile and tracemalloc and
+    writes `<locale>.prof` and `<locale>.tracemalloc.txt` to `output_dir`;
+    does nothing when `output_dir` is None.
+    """
+    if output_dir is None:
+        yield
+        return
+    output_dir.mkdir(parents=True, exist_ok=True)
+    profile = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(output_dir / f"{locale}.prof")
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        top = snapshot.statistics("lineno")[:TRACEMALLOC_TOP]
+        (output_dir / f"{locale}.tracemalloc.txt").write_text(
+            "\n".join(str(stat) for stat in top) + "\n", encoding="utf-8"
+        )
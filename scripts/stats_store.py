@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+A local SQLite database of the stats of every locale of every release, so
+that trends across releases (hours growth, contributors per release...) can
+be queried in milliseconds instead of recomputed from the TSVs of old
+corpora.
+
+generate_datasheet.py adds each locale's stats with `--stats_db`. Rows are
+keyed by release and locale and written in one transaction per locale, so
+rerunning a release replaces its rows. Besides the full stats as JSON, the
+figures most often compared are stored in their own tables:
+
+    clip_stats        one row per release and locale: clip counts, hours,
+                      sentence counts and unique contributors
+    demographics      clips per gender, age and accent value
+    contributor_bins  contributors per clips-contributed bin
+    splits            clips, hours and speakers per train/dev/test/other
+
+USAGE:
+    python stats_store.py --db stats.db --locale kk --metric validated_hours
+"""
+import argparse
+import json
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# cv-corpus-<version>-<date>, e.g. cv-corpus-23.0-2025-09-17.
+RELEASE_RE = re.compile(r"cv-corpus-[\w.]+?-(\d{4}-\d{2}-\d{2})")
+CLIP_METRICS = (
+    "validated_count",
+    "invalidated_count",
+    "total_count",
+    "validated_hours",
+    "invalidated_hours",
+    "total_hours",
+    "validated_sentences",
+    "invalidated_sentences",
+    "contributors",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS locale_stats (
+    release TEXT NOT NULL,
+    release_date TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    name TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (release, locale)
+);
+CREATE TABLE IF NOT EXISTS clip_stats (
+    release TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    validated_count INTEGER NOT NULL,
+    invalidated_count INTEGER NOT NULL,
+    total_count INTEGER NOT NULL,
+    validated_hours REAL NOT NULL,
+    invalidated_hours REAL NOT NULL,
+    total_hours REAL NOT NULL,
+    validated_sentences INTEGER NOT NULL,
+    invalidated_sentences INTEGER NOT NULL,
+    contributors INTEGER NOT NULL,
+    PRIMARY KEY (release, locale)
+);
+CREATE TABLE IF NOT EXISTS demographics (
+    release TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT NOT NULL,
+    clips INTEGER NOT NULL,
+    PRIMARY KEY (release, locale, field, value)
+);
+CREATE TABLE IF NOT EXISTS contributor_bins (
+    release TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    bin TEXT NOT NULL,
+    contributors INTEGER NOT NULL,
+    PRIMARY KEY (release, locale, bin)
+);
+CREATE TABLE IF NOT EXISTS splits (
+    release TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    split TEXT NOT NULL,
+    clips INTEGER NOT NULL,
+    hours REAL NOT NULL,
+    speakers INTEGER NOT NULL,
+    PRIMARY KEY (release, locale, split)
+);
+CREATE INDEX IF NOT EXISTS locale_stats_by_locale
+    ON locale_stats (locale, release_date);
+"""
+TABLES = (
+    "locale_stats",
+    "clip_stats",
+    "demographics",
+    "contributor_bins",
+    "splits",
+)
+
+
+def release_from_path(path: Path) -> Optional[str]:
+    """
+    Returns the release name (e.g. cv-corpus-23.0-2025-09-17) found in a
+    locale directory, corpus or archive path, or None.
+    """
+    match = RELEASE_RE.search(str(path.resolve()))
+    return match.group(0) if match else None
+
+
+def release_date(release: str) -> str:
+    """
+    Returns the date of a release name, by which releases are ordered; names
+    without a date sort first.
+    """
+    match = RELEASE_RE.fullmatch(release)
+    return match.group(1) if match else ""
+
+
+class StatsStore:
+    """
+    The stats database at `path`, created on first use.
+    """
+
+    def __init__(self, path: Path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "StatsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def put(self, release: str, stats: Mapping[str, Any]) -> None:
+        """
+        Stores the stats of one locale (as written to `<locale>.json`) for
+        `release`, replacing any earlier rows of the same release and locale.
+        """
+        locale = stats["language"]["code"]
+        clip_stats = stats["clip_stats"]
+        sentence_stats = stats["sentence_stats"]
+        key = (release, locale)
+        with self.connection:
+            for table in TABLES:
+                self.connection.execute(
+                    f"DELETE FROM {table} WHERE release = ? AND locale = ?",
+                    key,
+                )
+            self.connection.execute(
+                "INSERT INTO locale_stats VALUES (?, ?, ?, ?, ?)",
+                (
+                    release,
+                    release_date(release),
+                    locale,
+                    stats["language"]["name"],
+                    json.dumps(stats, ensure_ascii=False),
+                ),
+            )
+            self.connection.execute(
+                "INSERT INTO clip_stats VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    *key,
+                    clip_stats["validated_count"],
+                    clip_stats["invalidated_count"],
+                    clip_stats["total_count"],
+                    clip_stats["validated_hours"],
+                    clip_stats["invalidated_hours"],
+                    clip_stats["total_hours"],
+                    sentence_stats["validated_count"],
+                    sentence_stats["invalidated_count"],
+                    sum(stats["contributor_stats"].values()),
+                ),
+            )
+            self.connection.executemany(
+                "INSERT INTO demographics VALUES (?, ?, ?, ?, ?)",
+                [
+                    (*key, field, value, clips)
+                    for field in ("gender", "age", "accent")
+                    for value, clips in stats["demographics"][field].items()
+                ],
+            )
+            self.connection.executemany(
+                "INSERT INTO contributor_bins VALUES (?, ?, ?, ?)",
+                [(*key, b, n) for b, n in stats["contributor_stats"].items()],
+            )
+            self.connection.executemany(
+                "INSERT INTO splits VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (*key, split, s["clip_count"], s["hours"], s["speakers"])
+                    for split, s in stats.get("splits", {}).items()
+                    if "speakers" in s
+                ],
+            )
+
+    def get(self, release: str, locale: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored stats of a locale in a release, or None.
+        """
+        row = self.connection.execute(
+            "SELECT stats FROM locale_stats WHERE release = ? AND locale = ?",
+            (release, locale),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def releases(self) -> List[str]:
+        """
+        Returns the stored releases, oldest first.
+        """
+        return [
+            release
+            for release, in self.connection.execute(
+                "SELECT DISTINCT release FROM locale_stats "
+                "ORDER BY release_date, release"
+            )
+        ]
+
+    def trend(
+        self, locale: str, metric: str = "validated_hours"
+    ) -> List[Tuple[str, float, Optional[float]]]:
+        """
+        Returns (release, value, change since the previous release) of a
+        `clip_stats` metric of `locale`, oldest release first. The change in
+        `contributors` is the net number of new contributors.
+        """
+        if metric not in CLIP_METRICS:
+            raise ValueError(f"Unknown metric: {metric}")
+        rows = self.connection.execute(
+            f"SELECT c.release, c.{metric} FROM clip_stats AS c "
+            "JOIN locale_stats AS l USING (release, locale) "
+            "WHERE c.locale = ? ORDER BY l.release_date, c.release",
+            (locale,),
+        ).fetchall()
+        trend = []
+        previous = None
+        for release, value in rows:
+            change = None if previous is None else round(value - previous, 2)
+            trend.append((release, value, change))
+            previous = value
+        return trend
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show how a stat of a locale evolved across the releases "
+        "stored in a stats database."
+    )
+    parser.add_argument(
+        "--db", type=Path, required=True, help="Stats database."
+    )
+    parser.add_argument("--locale", required=True, help="Locale code.")
+    parser.add_argument(
+        "--metric",
+        choices=CLIP_METRICS,
+        default="validated_hours",
+        help="Clip statistic to show (default: validated_hours).",
+    )
+    args = parser.parse_args()
+    if not args.db.exists():
+        parser.error(f"{args.db} does not exist")
+
+    with StatsStore(args.db) as store:
+        for release, value, change in store.trend(args.locale, args.metric):
+            change = "" if change is None else f"{change:+,}"
+            print(f"{release}\t{value:,}\t{change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Writes synthetic Common Voice locale directories for tests and benchmarks
+of generate_datasheet.py.
+
+The TSVs have the column schemas of a real release: validated.tsv,
+invalidated.tsv, clip_durations.tsv, validated_sentences.tsv and
+unvalidated_sentences.tsv, and optionally the train/dev/test/other splits
+and reported.tsv. Like real data, the distributions are skewed: clips per
+contributor and recordings per sentence follow Zipf-like laws, demographics
+are fixed per contributor and often left blank, and clip durations are
+log-normal around five seconds.
+
+Rows are generated and written one at a time from a seeded generator, so a
+given size and seed always produce the same files, and writing 20M clips
+takes time but no more memory than the per-contributor and per-sentence
+tables.
+
+USAGE:
+    python synthetic_corpus.py --output_dir /tmp/corpus/xx --clips 100000
+"""
+import argparse
+import bisect
+import itertools
+import logging
+import math
+import random
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence, TextIO
+
+CLIP_COLUMNS = [
+    "client_id",
+    "path",
+    "sentence_id",
+    "sentence",
+    "sentence_domain",
+    "up_votes",
+    "down_votes",
+    "age",
+    "gender",
+    "accents",
+    "variant",
+    "locale",
+    "segment",
+]
+VALIDATED_SENTENCE_COLUMNS = [
+    "sentence_id",
+    "sentence",
+    "sentence_domain",
+    "source",
+    "is_used",
+    "clips_count",
+]
+UNVALIDATED_SENTENCE_COLUMNS = [
+    "sentence_id",
+    "sentence",
+    "sentence_domain",
+    "source",
+]
+REPORTED_COLUMNS = ["sentence_id", "sentence", "locale", "reason"]
+
+AGES = ["teens", "twenties", "thirties", "fourties", "fifties", "sixties"]
+AGE_WEIGHTS = [10, 35, 25, 15, 10, 5]
+GENDERS = ["male_masculine", "female_feminine", "do_not_wish_to_say"]
+GENDER_WEIGHTS = [55, 35, 10]
+SOURCES = ["Wikipedia", "Public domain books", "Sentence Collector"]
+REPORT_REASONS = [
+    "offensive-language",
+    "grammar-or-spelling",
+    "different-language",
+    "difficult-pronounce",
+]
+# Letters of the synthetic words; the tail of non-ASCII letters makes the
+# alphabet histogram non-trivial.
+LETTERS = "aeioubdgklmnprstyzəöüğşçñ"
+VOCABULARY_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+class Zipf:
+    """
+    Draws ranks in [0, n) with probability proportional to 1 / (rank + 1)^s.
+    """
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.rng = rng
+        self.cum_weights = list(
+            itertools.accumulate(1 / (rank + 1) ** s for rank in range(n))
+        )
+        self.total = self.cum_weights[-1]
+
+    def draw(self) -> int:
+        return bisect.bisect(self.cum_weights, self.rng.random() * self.total)
+
+
+class SentenceText:
+    """
+    The text of sentence i, derived from i alone so that the sentences need
+    not be kept in memory.
+    """
+
+    def __init__(self, rng: random.Random):
+        self.words = [
+            "".join(
+                rng.choice(LETTERS)
+                for _ in range(int(rng.lognormvariate(1.6, 0.4)) + 1)
+            )
+            for _ in range(VOCABULARY_SIZE)
+        ]
+
+    def __call__(self, i: int) -> str:
+        h = (i * 2654435761 + 12345) & 0xFFFFFFFF
+        length = 4 + h % 12
+        words = []
+        for _ in range(length):
+            h = (h * 1103515245 + 12345) & 0xFFFFFFFF
+            words.append(self.words[h % VOCABULARY_SIZE])
+        return " ".join(words).capitalize() + "."
+
+
+def make_contributors(n: int, rng: random.Random, locale: str) -> List[tuple]:
+    """
+    Returns (client_id, age, gender, accent) for `n` contributors; about
+    half leave each demographic field blank, as on the real platform.
+    """
+    accents = [f"{locale} accent {i}" for i in range(12)]
+    accent_zipf = Zipf(len(accents), 1.2, rng)
+    contributors = []
+    for _ in range(n):
+        contributors.append(
+            (
+                "%0128x" % rng.getrandbits(512),
+                (
+                    rng.choices(AGES, AGE_WEIGHTS)[0]
+                    if rng.random() < 0.6
+                    else ""
+                ),
+                (
+                    rng.choices(GENDERS, GENDER_WEIGHTS)[0]
+                    if rng.random() < 0.6
+                    else ""
+                ),
+                accents[accent_zipf.draw()] if rng.random() < 0.4 else "",
+            )
+        )
+    return contributors
+
+
+def write_row(f: TextIO, values: Sequence) -> None:
+    f.write("\t".join(map(str, values)) + "\n")
+
+
+def open_tsv(path: Path, columns: Sequence[str]) -> TextIO:
+    f = open(path, "w", encoding="utf-8", newline="")
+    write_row(f, columns)
+    return f
+
+
+def generate_locale(
+    output_dir: Path,
+    clips: int,
+    locale: str = "xx",
+    contributors: Optional[int] = None,
+    sentences: Optional[int] = None,
+    invalidated_ratio: float = 0.15,
+    splits: bool = False,
+    seed: int = 0,
+) -> None:
+    """
+    Writes a locale directory with `clips` validated clips, about
+    `invalidated_ratio` as many invalidated ones (and as many pending ones in
+    other.tsv with `splits`), `contributors` speakers and `sentences`
+    validated sentences, defaulting to one speaker per 100 clips and one
+    sentence per 3 clips.
+    """
+    rng = random.Random(seed)
+    contributors = contributors or max(1, clips // 100)
+    sentences = sentences or max(1, clips // 3)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    people = make_contributors(contributors, rng, locale)
+    speaker_zipf = Zipf(contributors, 1.1, rng)
+    sentence_zipf = Zipf(sentences, 0.8, rng)
+    text = SentenceText(rng)
+    clips_count = array("L", bytes(array("L").itemsize * sentences))
+    clip_number = itertools.count()
+
+    logger.info(f"Writing {clips:,} validated clips to {output_dir}...")
+    split_files = {}
+    if splits:
+        for name in ("train", "dev", "test", "other"):
+            split_files[name] = open_tsv(
+                output_dir / f"{name}.tsv", CLIP_COLUMNS
+            )
+    durations = open_tsv(
+        output_dir / "clip_durations.tsv", ["clip", "duration[ms]"]
+    )
+
+    def write_clips(f: TextIO, n: int, votes, validated: bool = False):
+        for _ in range(n):
+            speaker = speaker_zipf.draw()
+            client_id, age, gender, accent = people[speaker]
+            sentence = sentence_zipf.draw()
+            path = f"common_voice_{locale}_{next(clip_number):08d}.mp3"
+            row = (
+                client_id,
+                path,
+                f"{sentence:x}",
+                text(sentence),
+                "",
+                *votes(),
+                age,
+                gender,
+                accent,
+                "",
+                locale,
+                "",
+            )
+            write_row(f, row)
+            if validated:
+                clips_count[sentence] += 1
+                if split_files:
+                    write_row(split_files[_split_name(speaker)], row)
+            duration = int(rng.lognormvariate(math.log(5000), 0.35))
+            write_row(durations, (path, duration))
+
+    with durations:
+        with open_tsv(output_dir / "validated.tsv", CLIP_COLUMNS) as f:
+            write_clips(
+                f,
+                clips,
+                lambda: (2 + (rng.random() < 0.2), int(rng.random() < 0.2)),
+                validated=True,
+            )
+        n_invalidated = int(clips * invalidated_ratio)
+        with open_tsv(output_dir / "invalidated.tsv", CLIP_COLUMNS) as f:
+            write_clips(f, n_invalidated, lambda: (int(rng.random() < 0.3), 2))
+        if splits:
+            write_clips(
+                split_files["other"],
+                n_invalidated,
+                lambda: (int(rng.random() < 0.5), 0),
+            )
+    for f in split_files.values():
+        f.close()
+
+    logger.info(f"Writing {sentences:,} validated sentences...")
+    with open_tsv(
+        output_dir / "validated_sentences.tsv", VALIDATED_SENTENCE_COLUMNS
+    ) as f:
+        for i in range(sentences):
+            write_row(
+                f,
+                (
+                    f"{i:x}",
+                    text(i),
+                    "",
+                    SOURCES[i % len(SOURCES)],
+                    int(rng.random() < 0.95),
+                    clips_count[i],
+                ),
+            )
+    with open_tsv(
+        output_dir / "unvalidated_sentences.tsv", UNVALIDATED_SENTENCE_COLUMNS
+    ) as f:
+        for i in range(sentences, sentences + sentences // 10):
+            write_row(f, (f"{i:x}", text(i), "", SOURCES[i % len(SOURCES)]))
+    if splits:
+        with open_tsv(output_dir / "reported.tsv", REPORTED_COLUMNS) as f:
+            for _ in range(max(1, sentences // 1000)):
+                i = sentence_zipf.draw()
+                write_row(
+                    f, (f"{i:x}", text(i), locale, rng.choice(REPORT_REASONS))
+                )
+
+
+def _split_name(speaker: int) -> str:
+    # Each speaker belongs to one split, most of them to train.
+    return {1: "dev", 2: "test"}.get(speaker % 20, "train")
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic Common Voice locale directory."
+    )
+    parser.add_argument(
+        "--output_dir",
+        type=Path,
+        required=True,
+        help="Locale directory to write (e.g., /tmp/corpus/xx).",
+    )
+    parser.add_argument(
+        "--clips", type=int, required=True, help="Number of validated clips."
+    )
+    parser.add_argument("--locale", default="xx", help="Locale code.")
+    parser.add_argument(
+        "--contributors",
+        type=int,
+        help="Number of contributors (default: one per 100 clips).",
+    )
+    parser.add_argument(
+        "--sentences",
+        type=int,
+        help="Number of validated sentences (default: one per 3 clips).",
+    )
+    parser.add_argument(
+        "--invalidated_ratio",
+        type=float,
+        default=0.15,
+        help="Invalidated clips per validated clip.",
+    )
+    parser.add_argument(
+        "--splits",
+        action="store_true",
+        help="Also write train/dev/test/other.tsv and reported.tsv.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_locale(
+        args.output_dir,
+        args.clips,
+        locale=args.locale,
+        contributors=args.contributors,
+        sentences=args.sentences,
+        invalidated_ratio=args.invalidated_ratio,
+        splits=args.splits,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+An on-disk columnar cache for the Common Voice TSV files.
+
+Parsing multi-GB TSVs with the `csv` module dominates the run time of
+generate_datasheet.py, yet the files rarely change between runs. The first
+time a TSV is needed, the columns the statistics use are parsed once and
+written to `<cache_dir>/<tsv name>/` as flat binary arrays:
+
+    * `dict` columns (gender, age, accents, client_id, sentence, ...) are
+      dictionary-encoded: a uint32 code per row plus a JSON vocabulary, with
+      codes assigned in order of first appearance;
+    * `hash` columns (clip paths) store the 64-bit clip hash used by
+      `ClipDurationIndex`, so hours can be summed without the names;
+    * `int` columns (clips_count) store a signed 64-bit integer per row.
+
+Later runs memory-map these arrays instead of parsing any text. A cached
+table is rebuilt when the source TSV's size, modification time or the hash
+of its first and last MiB differ from the values recorded in `meta.json`,
+when a requested column is missing from the cache, or when a rebuild is
+forced.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import shutil
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+from column_ops import code_counts
+from duration_index import clip_hash
+from tsv_shards import iter_shard_rows, plan_shards
+
+CACHE_FORMAT_VERSION = 1
+SIGNATURE_BLOCK_SIZE = 1 << 20
+WRITE_CHUNK_ROWS = 65536
+
+# Column encoding -> array typecode of the on-disk values.
+TYPECODES = {"dict": "I", "hash": "Q", "int": "q"}
+
+logger = logging.getLogger(__name__)
+
+
+class DictColumn:
+    """
+    A dictionary-encoded column: `codes[i]` indexes into `vocab`.
+    """
+
+    def __init__(self, codes, vocab: List[str]):
+        self.codes = codes
+        self.vocab = vocab
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator[str]:
+        vocab = self.vocab
+        return (vocab[code] for code in self.codes)
+
+    def code_counts(self) -> Counter:
+        """
+        Returns a Counter of code -> number of rows.
+        """
+        return Counter(
+            {
+                code: n
+                for code, n in enumerate(
+                    code_counts(self.codes, len(self.vocab))
+                )
+                if n
+            }
+        )
+
+    def counts(self) -> Counter:
+        """
+        Returns a Counter of value -> number of rows, keyed in order of first
+        appearance in the TSV (like a Counter filled row by row).
+        """
+        code_counts = self.code_counts()
+        return Counter(
+            {
+                value: code_counts[code]
+                for code, value in enumerate(self.vocab)
+                if code in code_counts
+            }
+        )
+
+
+class ColumnarTable:
+    """
+    The cached columns of one TSV file. Missing columns are absent, exactly
+    as they would be absent from the rows of a `csv.DictReader`.
+    """
+
+    def __init__(self, num_rows: int, columns: Dict[str, object], mapped=()):
+        self.num_rows = num_rows
+        self.columns = columns
+        self._mapped = list(mapped)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def close(self) -> None:
+        self.columns = {}
+        _unmap(self._mapped)
+        self._mapped = []
+
+
+def source_signature(tsv_path: Path) -> Dict[str, object]:
+    """
+    Identifies the contents of a TSV file cheaply: size, mtime and a hash of
+    its first and last blocks.
+    """
+    st = tsv_path.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    with open(tsv_path, "rb") as f:
+        digest.update(f.read(SIGNATURE_BLOCK_SIZE))
+        if st.st_size > SIGNATURE_BLOCK_SIZE:
+            tail = max(SIGNATURE_BLOCK_SIZE, st.st_size - SIGNATURE_BLOCK_SIZE)
+            f.seek(tail)
+            digest.update(f.read(SIGNATURE_BLOCK_SIZE))
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "head_tail_hash": digest.hexdigest(),
+    }
+
+
+def load_table(
+    tsv_path: Path,
+    cache_dir: Path,
+    columns: Mapping[str, str],
+    rebuild: bool = False,
+    workers: int = 1,
+) -> Optional[ColumnarTable]:
+    """
+    Returns the requested `columns` (name -> encoding) of `tsv_path`, from
+    the cache when it is fresh and by parsing the TSV otherwise. Large files
+    are parsed in newline-aligned shards on up to `workers` processes.
+    Returns None if the TSV does not exist.
+    """
+    if not tsv_path.exists():
+        logger.warning(
+            f"Optional file not found: {tsv_path}. Proceeding without it."
+        )
+        return None
+
+    table_dir = cache_dir / tsv_path.name
+    signature = source_signature(tsv_path)
+    if not rebuild:
+        table = _open_cached(table_dir, signature, columns)
+        if table is not None:
+            logger.info(f"Loaded columnar cache for {tsv_path.name}")
+            return table
+
+    logger.info(f"Building columnar cache for {tsv_path.name}...")
+    _build(tsv_path, table_dir, signature, columns, workers)
+    table = _open_cached(table_dir, signature, columns)
+    if table is None:
+        raise RuntimeError(f"Columnar cache in {table_dir} is unreadable")
+    return table
+
+
+def _open_cached(
+    table_dir: Path, signature: Dict[str, object], columns: Mapping[str, str]
+) -> Optional[ColumnarTable]:
+    try:
+        meta = json.loads((table_dir / "meta.json").read_text("utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+    if (
+        meta.get("version") != CACHE_FORMAT_VERSION
+        or meta.get("source") != signature
+    ):
+        return None
+    cached = meta["columns"]
+    for name, encoding in columns.items():
+        if name in meta["missing"]:
+            continue
+        if cached.get(name) != encoding:
+            return None
+
+    num_rows = meta["num_rows"]
+    loaded = {}
+    mapped = []
+    for name, encoding in columns.items():
+        if name in meta["missing"]:
+            continue
+        values = _map_array(table_dir / f"{name}.bin", TYPECODES[encoding])
+        if isinstance(values, tuple):
+            mapped.append(values)
+            values = values[1]
+        if values is None or len(values) != num_rows:
+            _unmap(mapped)
+            return None
+        if encoding == "dict":
+            vocab = json.loads(
+                (table_dir / f"{name}.vocab.json").read_text("utf-8")
+            )
+            values = DictColumn(values, vocab)
+        loaded[name] = values
+    return ColumnarTable(num_rows, loaded, mapped)
+
+
+def _map_array(path: Path, typecode: str):
+    """
+    Memory-maps a flat array file. Returns `(mmap, memoryview)`, an empty
+    array for an empty file, or None if the file is missing.
+    """
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return array(typecode)
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+    return mm, memoryview(mm).cast(typecode)
+
+
+def _unmap(mapped) -> None:
+    for mm, view in mapped:
+        view.release()
+        mm.close()
+
+
+def _build(
+    tsv_path: Path,
+    table_dir: Path,
+    signature: Dict[str, object],
+    columns: Mapping[str, str],
+    workers: int = 1,
+) -> None:
+    table_dir.mkdir(parents=True, exist_ok=True)
+    meta_path = table_dir / "meta.json"
+    if meta_path.exists():
+        meta_path.unlink()
+
+    header, ranges = plan_shards(tsv_path, workers)
+    positions = {
+        name: header.index(name) for name in columns if name in header
+    }
+    encodings = {name: columns[name] for name in positions}
+    missing = sorted(set(columns) - set(positions))
+
+    if len(ranges) <= 1:
+        parts = [
+            _build_part(tsv_path, *r, positions, encodings, table_dir, "")
+            for r in ranges
+        ]
+        vocabs = {
+            name: parts[0][1][name] if parts else []
+            for name, encoding in encodings.items()
+            if encoding == "dict"
+        }
+        if not parts:
+            for name in encodings:
+                (table_dir / f"{name}.bin").write_bytes(b"")
+    else:
+        # Each shard is encoded with its own vocabularies; the parts are then
+        # concatenated in file order with their codes remapped onto a global
+        # vocabulary, which preserves the order of first appearance.
+        suffixes = [f".part{i}" for i in range(len(ranges))]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            parts = list(
+                pool.map(
+                    _build_part,
+                    repeat(tsv_path),
+                    *zip(*ranges),
+                    repeat(positions),
+                    repeat(encodings),
+                    repeat(table_dir),
+                    suffixes,
+                )
+            )
+        vocabs = _merge_parts(table_dir, encodings, parts, suffixes)
+
+    for name, vocab in vocabs.items():
+        (table_dir / f"{name}.vocab.json").write_text(
+            json.dumps(vocab, ensure_ascii=False), encoding="utf-8"
+        )
+    meta = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": signature,
+        "num_rows": sum(num_rows for num_rows, _ in parts),
+        "columns": encodings,
+        "missing": missing,
+    }
+    meta_path.write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+
+def _build_part(
+    tsv_path: Path,
+    start: int,
+    end: int,
+    positions: Mapping[str, int],
+    encodings: Mapping[str, str],
+    table_dir: Path,
+    suffix: str,
+) -> Tuple[int, Dict[str, List[str]]]:
+    """
+    Encodes the rows in bytes [start, end) of `tsv_path` into
+    `<column>.bin<suffix>` files. Returns the number of rows and the
+    vocabularies of the dict columns.
+    """
+    writers = {
+        name: _ColumnWriter(table_dir / f"{name}.bin{suffix}", encoding)
+        for name, encoding in encodings.items()
+    }
+    num_rows = 0
+    try:
+        items = [(writers[name], pos) for name, pos in positions.items()]
+        for row in iter_shard_rows(tsv_path, start, end):
+            if not row:
+                continue
+            num_rows += 1
+            width = len(row)
+            for writer, pos in items:
+                writer.append(row[pos] if pos < width else "")
+    finally:
+        for writer in writers.values():
+            writer.close()
+    vocabs = {
+        name: writer.vocab_list()
+        for name, writer in writers.items()
+        if writer.encoding == "dict"
+    }
+    return num_rows, vocabs
+
+
+def _merge_parts(
+    table_dir: Path,
+    encodings: Mapping[str, str],
+    parts: List[Tuple[int, Dict[str, List[str]]]],
+    suffixes: List[str],
+) -> Dict[str, List[str]]:
+    """
+    Concatenates the per-shard column files written by `_build_part`.
+    Returns the merged vocabularies of the dict columns.
+    """
+    vocabs = {}
+    for name, encoding in encodings.items():
+        vocab = {}
+        with open(table_dir / f"{name}.bin", "wb") as out:
+            for (_, part_vocabs), suffix in zip(parts, suffixes):
+                part_path = table_dir / f"{name}.bin{suffix}"
+                if encoding == "dict":
+                    remap = array(
+                        "I",
+                        (
+                            vocab.setdefault(value, len(vocab))
+                            for value in part_vocabs[name]
+                        ),
+                    )
+                    codes = array("I", part_path.read_bytes())
+                    array("I", map(remap.__getitem__, codes)).tofile(out)
+                else:
+                    with open(part_path, "rb") as part:
+                        shutil.copyfileobj(part, out)
+                part_path.unlink()
+        if encoding == "dict":
+            vocabs[name] = list(vocab)
+    return vocabs
+
+
+class _ColumnWriter:
+    """
+    Encodes one column and appends it to its file in fixed-size chunks, so
+    that building the cache needs memory only for the vocabularies.
+    """
+
+    def __init__(self, path: Path, encoding: str):
+        self.encoding = encoding
+        self.vocab = {}
+        self._typecode = TYPECODES[encoding]
+        self._chunk = array(self._typecode)
+        self._file = open(path, "wb")
+
+    def append(self, value: str) -> None:
+        if self.encoding == "dict":
+            code = self.vocab.get(value)
+            if code is None:
+                code = self.vocab[value] = len(self.vocab)
+            self._chunk.append(code)
+        elif self.encoding == "hash":
+            self._chunk.append(clip_hash(value))
+        else:
+            self._chunk.append(int(value or 0))
+        if len(self._chunk) >= WRITE_CHUNK_ROWS:
+            self._chunk.tofile(self._file)
+            self._chunk = array(self._typecode)
+
+    def vocab_list(self) -> List[str]:
+        return list(self.vocab)
+
+    def close(self) -> None:
+        self._chunk.tofile(self._file)
+        self._file.close()
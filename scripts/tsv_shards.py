@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Splits a large TSV file into newline-aligned byte ranges ("shards") that can
+be parsed independently by several processes.
+
+Each shard starts at the beginning of a line and ends right after a newline,
+so a worker can seek straight to its range and parse it with the `csv`
+module. This assumes, as holds for Common Voice TSVs, that no quoted field
+spans several lines.
+"""
+import csv
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+# Files smaller than this are parsed in-process: starting workers would cost
+# more than it saves.
+SHARD_MIN_BYTES = 32 << 20
+
+
+def plan_shards(
+    tsv_path: Path, workers: int
+) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Returns the header of `tsv_path` and up to `workers` (start, end) byte
+    ranges covering its data lines. Small files get a single range.
+    """
+    size = tsv_path.stat().st_size
+    with open(tsv_path, "rb") as f:
+        header_line = f.readline()
+        data_start = f.tell()
+        bounds = [data_start]
+        if size >= SHARD_MIN_BYTES:
+            for i in range(1, workers):
+                target = data_start + (size - data_start) * i // workers
+                if target <= bounds[-1]:
+                    continue
+                # Move to the start of the line following `target`.
+                f.seek(target - 1)
+                f.readline()
+                pos = f.tell()
+                if bounds[-1] < pos < size:
+                    bounds.append(pos)
+        bounds.append(size)
+    header = next(
+        csv.reader(
+            [header_line.decode("utf-8").rstrip("\r\n")], delimiter="\t"
+        ),
+        [],
+    )
+    ranges = [
+        (start, end) for start, end in zip(bounds, bounds[1:]) if end > start
+    ]
+    return header, ranges
+
+
+def iter_shard_rows(
+    tsv_path: Path, start: int, end: int
+) -> Iterator[List[str]]:
+    """
+    Parses the lines in bytes [start, end) of `tsv_path` into field lists.
+    """
+    with open(tsv_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        lines = []
+        for line in f:
+            remaining -= len(line)
+            lines.append(line.decode("utf-8"))
+            if len(lines) >= 4096 or remaining <= 0:
+                yield from csv.reader(lines, delimiter="\t")
+                lines = []
+            if remaining <= 0:
+                break
+        yield from csv.reader(lines, delimiter="\t")
+
+
+def iter_shard_dicts(
+    tsv_path: Path, header: List[str], start: int, end: int
+) -> Iterator[Dict[str, str]]:
+    """
+    Like `iter_shard_rows`, but yields dicts keyed by `header` the way
+    `csv.DictReader` does (blank lines skipped, short rows padded with None).
+    """
+    width = len(header)
+    for row in iter_shard_rows(tsv_path, start, end):
+        if not row:
+            continue
+        if len(row) < width:
+            row = row + [None] * (width - len(row))
+        yield dict(zip(header, row))
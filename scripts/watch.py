@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Watches the inputs of the generated files of this repo and rebuilds only
+what a change affects.
+
+The dependency graph covers three kinds of artifacts:
+
+    drafts       <output_dir>/<locale>.md, from one metadata.json entry and
+                 one template, as written by generate-datasheet.py
+    datasheets   <output_dir>/<locale>.json and .md, from the TSVs of one
+                 locale directory and, with --update_dir, the existing
+                 (final) datasheet of the locale, as by generate_datasheet.py
+    READMEs      the status section of a release's README.md, from the files
+                 in its draft/en and final/en directories (update-readme.py)
+
+A change to a metadata file only rebuilds the drafts of the entries that
+changed, a template edit only the drafts rendered from that template, and a
+TSV or final datasheet only its own locale. Drafts that are rewritten in
+turn refresh the README of their release.
+
+Changes are detected with inotify (through ctypes, Linux only) or, where it
+is unavailable or with --poll, by comparing the size and mtime of the
+watched files every --interval seconds. Events are debounced: a rebuild
+starts once no file has changed for --debounce seconds, and handles every
+change seen until then in one batch. Directories are watched one level
+deep; new locale directories need a restart.
+
+Options that are not watch.py's own are passed on to generate_datasheet.py
+(e.g. --llm_url, --no_cache, --full_update).
+
+USAGE:
+    python watch.py \\
+        --drafts ../metadata/scs/metadata.json ../templates/scs/en.md \\
+            ../cv-corpus-23.0-2025-09-17/draft/en \\
+        --readme ../cv-corpus-23.0-2025-09-17 \\
+        --corpus_root /data/cv-corpus-23.0-2025-09-17 --output_dir out/ \\
+        --update_dir ../cv-corpus-23.0-2025-09-17/final/en
+"""
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import logging
+import os
+import select
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import generate_datasheet
+from render_datasheet import Template, render_draft
+
+# inotify(7) event masks.
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+)
+# struct inotify_event: wd, mask, cookie, len, then `len` bytes of name.
+INOTIFY_EVENT = struct.Struct("iIII")
+UPDATE_README = "update-readme.py"
+README_STATUS_HEADING = "## Status"
+
+logger = logging.getLogger(__name__)
+
+
+# --- WATCHERS ---
+
+
+class InotifyWatcher:
+    """
+    Reports the files created, written, moved or deleted in `directories`
+    through the Linux inotify API.
+    """
+
+    def __init__(self, directories: Iterable[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this system")
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(
+                self.fd, os.fsencode(directory), WATCH_MASK
+            )
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+            self.directories[wd] = directory
+
+    def changes(self, timeout: float) -> Set[Path]:
+        """
+        Waits up to `timeout` seconds for events and returns the paths they
+        concern.
+        """
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        while ready:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            pos = 0
+            while pos < len(data):
+                wd, _, _, length = INOTIFY_EVENT.unpack_from(data, pos)
+                pos += INOTIFY_EVENT.size
+                name = data[pos : pos + length].rstrip(b"\0")
+                pos += length
+                if wd in self.directories and name:
+                    changed.add(self.directories[wd] / os.fsdecode(name))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """
+    Reports the files of `directories` whose size or mtime changed, or that
+    appeared or disappeared, by listing the directories every `interval`
+    seconds.
+    """
+
+    def __init__(self, directories: Iterable[Path], interval: float = 1.0):
+        self.directories = list(directories)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        files = {}
+        for directory in self.directories:
+            try:
+                entries = os.scandir(directory)
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        files[directory / entry.name] = (
+                            stat.st_mtime_ns,
+                            stat.st_size,
+                        )
+        return files
+
+    def changes(self, timeout: float) -> Set[Path]:
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {
+            path
+            for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(directories: Set[Path], poll: bool, interval: float):
+    if not poll:
+        try:
+            return InotifyWatcher(directories)
+        except (OSError, AttributeError, TypeError) as e:
+            logger.info(f"inotify unavailable ({e}); polling instead.")
+    return PollingWatcher(directories, interval)
+
+
+def wait_for_changes(watcher, debounce: float) -> Set[Path]:
+    """
+    Blocks until files change, then until none has changed for `debounce`
+    seconds, and returns every path changed in the meantime.
+    """
+    changed = set()
+    while not changed:
+        changed = watcher.changes(3600)
+    while True:
+        more = watcher.changes(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+# --- ARTIFACTS ---
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """
+    Writes `text` to `path` unless the file already holds it.
+    """
+    try:
+        if path.read_text(encoding="utf-8") == text:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+class DraftSet:
+    """
+    The drafts rendered from one metadata file and one template into
+    `output_dir`, byte for byte as generate-datasheet.py writes them.
+    """
+
+    def __init__(self, metadata_path: Path, template_path: Path, output_dir):
+        self.metadata_path = metadata_path
+        self.template_path = template_path
+        self.output_dir = output_dir
+        self.metadata = self.load_metadata()
+        self.template = Template.from_file(template_path)
+
+    def load_metadata(self) -> Dict[str, Dict[str, str]]:
+        try:
+            return json.loads(self.metadata_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError) as e:
+            # Most likely caught mid-save; the next event brings it back.
+            logger.warning(f"Could not read {self.metadata_path}: {e}")
+            return self.metadata
+
+    def affected(self, path: Path) -> Set[str]:
+        """
+        Returns the locales whose draft depends on the changed `path`.
+        """
+        locales = set()
+        if path == self.metadata_path:
+            metadata = self.load_metadata()
+            locales.update(
+                locale
+                for locale, entry in metadata.items()
+                if self.metadata.get(locale) != entry
+            )
+            self.metadata = metadata
+        if path == self.template_path and path.exists():
+            self.template = Template.from_file(path)
+            locales.update(self.metadata)
+        return locales
+
+    def render(self, locales: Iterable[str]) -> int:
+        """
+        Writes the drafts of `locales` whose content changed and returns how
+        many were written.
+        """
+        written = 0
+        for locale in sorted(locales):
+            entry = self.metadata.get(locale)
+            if entry is None:
+                continue
+            written += write_if_changed(
+                self.output_dir / f"{locale}.md",
+                render_draft(self.template, locale, entry),
+            )
+        return written
+
+
+def update_readme(release_dir: Path) -> bool:
+    """
+    Replaces the status section of the release's README.md, up to its last
+    table row, with the output of its update-readme.py; the text around it
+    is kept. Returns whether the README changed.
+    """
+    script = release_dir / UPDATE_README
+    readme = release_dir / "README.md"
+    if not script.exists() or not readme.exists():
+        return False
+    status = subprocess.run(
+        [sys.executable, UPDATE_README],
+        cwd=release_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    lines = readme.read_text(encoding="utf-8").splitlines(keepends=True)
+    new_lines = status.splitlines(keepends=True)
+    try:
+        start = lines.index(README_STATUS_HEADING + "\n")
+        new_start = new_lines.index(README_STATUS_HEADING + "\n")
+    except ValueError:
+        logger.warning(f"No '{README_STATUS_HEADING}' section in {readme}")
+        return False
+    end = max(
+        (i + 1 for i in range(start, len(lines)) if lines[i].startswith("|")),
+        default=len(lines),
+    )
+    return write_if_changed(
+        readme, "".join(lines[:start] + new_lines[new_start:] + lines[end:])
+    )
+
+
+# --- DEPENDENCY GRAPH ---
+
+
+class Plan:
+    """
+    The artifacts to rebuild after a batch of changes.
+    """
+
+    def __init__(self):
+        self.drafts: Dict[DraftSet, Set[str]] = {}
+        self.locales: Set[str] = set()
+        self.readmes: Set[Path] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.drafts or self.locales or self.readmes)
+
+
+class DependencyGraph:
+    """
+    Maps changed input files to the artifacts downstream of them.
+    """
+
+    def __init__(
+        self,
+        drafts: List[DraftSet],
+        readmes: List[Path],
+        corpus_root: Optional[Path] = None,
+        update_dir: Optional[Path] = None,
+    ):
+        self.drafts = drafts
+        self.readmes = readmes
+        self.corpus_root = corpus_root
+        self.update_dir = update_dir
+
+    def directories(self) -> Set[Path]:
+        """
+        Returns the directories holding the inputs.
+        """
+        directories = set()
+        for draft_set in self.drafts:
+            directories.add(draft_set.metadata_path.parent)
+            directories.add(draft_set.template_path.parent)
+        for release_dir in self.readmes:
+            for stage in ("draft", "final"):
+                if (release_dir / stage / "en").is_dir():
+                    directories.add(release_dir / stage / "en")
+        if self.corpus_root is not None:
+            directories.update(
+                generate_datasheet.find_locale_dirs(self.corpus_root)
+            )
+        if self.update_dir is not None and self.update_dir.is_dir():
+            directories.add(self.update_dir)
+        return directories
+
+    def plan(self, changed: Iterable[Path]) -> Plan:
+        plan = Plan()
+        for path in changed:
+            for draft_set in self.drafts:
+                locales = draft_set.affected(path)
+                if locales:
+                    plan.drafts.setdefault(draft_set, set()).update(locales)
+            for release_dir in self.readmes:
+                if path.suffix == ".md" and path.parent.parent.parent == (
+                    release_dir
+                ):
+                    plan.readmes.add(release_dir)
+            if (
+                self.corpus_root is not None
+                and path.suffix == ".tsv"
+                and path.parent.parent == self.corpus_root
+            ):
+                plan.locales.add(path.parent.name)
+            if (
+                self.corpus_root is not None
+                and self.update_dir is not None
+                and path.suffix == ".md"
+                and path.parent == self.update_dir
+                and (self.corpus_root / path.stem).is_dir()
+            ):
+                plan.locales.add(path.stem)
+        return plan
+
+
+def rebuild(
+    plan: Plan, graph: DependencyGraph, datasheet_args: argparse.Namespace
+) -> None:
+    for draft_set, locales in plan.drafts.items():
+        written = draft_set.render(locales)
+        logger.info(
+            f"{draft_set.template_path.name} -> {draft_set.output_dir}: "
+            f"{written} of {len(locales)} affected drafts rewritten"
+        )
+    if plan.locales:
+        logger.info(f"Regenerating datasheets of {', '.join(plan.locales)}")
+        datasheet_args.output_dir.mkdir(parents=True, exist_ok=True)
+        asyncio.run(
+            generate_datasheet.run_batch_async(
+                datasheet_args,
+                [
+                    graph.corpus_root / locale
+                    for locale in sorted(plan.locales)
+                ],
+            )
+        )
+    for release_dir in plan.readmes:
+        if update_readme(release_dir):
+            logger.info(f"Updated {release_dir / 'README.md'}")
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+    parser = argparse.ArgumentParser(
+        description="Watch metadata, templates, TSVs and datasheets, and "
+        "rebuild only the drafts, datasheets and READMEs they affect. Other "
+        "options are passed on to generate_datasheet.py.",
+    )
+    parser.add_argument(
+        "--drafts",
+        nargs=3,
+        type=Path,
+        action="append",
+        default=[],
+        metavar=("METADATA", "TEMPLATE", "OUTPUT_DIR"),
+        help="Drafts to keep up to date, as for generate-datasheet.py; may "
+        "be repeated.",
+    )
+    parser.add_argument(
+        "--readme",
+        type=Path,
+        action="append",
+        default=[],
+        metavar="RELEASE_DIR",
+        help="Release directory whose README.md status to keep up to date; "
+        "may be repeated.",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll the files instead of using inotify.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Polling interval in seconds (default: 1).",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=1.0,
+        help="Seconds without changes before a rebuild starts (default: 1).",
+    )
+    args, rest = parser.parse_known_args()
+
+    datasheet_args = None
+    if rest:
+        datasheet_args = generate_datasheet.make_parser().parse_args(rest)
+        if not datasheet_args.corpus_root or not datasheet_args.output_dir:
+            parser.error("datasheets need --corpus_root and --output_dir")
+        if datasheet_args.update_dir and (
+            datasheet_args.update_dir.resolve()
+            == datasheet_args.output_dir.resolve()
+        ):
+            parser.error("--update_dir and --output_dir must differ")
+    if not (args.drafts or args.readme or datasheet_args):
+        parser.error("nothing to watch")
+
+    graph = DependencyGraph(
+        [
+            DraftSet(metadata.resolve(), template.resolve(), output.resolve())
+            for metadata, template, output in args.drafts
+        ],
+        [release_dir.resolve() for release_dir in args.readme],
+        datasheet_args.corpus_root.resolve() if datasheet_args else None,
+        (
+            datasheet_args.update_dir.resolve()
+            if datasheet_args and datasheet_args.update_dir
+            else None
+        ),
+    )
+    directories = graph.directories()
+    watcher = make_watcher(directories, args.poll, args.interval)
+    logger.info(
+        f"Watching {len(directories)} directories with "
+        f"{type(watcher).__name__}; press Ctrl-C to stop."
+    )
+    try:
+        while True:
+            changed = wait_for_changes(watcher, args.debounce)
+            try:
+                plan = graph.plan(changed)
+                if plan:
+                    rebuild(plan, graph, datasheet_args)
+            except Exception:
+                # A bad edit must not end the session; the next change to
+                # the same inputs retries the rebuild.
+                logger.exception("Rebuild failed; still watching.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# The scripts import each other as top-level modules.
+sys.path.insert(0, str(REPO_ROOT / "scripts"))
+
+from synthetic_corpus import generate_locale  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def synthetic_locale(tmp_path_factory):
+    """
+    A small synthetic locale directory with splits, shared by the tests.
+    """
+    path = tmp_path_factory.mktemp("corpus") / "xx"
+    generate_locale(path, clips=3000, splits=True, seed=1)
+    return path
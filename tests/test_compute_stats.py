@@ -0,0 +1,55 @@
+import pytest
+
+import tsv_shards
+from generate_datasheet import compute_stats
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    # Shard the small synthetic files as if they were large.
+    monkeypatch.setattr(tsv_shards, "SHARD_MIN_BYTES", 0)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_sample_does_not_depend_on_shards(synthetic_locale, sharded, workers):
+    single = compute_stats(synthetic_locale, "xx", "Synthetic", workers=1)
+    sharded_stats = compute_stats(
+        synthetic_locale, "xx", "Synthetic", workers=workers
+    )
+    sample = single["text_corpus"]["sample_sentences"]
+    assert len(sample) == 5
+    assert sharded_stats["text_corpus"]["sample_sentences"] == sample
+
+
+def test_sample_from_cache_matches_stream(synthetic_locale, tmp_path):
+    streamed = compute_stats(synthetic_locale, "xx", "Synthetic")
+    cached = compute_stats(
+        synthetic_locale, "xx", "Synthetic", cache_dir=tmp_path
+    )
+    assert (
+        cached["text_corpus"]["sample_sentences"]
+        == streamed["text_corpus"]["sample_sentences"]
+    )
+
+
+@pytest.mark.parametrize("workers", [2, 3])
+def test_sharded_parse_matches_single_pass(synthetic_locale, sharded, workers):
+    single = compute_stats(synthetic_locale, "xx", "Synthetic", workers=1)
+    assert (
+        compute_stats(synthetic_locale, "xx", "Synthetic", workers=workers)
+        == single
+    )
+
+
+def test_shards_cover_every_line(synthetic_locale, sharded):
+    tsv_path = synthetic_locale / "validated.tsv"
+    header, ranges = tsv_shards.plan_shards(tsv_path, 4)
+    assert len(ranges) == 4
+    rows = [
+        row
+        for start, end in ranges
+        for row in tsv_shards.iter_shard_rows(tsv_path, start, end)
+    ]
+    lines = tsv_path.read_text(encoding="utf-8").splitlines()
+    assert header == lines[0].split("\t")
+    assert rows == [line.split("\t") for line in lines[1:]]
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from datasheet_sections import (
+    join_sections,
+    splice,
+    split_sections,
+    stale_sections,
+)
+from render_datasheet import symbol_table
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATASHEETS = sorted(
+    path
+    for release in REPO_ROOT.glob("cv-corpus-*")
+    for stage in ("draft", "final")
+    for path in (release / stage).rglob("*.md")
+)
+
+
+@pytest.mark.parametrize(
+    "path", DATASHEETS, ids=lambda path: str(path.relative_to(REPO_ROOT))
+)
+def test_round_trip_of_release_datasheets(path):
+    markdown = path.read_text(encoding="utf-8")
+    assert join_sections(split_sections(markdown)) == markdown
+
+
+@pytest.mark.parametrize(
+    "markdown",
+    ["", "\n", "# Title", "# Title\n", "Preamble\n\n# Title\nBody\n", "\n# A"],
+)
+def test_round_trip_of_edge_cases(markdown):
+    assert join_sections(split_sections(markdown)) == markdown
+
+
+GENDER_TABLE = """\
+| Gender           | Validated Clips |
+| ---------------- | --------------: |
+| female, feminine |              12 |"""
+
+GENERATED = """\
+# Datasheet
+
+## Gender
+
+Written by hand, kept across updates.
+
+| Gender           | Validated Clips |
+| ---------------- | --------------: |
+| female, feminine |               3 |
+
+More prose.
+"""
+
+
+def test_splice_replaces_only_generated_blocks():
+    sections = split_sections(GENERATED)
+    stale = stale_sections(sections, {"Gender": GENDER_TABLE})
+    assert stale == {"Gender": GENDER_TABLE}
+    splice(sections, stale)
+    assert join_sections(sections) == GENERATED.replace(
+        "|               3 |", "|              12 |"
+    )
+
+
+def test_unchanged_sections_are_not_stale():
+    sections = split_sections(GENERATED.replace("3 |", "12 |"))
+    assert stale_sections(sections, {"Gender": GENDER_TABLE}) == {}
+
+
+@pytest.mark.parametrize("name", ["an.md", "bas.md"])
+def test_hand_written_sections_are_kept(name):
+    (path,) = [
+        path
+        for path in DATASHEETS
+        if path.relative_to(REPO_ROOT).match(f"*/final/en/{name}")
+    ]
+    sections = split_sections(path.read_text(encoding="utf-8"))
+    rendered = {
+        "Gender": GENDER_TABLE,
+        "Text Corpus": "- **Total validated sentences:** 1",
+        "Text corpus": "- **Total validated sentences:** 1",
+    }
+    assert stale_sections(sections, rendered) == {}
+
+
+def test_fenced_alphabet_becomes_a_symbol_table():
+    sections = split_sections("### Alphabet\n\nIntro.\n\n```\na b\n```\n")
+    table = symbol_table({"a": 2, "b": 1})
+    rendered = {"Alphabet": "Intro.\n\n" + table}
+    splice(sections, stale_sections(sections, rendered))
+    assert join_sections(sections) == f"### Alphabet\n\nIntro.\n\n{table}\n"
+    assert stale_sections(sections, rendered) == {}
@@ -0,0 +1,113 @@
+import csv
+import random
+
+import pytest
+
+import duration_index
+import tsv_shards
+from duration_index import ClipDurationIndex, clip_hash
+
+HEADER = "clip\tduration[ms]\n"
+
+
+def write_durations(path, rows):
+    path.write_text(
+        HEADER + "".join(f"{clip}\t{ms}\n" for clip, ms in rows),
+        encoding="utf-8",
+    )
+
+
+def dict_lookup(path):
+    """
+    The durations as generate_datasheet.py used to hold them.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        return {
+            row["clip"]: int(row["duration[ms]"])
+            for row in csv.DictReader(f, delimiter="\t")
+        }
+
+
+@pytest.fixture
+def durations_tsv(tmp_path):
+    rng = random.Random(3)
+    rows = [
+        (f"common_voice_xx_{i}.mp3", rng.randrange(1000, 20000))
+        for i in range(2000)
+    ]
+    # Duplicate paths: as with a dict, the last duration wins.
+    rows += [(clip, ms + 1) for clip, ms in rng.sample(rows, 50)]
+    rows.append(("ünïcödé_日本.mp3", 4321))
+    path = tmp_path / "clip_durations.tsv"
+    write_durations(path, rows)
+    return path
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(duration_index, "np", None)
+    elif duration_index.np is None:
+        pytest.skip("NumPy is not installed")
+
+
+@pytest.fixture(params=["tsv", "mmap", "sharded"])
+def open_index(request, tmp_path, monkeypatch, backend):
+    def open_index(path):
+        if request.param == "tsv":
+            return ClipDurationIndex.open(path)
+        if request.param == "sharded":
+            monkeypatch.setattr(tsv_shards, "SHARD_MIN_BYTES", 0)
+            return ClipDurationIndex.open(path, workers=3)
+        ClipDurationIndex.open(path, tmp_path / "cache").close()
+        index = ClipDurationIndex.open(path, tmp_path / "cache")
+        assert index._mmap is not None
+        return index
+
+    return open_index
+
+
+def test_lookup_matches_dict(durations_tsv, open_index):
+    expected = dict_lookup(durations_tsv)
+    index = open_index(durations_tsv)
+    assert len(index) == len(expected)
+    assert index.row_count == 2051
+    clips = list(expected) + ["missing.mp3", ""]
+    assert [index.get(clip) for clip in clips] == [
+        expected.get(clip, 0) for clip in clips
+    ]
+    assert index.get("missing.mp3", -1) == -1
+    assert index.lookup_hashes([clip_hash(clip) for clip in clips]) == [
+        expected.get(clip, 0) for clip in clips
+    ]
+    assert index.sum_durations(clips) == sum(expected.values())
+    assert index.sum_hashes([]) == 0
+    index.close()
+
+
+@pytest.mark.parametrize("text", ["", HEADER])
+def test_empty_durations_file(tmp_path, open_index, text):
+    path = tmp_path / "clip_durations.tsv"
+    path.write_text(text, encoding="utf-8")
+    index = open_index(path)
+    assert len(index) == 0
+    assert index.get("a.mp3") == 0
+    assert index.lookup_hashes([clip_hash("a.mp3")]) == [0]
+    assert index.sum_durations(["a.mp3", "b.mp3"]) == 0
+    index.close()
+
+
+def test_missing_durations_file(tmp_path, backend):
+    index = ClipDurationIndex.open(tmp_path / "clip_durations.tsv")
+    assert len(index) == 0
+    assert index.sum_durations(["a.mp3"]) == 0
+
+
+def test_cached_index_follows_source(durations_tsv, tmp_path):
+    cache_dir = tmp_path / "cache"
+    ClipDurationIndex.open(durations_tsv, cache_dir).close()
+    write_durations(durations_tsv, [("a.mp3", 1000), ("b.mp3", 2000)])
+    index = ClipDurationIndex.open(durations_tsv, cache_dir)
+    assert len(index) == 2
+    assert index.sum_durations(["a.mp3", "b.mp3", "c.mp3"]) == 3000
+    index.close()
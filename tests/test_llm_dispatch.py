@@ -0,0 +1,155 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_dispatch
+from llm_dispatch import (
+    Dispatcher,
+    GeminiClient,
+    LLMError,
+    ResponseCache,
+    TransientLLMError,
+    is_transient,
+)
+
+
+class APIError(Exception):
+    """
+    Stands in for the errors of the Google SDKs, which carry an HTTP status.
+    """
+
+    def __init__(self, code=None, status_code=None, response_code=None):
+        super().__init__(f"status {code or status_code or response_code}")
+        self.code = code
+        self.status_code = status_code
+        if response_code is not None:
+            self.response = SimpleNamespace(status_code=response_code)
+
+
+class FakeClient:
+    """
+    Raises the given errors in turn, then answers with the prompt.
+    """
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = []
+
+    async def generate(self, model, prompt):
+        self.calls.append((time.monotonic(), prompt))
+        if self.errors:
+            raise self.errors.pop(0)
+        return f"answer to {prompt}"
+
+
+def dispatcher(client, **kwargs):
+    kwargs = {"backoff": 0.001, "requests_per_minute": 60000, **kwargs}
+    return Dispatcher(client, model="test", **kwargs)
+
+
+@pytest.mark.parametrize(
+    "error, transient",
+    [
+        (APIError(code=503), True),
+        (APIError(code=429), True),
+        (APIError(status_code=500), True),
+        (APIError(response_code=504), True),
+        (APIError(code=400), False),
+        (APIError(code=403), False),
+        # A gRPC status code, not an HTTP status.
+        (APIError(code=("UNAVAILABLE",)), False),
+        (ConnectionResetError(), True),
+        (asyncio.TimeoutError(), True),
+        (ValueError("bad prompt"), False),
+    ],
+)
+def test_is_transient(error, transient):
+    assert is_transient(error) is transient
+
+
+def test_sdk_exceptions_are_transient(monkeypatch):
+    class ServiceUnavailable(Exception):
+        pass
+
+    monkeypatch.setattr(
+        llm_dispatch, "TRANSIENT_SDK_ERRORS", (ServiceUnavailable,)
+    )
+    assert is_transient(ServiceUnavailable("try again"))
+
+
+@pytest.mark.parametrize(
+    "error, expected",
+    [(APIError(code=503), TransientLLMError), (APIError(code=400), LLMError)],
+)
+def test_gemini_client_classifies_errors(error, expected):
+    async def generate_content(model, contents):
+        raise error
+
+    client = GeminiClient()
+    client._client = SimpleNamespace(
+        aio=SimpleNamespace(
+            models=SimpleNamespace(generate_content=generate_content)
+        )
+    )
+    with pytest.raises(LLMError) as raised:
+        asyncio.run(client.generate("test", "prompt"))
+    assert type(raised.value) is expected
+    assert raised.value.__cause__ is error
+
+
+def test_transient_errors_are_retried():
+    client = FakeClient(TransientLLMError("503"), TransientLLMError("429"))
+    assert asyncio.run(dispatcher(client).generate("p")) == "answer to p"
+    assert len(client.calls) == 3
+
+
+def test_retries_are_bounded():
+    client = FakeClient(*[TransientLLMError("503")] * 3)
+    with pytest.raises(TransientLLMError):
+        asyncio.run(dispatcher(client, max_retries=2).generate("p"))
+    assert len(client.calls) == 3
+
+
+def test_permanent_errors_are_not_retried():
+    client = FakeClient(LLMError("400"))
+    with pytest.raises(LLMError):
+        asyncio.run(dispatcher(client).generate("p"))
+    assert len(client.calls) == 1
+
+
+def test_requests_are_rate_limited():
+    client = FakeClient()
+    prompts = [f"p{i}" for i in range(8)]
+    # 20 requests per second, in bursts of 2.
+    limited = dispatcher(client, concurrency=2, requests_per_minute=1200)
+    answers = asyncio.run(limited.generate_many(prompts))
+    assert answers == [f"answer to {p}" for p in prompts]
+    starts = sorted(start for start, _ in client.calls)
+    # The burst goes out at once, the other requests 50ms apart.
+    assert starts[-1] - starts[0] >= (len(prompts) - 2) * 0.05 * 0.9
+
+
+def test_cached_responses_skip_the_client(tmp_path):
+    cache = ResponseCache(tmp_path)
+    client = FakeClient()
+    asyncio.run(dispatcher(client, cache=cache).generate_many(["a", "b"]))
+    again = FakeClient()
+    assert asyncio.run(
+        dispatcher(again, cache=cache).generate_many(["a", "b", "c"])
+    ) == ["answer to a", "answer to b", "answer to c"]
+    assert [prompt for _, prompt in again.calls] == ["c"]
+    # Answers are cached per model.
+    other = Dispatcher(again, model="other", cache=cache)
+    asyncio.run(other.generate("a"))
+    assert [prompt for _, prompt in again.calls] == ["c", "a"]
+
+
+def test_failed_requests_are_not_cached(tmp_path):
+    cache = ResponseCache(tmp_path)
+    with pytest.raises(LLMError):
+        asyncio.run(
+            dispatcher(FakeClient(LLMError("400")), cache=cache).generate("p")
+        )
+    assert cache.get("test", "p") is None
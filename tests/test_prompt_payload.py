@@ -0,0 +1,47 @@
+import json
+import logging
+import re
+
+import pytest
+
+from generate_datasheet import (
+    AVG_CLIPS_THRESHOLD,
+    SENTENCE_THRESHOLD,
+    compute_stats,
+    generate_prompt_for_llm,
+)
+from prompt_payload import PromptLimits, estimate_tokens
+
+
+@pytest.fixture(scope="module")
+def stats(synthetic_locale):
+    return compute_stats(synthetic_locale, "xx", "Synthetic")
+
+
+@pytest.mark.parametrize("token_budget", [100_000, 1_000])
+def test_logged_data_is_the_compacted_payload(stats, caplog, token_budget):
+    report = {}
+    with caplog.at_level(logging.INFO):
+        prompt = generate_prompt_for_llm(
+            stats,
+            SENTENCE_THRESHOLD,
+            AVG_CLIPS_THRESHOLD,
+            limits=PromptLimits(token_budget, top_accents=20),
+            report=report,
+        )
+    (message,) = [
+        record.getMessage()
+        for record in caplog.records
+        if record.getMessage().startswith("Data sent to LLM")
+    ]
+    tokens, data = re.match(
+        r"Data sent to LLM for Synthetic \(~([\d,]+) tokens.*?\): (.*)$",
+        message,
+        re.S,
+    ).groups()
+    assert data in prompt
+    assert int(tokens.replace(",", "")) == report["data_tokens"]
+    assert estimate_tokens(data) == report["data_tokens"]
+    payload = json.loads(data)
+    assert "demographics" not in payload
+    assert len(payload["accents"]) <= report["accents_kept"]
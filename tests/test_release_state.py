@@ -0,0 +1,125 @@
+import logging
+import random
+import shutil
+
+import pytest
+
+import release_state
+from duration_index import ClipDurationIndex
+from generate_datasheet import LocaleStats, apply_release_delta, compute_stats
+from release_state import (
+    StaleStateError,
+    collect_lines,
+    diff_lines,
+    index_lines,
+    load_state,
+)
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Many chunks even in small files, so that changes shift some of them.
+    monkeypatch.setattr(release_state, "CHUNK_SIZE", 4096)
+
+
+def write_lines(path, header, lines):
+    path.write_text(header + "".join(lines), encoding="utf-8")
+
+
+def next_release(path, rng, inserted_at=0, removals=None):
+    """
+    Rewrites a TSV as the next release: `removals` rows (default 2%)
+    removed, rows inserted at `inserted_at` and at the end, and two
+    neighbouring rows swapped.
+    Returns the removed and the added lines.
+    """
+    header, *lines = path.read_text(encoding="utf-8").splitlines(True)
+    if removals is None:
+        removals = len(lines) // 50
+    removed = set(rng.sample(range(len(lines)), removals))
+    kept = [line for i, line in enumerate(lines) if i not in removed]
+    added = [line.replace("\t", "-next\t", 1) for line in lines[:12]]
+    kept[inserted_at:inserted_at] = added[:6]
+    kept += added[6:]
+    kept[len(kept) // 2], kept[len(kept) // 2 + 1] = (
+        kept[len(kept) // 2 + 1],
+        kept[len(kept) // 2],
+    )
+    write_lines(path, header, kept)
+    return [lines[i] for i in sorted(removed)], added
+
+
+def test_diff_finds_shifted_chunks(tmp_path, small_chunks, monkeypatch):
+    path = tmp_path / "a.tsv"
+    lines = [f"id{i}\t{'x' * (i % 50)}\n" for i in range(5000)]
+    write_lines(path, "id\ttext\n", lines)
+    old_bytes = path.read_bytes()
+    _, old = index_lines(path)
+    assert old.chunk_count > 10
+
+    removed, added = next_release(
+        path, random.Random(0), inserted_at=3, removals=5
+    )
+    hashed = []
+    line_hash = release_state.line_hash
+    monkeypatch.setattr(
+        release_state,
+        "line_hash",
+        lambda line: hashed.append(line) or line_hash(line),
+    )
+    delta = diff_lines(path, old)
+
+    assert sorted(delta.added) == sorted(added)
+    previous = tmp_path / "previous.tsv"
+    previous.write_bytes(old_bytes)
+    assert collect_lines(previous, delta.removed) == removed
+    # Unchanged chunks, at their old offsets or shifted, are not rehashed.
+    assert len(hashed) < len(lines) // 3
+    # The new index matches one built from scratch.
+    monkeypatch.setattr(release_state, "line_hash", line_hash)
+    _, fresh = index_lines(path)
+    assert sorted(delta.index.hashes) == sorted(fresh.hashes)
+    data = path.read_bytes()
+    for i in range(delta.index.chunk_count):
+        offset, size, _, _ = delta.index.chunk(i)
+        for j in delta.index.chunk_lines(i):
+            start = offset + delta.index.offsets[j]
+            line = data[start : data.index(b"\n", start) + 1]
+            assert line_hash(line) == delta.index.hashes[j]
+
+
+def test_release_delta_matches_fresh_stats(
+    synthetic_locale, tmp_path, small_chunks, caplog
+):
+    previous, current = tmp_path / "previous", tmp_path / "current"
+    state_dir = tmp_path / "state"
+    shutil.copytree(synthetic_locale, previous)
+    compute_stats(previous, "xx", "Synthetic", state_dir=state_dir)
+
+    shutil.copytree(previous, current)
+    rng = random.Random(1)
+    for file_name in ("validated.tsv", "validated_sentences.tsv", "dev.tsv"):
+        next_release(current / file_name, rng, inserted_at=40)
+
+    with caplog.at_level(logging.INFO):
+        updated = compute_stats(
+            current, "xx", "Synthetic", state_dir=state_dir
+        )
+    assert "validated.tsv: 12 rows added" in caplog.text
+    assert "recomputing" not in caplog.text
+    assert updated == compute_stats(current, "xx", "Synthetic")
+
+
+def test_changed_header_makes_state_stale(synthetic_locale, tmp_path):
+    base_path, state_dir = tmp_path / "xx", tmp_path / "state"
+    shutil.copytree(synthetic_locale, base_path)
+    compute_stats(base_path, "xx", "Synthetic", state_dir=state_dir)
+    tsv_path = base_path / "invalidated.tsv"
+    header, *lines = tsv_path.read_text(encoding="utf-8").splitlines(True)
+    write_lines(tsv_path, header.replace("\n", "\textra\n"), lines)
+
+    durations = ClipDurationIndex.open(base_path / "clip_durations.tsv")
+    with pytest.raises(StaleStateError, match="columns of invalidated.tsv"):
+        apply_release_delta(
+            LocaleStats(durations), base_path, None, *load_state(state_dir)
+        )
@@ -0,0 +1,156 @@
+import csv
+import logging
+import os
+
+import pytest
+
+import tsv_cache
+import tsv_shards
+from duration_index import clip_hash
+from tsv_cache import load_table
+
+COLUMNS = {
+    "path": "hash",
+    "gender": "dict",
+    "sentence": "dict",
+    "clips_count": "int",
+}
+ROWS = [
+    ("a.mp3", "female_feminine", "Сәлем, әлем!", "3"),
+    ("b.mp3", "", "", ""),
+    ("c.mp3", "male_masculine", "日本語の文。", "0"),
+    ("d.mp3", "female_feminine", "Сәлем, әлем!", "-2"),
+    ("é.mp3", "", "Ünïcödé ​", "12"),
+]
+
+
+def write_tsv(path, rows):
+    header = "path\tgender\tsentence\tclips_count\tignored\n"
+    path.write_text(
+        header + "".join("\t".join(row) + "\tx\n" for row in rows),
+        encoding="utf-8",
+    )
+
+
+def raw_columns(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f, delimiter="\t"))
+    return {
+        "path": [clip_hash(row["path"]) for row in rows],
+        "gender": [row["gender"] for row in rows],
+        "sentence": [row["sentence"] for row in rows],
+        "clips_count": [int(row["clips_count"] or 0) for row in rows],
+    }
+
+
+def table_columns(table):
+    return {
+        "path": list(table["path"]),
+        "gender": list(table["gender"]),
+        "sentence": list(table["sentence"]),
+        "clips_count": list(table["clips_count"]),
+    }
+
+
+def load(tsv_path, cache_dir, caplog, **kwargs):
+    """
+    Returns the columns of the cached table and whether it was rebuilt.
+    """
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        table = load_table(tsv_path, cache_dir, COLUMNS, **kwargs)
+    columns = table_columns(table)
+    table.close()
+    return columns, "Building columnar cache" in caplog.text
+
+
+def test_round_trip_equals_raw_parse(tmp_path, caplog):
+    tsv_path = tmp_path / "validated.tsv"
+    write_tsv(tsv_path, ROWS)
+    built, rebuilt = load(tsv_path, tmp_path / "cache", caplog)
+    assert rebuilt
+    assert built == raw_columns(tsv_path)
+    cached, rebuilt = load(tsv_path, tmp_path / "cache", caplog)
+    assert not rebuilt
+    assert cached == built
+
+
+def test_dict_columns_count_in_order_of_first_appearance(tmp_path):
+    tsv_path = tmp_path / "validated.tsv"
+    write_tsv(tsv_path, ROWS)
+    table = load_table(tsv_path, tmp_path / "cache", COLUMNS)
+    assert list(table["gender"].counts().items()) == [
+        ("female_feminine", 2),
+        ("", 2),
+        ("male_masculine", 1),
+    ]
+    assert table["sentence"].vocab[1] == ""
+    table.close()
+
+
+def test_missing_columns_and_empty_files(tmp_path):
+    tsv_path = tmp_path / "reported.tsv"
+    tsv_path.write_text("path\tgender\n", encoding="utf-8")
+    table = load_table(tsv_path, tmp_path / "cache", COLUMNS)
+    assert table.num_rows == 0
+    assert "sentence" not in table and "clips_count" not in table
+    assert list(table["path"]) == [] and list(table["gender"]) == []
+    table.close()
+    assert load_table(tmp_path / "absent.tsv", tmp_path, COLUMNS) is None
+
+
+def test_sharded_build_equals_single_build(tmp_path, monkeypatch):
+    tsv_path = tmp_path / "validated.tsv"
+    write_tsv(tsv_path, ROWS * 40)
+    single = load_table(tsv_path, tmp_path / "single", COLUMNS)
+    monkeypatch.setattr(tsv_shards, "SHARD_MIN_BYTES", 0)
+    sharded = load_table(tsv_path, tmp_path / "sharded", COLUMNS, workers=3)
+    assert table_columns(sharded) == table_columns(single)
+    assert sharded["gender"].vocab == single["gender"].vocab
+    single.close()
+    sharded.close()
+
+
+def keep_mtime(tsv_path, change):
+    st = tsv_path.stat()
+    change()
+    os.utime(tsv_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        # Size: one more row.
+        lambda path: write_tsv(path, ROWS + ROWS[:1]),
+        # Modification time only.
+        lambda path: os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9)),
+        # Content of the first block, with the same size and mtime.
+        lambda path: keep_mtime(
+            path, lambda: write_tsv(path, [("z.mp3", *ROWS[0][1:])] + ROWS[1:])
+        ),
+        # Content of the last block, with the same size and mtime.
+        lambda path: keep_mtime(
+            path,
+            lambda: write_tsv(path, ROWS[:-1] + [("ê.mp3", *ROWS[-1][1:])]),
+        ),
+    ],
+    ids=["size", "mtime", "head", "tail"],
+)
+def test_changed_source_rebuilds_cache(tmp_path, monkeypatch, caplog, change):
+    # Blocks smaller than the file, so that head and tail are distinct.
+    monkeypatch.setattr(tsv_cache, "SIGNATURE_BLOCK_SIZE", 64)
+    tsv_path = tmp_path / "validated.tsv"
+    write_tsv(tsv_path, ROWS)
+    load(tsv_path, tmp_path / "cache", caplog)
+    change(tsv_path)
+    columns, rebuilt = load(tsv_path, tmp_path / "cache", caplog)
+    assert rebuilt
+    assert columns == raw_columns(tsv_path)
+
+
+def test_forced_rebuild(tmp_path, caplog):
+    tsv_path = tmp_path / "validated.tsv"
+    write_tsv(tsv_path, ROWS)
+    load(tsv_path, tmp_path / "cache", caplog)
+    _, rebuilt = load(tsv_path, tmp_path / "cache", caplog, rebuild=True)
+    assert rebuilt
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import re
+
+import pytest
+
+from datasheet_sections import split_sections, table_labels
+from generate_datasheet import (
+    ACCENT_TRANSLATION_TITLE,
+    compute_stats,
+    update_datasheet,
+)
+from prompt_payload import PromptLimits
+from render_datasheet import markdown_table, top_counts
+
+
+class FakeDispatcher:
+    """
+    Answers every prompt with `reply`, or with a translation table of the
+    accents listed in the prompt when `reply` is None.
+    """
+
+    def __init__(self, reply=None, translate=False):
+        self.reply = reply
+        self.translate = translate
+        self.prompts = []
+
+    async def generate(self, prompt):
+        self.prompts.append(prompt)
+        if not self.translate:
+            return self.reply
+        accents = re.findall(r"^- (.*)$", prompt, re.M)
+        return markdown_table(
+            ["Original Accent", "Translation / Explanation"],
+            [(accent, f"{accent} (en)") for accent in accents],
+        )
+
+
+@pytest.fixture(scope="module")
+def stats(synthetic_locale):
+    return compute_stats(synthetic_locale, "xx", "Synthetic")
+
+
+def datasheet(rows):
+    table = markdown_table(["Accent", "Translation"], rows)
+    return f"# Synthetic\n\n#### {ACCENT_TRANSLATION_TITLE}\n\n{table}\n"
+
+
+def translation_section(markdown):
+    (section,) = [
+        section
+        for section in split_sections(markdown)
+        if section.title == ACCENT_TRANSLATION_TITLE
+    ]
+    return section.body
+
+
+def update(markdown, stats, dispatcher):
+    return asyncio.run(
+        update_datasheet(markdown, stats, dispatcher, PromptLimits())
+    )
+
+
+def accents_of(stats):
+    return list(top_counts(stats["demographics"]["accent"], 20)[0])
+
+
+@pytest.mark.parametrize(
+    "reply", [None, "", "I cannot help with that.", "```\n| a |\n```"]
+)
+def test_reply_without_table_keeps_translations(stats, reply, caplog):
+    accents = accents_of(stats)
+    markdown = datasheet([(accent, "kept") for accent in accents[1:]])
+    dispatcher = FakeDispatcher(reply)
+    with caplog.at_level(logging.WARNING):
+        updated = update(markdown, stats, dispatcher)
+    assert translation_section(updated) == translation_section(markdown)
+    assert "did not translate" in caplog.text
+    assert len(dispatcher.prompts) == 1
+
+
+def test_only_new_accents_are_translated(stats):
+    accents = accents_of(stats)
+    rows = [(accent, "kept") for accent in accents[1:]] + [("gone", "x")]
+    dispatcher = FakeDispatcher(translate=True)
+    updated = update(datasheet(rows), stats, dispatcher)
+    (prompt,) = dispatcher.prompts
+    assert re.findall(r"^- (.*)$", prompt, re.M) == accents[:1]
+    body = translation_section(updated)
+    assert table_labels(body) == accents
+    assert f"{accents[0]} (en)" in body and body.count("kept") == len(rows) - 1
+
+    again = FakeDispatcher(translate=True)
+    assert update(updated, stats, again) == updated
+    assert again.prompts == []
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from watch import DependencyGraph, DraftSet
+
+METADATA = {
+    "xx": {"english_name": "Synthetic", "native_name": "Sintetik"},
+    "yy": {"english_name": "Other", "native_name": ""},
+}
+
+
+@pytest.fixture
+def graph(tmp_path):
+    metadata_path = tmp_path / "metadata" / "metadata.json"
+    metadata_path.parent.mkdir()
+    metadata_path.write_text(json.dumps(METADATA), encoding="utf-8")
+    draft_sets = []
+    for name in ("scs", "sps"):
+        template_path = tmp_path / "templates" / name / "en.md"
+        template_path.parent.mkdir(parents=True)
+        template_path.write_text(f"# {{{{NATIVE_NAME}}}} ({name})\n")
+        draft_sets.append(
+            DraftSet(metadata_path, template_path, tmp_path / "out" / name)
+        )
+    corpus_root = tmp_path / "corpus"
+    for locale in METADATA:
+        (corpus_root / locale).mkdir(parents=True)
+        (corpus_root / locale / "validated.tsv").write_text("path\n")
+    return DependencyGraph(draft_sets, [], corpus_root)
+
+
+def test_template_edit_maps_to_its_drafts_only(graph):
+    scs, sps = graph.drafts
+    scs.template_path.write_text("# {{ENGLISH_NAME}}\n")
+    plan = graph.plan([scs.template_path])
+    assert plan.drafts == {scs: set(METADATA)}
+    assert not plan.locales and not plan.readmes
+    scs.render(plan.drafts[scs])
+    assert (scs.output_dir / "xx.md").read_text() == "# Synthetic\n\n"
+    assert not sps.output_dir.exists()
+
+
+def test_metadata_edit_maps_to_changed_entries_only(graph):
+    scs, sps = graph.drafts
+    metadata = {**METADATA, "yy": {**METADATA["yy"], "native_name": "Y"}}
+    scs.metadata_path.write_text(json.dumps(metadata), encoding="utf-8")
+    plan = graph.plan([scs.metadata_path])
+    assert plan.drafts == {scs: {"yy"}, sps: {"yy"}}
+    assert not plan.locales
+
+
+def test_tsv_maps_to_its_locale_only(graph):
+    tsv_path = graph.corpus_root / "xx" / "validated.tsv"
+    plan = graph.plan([tsv_path, graph.corpus_root / "xx" / "notes.txt"])
+    assert plan.locales == {"xx"}
+    assert not plan.drafts and not plan.readmes
+    assert not graph.plan([graph.corpus_root / "validated.tsv"])